@@ -0,0 +1,207 @@
+"""
+Mood Selection Analytics for MoodTunes PWA
+
+Counts how often each mood is served without putting a database write on the
+request path:
+
+- record() only increments an in-memory counter keyed by (mood, UTC hour)
+- A background thread flushes pending counts to SQLite every few seconds in
+  one transaction (executemany + upsert), so N requests cost one write
+- Popularity is read from a cached snapshot rebuilt after each flush and
+  at least every flush interval, which is what the /stats/popular endpoint
+  returns
+
+Every gunicorn worker aggregates its own deltas and upserts them into the same
+database file, so totals are correct across workers. Because a worker also
+re-reads the snapshot once it is a flush interval old, workers that record
+nothing themselves still pick up the others' counts and agree within one
+interval.
+
+Schema:
+    mood_hourly_counts(mood TEXT, hour INTEGER, count INTEGER, PRIMARY KEY (mood, hour))
+    where ``hour`` is the number of whole hours since the Unix epoch (UTC)
+"""
+
+import os
+import time
+import atexit
+import sqlite3
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mood_hourly_counts (
+    mood TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (mood, hour)
+)
+"""
+
+UPSERT = """
+INSERT INTO mood_hourly_counts (mood, hour, count) VALUES (?, ?, ?)
+ON CONFLICT (mood, hour) DO UPDATE SET count = count + excluded.count
+"""
+
+
+class MoodAnalytics:
+    """
+    In-memory mood counters with periodic bulk flushes to SQLite.
+
+    Args:
+        db_path (str): SQLite database file (created on first flush)
+        flush_interval (float): Seconds between background flushes
+        window_hours (int): How far back the popularity snapshot looks
+        clock (callable): Monotonic time source for snapshot age (injectable for tests)
+    """
+
+    def __init__(self, db_path, flush_interval=30.0, window_hours=24 * 7, clock=time.monotonic):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.window_hours = window_hours
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = Counter()
+        self._snapshot = None
+        self._snapshot_at = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+        self._exit_handler = False
+
+    # ----------------------------------------------------------------
+    # Hot path
+    # ----------------------------------------------------------------
+
+    def record(self, mood, timestamp=None):
+        """Count one selection of ``mood`` in the current (or given) UTC hour bucket."""
+        hour = int((timestamp if timestamp is not None else time.time()) // 3600)
+        with self._lock:
+            self._pending[(mood, hour)] += 1
+        if self._thread_pid != os.getpid():
+            self._start_flusher()
+
+    # ----------------------------------------------------------------
+    # Background flushing
+    # ----------------------------------------------------------------
+
+    def _start_flusher(self):
+        """Start the flush thread lazily, once per process (threads do not survive fork)."""
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            self._stop.clear()
+            if not self._exit_handler:
+                # Only instances that recorded something have counts to flush on shutdown;
+                # registered once (forked workers inherit it)
+                atexit.register(self.close)
+                self._exit_handler = True
+            self._thread = threading.Thread(target=self._run, name="mood-analytics-flush", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"Analytics flush failed: {e}")
+
+    def _connect(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.db_path, timeout=10)
+        connection.execute(SCHEMA)
+        return connection
+
+    def flush(self):
+        """
+        Write all pending counts in a single transaction and refresh the snapshot.
+
+        Returns:
+            int: Number of (mood, hour) rows upserted
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, Counter()
+            if not pending:
+                return 0
+
+            rows = [(mood, hour, count) for (mood, hour), count in pending.items()]
+            connection = self._connect()
+            try:
+                with connection:  # One transaction for the whole batch
+                    connection.executemany(UPSERT, rows)
+                self._refresh_snapshot(connection)
+            except sqlite3.Error:
+                # Put the counts back so they are retried on the next flush
+                with self._lock:
+                    self._pending.update(pending)
+                raise
+            finally:
+                connection.close()
+            return len(rows)
+
+    def close(self):
+        """Stop the background thread and flush whatever is still pending."""
+        self._stop.set()
+        if self._thread is not None and self._thread_pid == os.getpid():
+            self._thread.join(timeout=5)
+        self.flush()
+
+    # ----------------------------------------------------------------
+    # Snapshots
+    # ----------------------------------------------------------------
+
+    def _refresh_snapshot(self, connection):
+        self._snapshot = self._build_snapshot(connection)
+        self._snapshot_at = self._clock()
+
+    def _build_snapshot(self, connection):
+        since = int(time.time() // 3600) - self.window_hours
+        totals = connection.execute(
+            "SELECT mood, SUM(count) AS total FROM mood_hourly_counts WHERE hour >= ? "
+            "GROUP BY mood ORDER BY total DESC, mood",
+            (since,),
+        ).fetchall()
+        hourly = {}
+        for mood, hour_of_day, count in connection.execute(
+            "SELECT mood, hour % 24, SUM(count) FROM mood_hourly_counts WHERE hour >= ? GROUP BY mood, hour % 24",
+            (since,),
+        ):
+            hourly.setdefault(hour_of_day, {})[mood] = count
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "window_hours": self.window_hours,
+            "moods": [{"mood": mood, "count": total} for mood, total in totals],
+            "by_hour_utc": hourly,
+        }
+
+    def snapshot(self):
+        """
+        Return the cached popularity snapshot.
+
+        The snapshot is rebuilt from the database on first use and once it is
+        ``flush_interval`` seconds old, so counts flushed by other workers show
+        up even when this process has nothing pending.
+
+        Returns:
+            dict: generated_at, window_hours, moods (sorted by count),
+                by_hour_utc ({hour of day: {mood: count}})
+        """
+        if self._snapshot is None or self._clock() - self._snapshot_at >= self.flush_interval:
+            if not os.path.exists(self.db_path):
+                return {"generated_at": None, "window_hours": self.window_hours, "moods": [], "by_hour_utc": {}}
+            connection = self._connect()
+            try:
+                self._refresh_snapshot(connection)
+            finally:
+                connection.close()
+        return self._snapshot
@@ -19,15 +19,58 @@ Technical Stack:
 - Service Worker for PWA functionality
 - Gunicorn for production deployment
 
+Application Factory:
+- create_app() builds and configures the Flask instance; the module-level
+  ``app`` object is created with it so ``gunicorn app:app`` keeps working
+- Optional subsystems are imported inside create_app() only when enabled,
+  keeping cold starts lean
+- Startup phases are timed by startup_profiler and logged once per process
+
 Author: MoodTunes Team
 Version: 2.1.2
 License: MIT
 """
 
 import os
+import json
+import time
 import logging
-from datetime import datetime
-from flask import Flask, render_template, request, jsonify, session
+from functools import lru_cache
+from collections import namedtuple
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from startup_profiler import StartupProfiler, startup_profile
+from normalizer import normalize_metadata, normalize_mood_key, normalize_query
+from search_engine import (
+    FacetIndex,
+    HighlightIndex,
+    RankedPage,
+    SearchDeadline,
+    SearchPage,
+    bit_is_set,
+    encode_cursor,
+    iter_matches,
+    parse_cursor,
+)
+from flask import (
+    Flask,
+    Response,
+    current_app,
+    g,
+    render_template,
+    request,
+    jsonify,
+    redirect,
+    session,
+    send_from_directory,
+    stream_with_context,
+    url_for,
+)
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+startup_profile.mark("imports")
 
 # ====================================================================
 # APPLICATION VERSION INFORMATION
@@ -42,26 +85,6 @@ BUILD_INFO = {
     "commit": "latest",
 }
 
-# Initialize Flask application with production-ready configuration
-app = Flask(__name__)
-
-# Security Configuration
-# Use environment variable for secret key in production, fallback for development
-app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "your-secret-key-change-in-production")
-
-# Production Security Configurations
-# These settings ensure secure session handling and prevent common web vulnerabilities
-app.config["SESSION_COOKIE_SECURE"] = True  # Force HTTPS-only cookies (prevents man-in-the-middle attacks)
-app.config["SESSION_COOKIE_HTTPONLY"] = True  # Prevent XSS attacks by blocking JavaScript access to cookies
-app.config["SESSION_COOKIE_SAMESITE"] = "Lax"  # CSRF protection while allowing legitimate cross-site requests
-
-# Production Logging Configuration
-# Structured logging for monitoring and debugging in production environments
-logging.basicConfig(
-    level=logging.INFO,  # INFO level provides good balance of detail vs. noise
-    format="%(asctime)s %(levelname)s %(name)s %(message)s",  # Timestamp + level + logger + message
-)
-
 # ====================================================================
 # MOOD PLAYLIST MAPPING
 # ====================================================================
@@ -122,9 +145,121 @@ mood_categories = {
 # ====================================================================
 
 
-def get_time_based_suggestions():
+# Configuration: (start hour, end hour, moods) in the user's local time.
+# Periods may wrap past midnight and must cover all 24 hours; they are
+# compiled once into TIME_SUGGESTION_TABLE so a lookup is a single index.
+TIME_SUGGESTION_PERIODS = [
+    (6, 9, ["uplifting", "motivated", "energetic"]),  # Morning: start the day with energy and positivity
+    (9, 12, ["focused", "motivated", "happy"]),  # Late Morning: focus and productivity time
+    (12, 14, ["chill", "happy", "uplifting"]),  # Lunch Time: light, social, positive vibes
+    (14, 17, ["focused", "energetic", "motivated"]),  # Afternoon: peak productivity and energy hours
+    (17, 20, ["chill", "happy", "party"]),  # Evening: wind down, social time, or celebration
+    (20, 22, ["romantic", "chill", "nostalgic"]),  # Night: intimate, reflective, relaxation time
+    (22, 6, ["sleepy", "meditative", "chill"]),  # Late Night: sleep preparation and quiet moods
+]
+
+# Table resolution: 1 = hourly slots, 2 = half-hour slots, 4 = quarter-hour slots, ...
+TIME_SUGGESTION_SLOTS_PER_HOUR = 1
+
+# A popular mood must have been chosen this many times in an hour bucket
+# before it may displace a configured suggestion
+POPULARITY_MIN_COUNT = 5
+
+
+def build_time_suggestion_table(periods=TIME_SUGGESTION_PERIODS, slots_per_hour=TIME_SUGGESTION_SLOTS_PER_HOUR):
+    """
+    Compile time periods into a fixed lookup table of suggestion tuples.
+
+    Args:
+        periods (list): (start hour, end hour, moods) entries; hours may be fractional
+        slots_per_hour (int): Table resolution
+
+    Returns:
+        tuple: One tuple of mood keys per slot (24 * slots_per_hour entries)
+
+    Raises:
+        ValueError: If the periods leave any slot uncovered
+    """
+    slot_count = 24 * slots_per_hour
+    table = [None] * slot_count
+    for start, end, moods in periods:
+        slot = int(start * slots_per_hour) % slot_count
+        last = int(end * slots_per_hour) % slot_count
+        while True:
+            table[slot] = tuple(moods)
+            slot = (slot + 1) % slot_count
+            if slot == last:
+                break
+
+    uncovered = [index for index, moods in enumerate(table) if moods is None]
+    if uncovered:
+        raise ValueError(f"Time suggestion periods leave {len(uncovered)} slot(s) uncovered")
+    return tuple(table)
+
+
+TIME_SUGGESTION_TABLE = build_time_suggestion_table()
+
+
+@lru_cache(maxsize=256)
+def resolve_timezone(tz=None, tz_offset=None):
     """
-    Get mood suggestions based on current time of day.
+    Resolve a client timezone into a cached tzinfo object.
+
+    Args:
+        tz (str, optional): IANA zone name, e.g. "Europe/Paris"
+        tz_offset (int, optional): Minutes behind UTC, as returned by
+            JavaScript's Date.getTimezoneOffset() (e.g. -60 for UTC+1)
+
+    Returns:
+        tzinfo | None: Zone to use, or None for the server's local time
+    """
+    if tz:
+        try:
+            return ZoneInfo(tz)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass  # Unknown or malformed zone name: fall back to the offset
+    if tz_offset is not None and -840 <= tz_offset <= 840:
+        return timezone(timedelta(minutes=-tz_offset))
+    return None
+
+
+_popularity_cache = {}  # (snapshot generated_at, min_count) -> 24-entry tuple
+
+
+def popular_moods_by_hour(snapshot, min_count=POPULARITY_MIN_COUNT):
+    """
+    Reduce an analytics snapshot to the most popular mood per UTC hour.
+
+    The result is cached per snapshot, so callers can invoke this on every
+    request and still pay only a dictionary lookup.
+
+    Args:
+        snapshot (dict): Output of MoodAnalytics.snapshot()
+        min_count (int): Minimum selections for a mood to count as popular
+
+    Returns:
+        tuple: 24 entries of mood key or None, indexed by UTC hour of day
+    """
+    cache_key = (snapshot.get("generated_at"), min_count)
+    cached = _popularity_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    table = [None] * 24
+    for hour, counts in snapshot.get("by_hour_utc", {}).items():
+        mood, count = max(counts.items(), key=lambda item: (item[1], item[0]), default=(None, 0))
+        if count >= min_count:
+            table[int(hour) % 24] = mood
+
+    table = tuple(table)
+    _popularity_cache.clear()  # Only the latest snapshot is ever needed
+    _popularity_cache[cache_key] = table
+    return table
+
+
+def get_time_based_suggestions(tz=None, tz_offset=None, popular_by_hour=None):
+    """
+    Get mood suggestions based on the user's current time of day.
 
     Uses time-of-day psychology to suggest appropriate moods:
     - Morning: Energizing moods to start the day
@@ -133,42 +268,31 @@ def get_time_based_suggestions():
     - Evening: Social and relaxation moods
     - Night: Calm, intimate, and sleep-ready moods
 
+    Args:
+        tz (str, optional): Client IANA timezone name
+        tz_offset (int, optional): Client offset in JavaScript getTimezoneOffset() minutes
+        popular_by_hour (tuple, optional): Output of popular_moods_by_hour(); the
+            most popular mood for the current UTC hour replaces the last
+            configured suggestion if it is not already suggested
+
     Returns:
-        list: Three mood keys most appropriate for current time
+        list: Three mood keys most appropriate for the user's current time
 
     Note:
-        Time zones are handled by the system's local time.
-        Suggestions are based on general circadian rhythm patterns.
+        Without tz or tz_offset the server's local time is used.
+        Suggestions are a precomputed table lookup (see TIME_SUGGESTION_TABLE).
     """
-    current_hour = datetime.now().hour  # Get current hour in 24-hour format
+    zone = resolve_timezone(tz, tz_offset)
+    now = datetime.now(zone) if zone else datetime.now()
+    slot = now.hour * TIME_SUGGESTION_SLOTS_PER_HOUR + now.minute * TIME_SUGGESTION_SLOTS_PER_HOUR // 60
+    suggestions = list(TIME_SUGGESTION_TABLE[slot])
 
-    # Morning (6AM-9AM): Start the day with energy and positivity
-    if 6 <= current_hour < 9:
-        return ["uplifting", "motivated", "energetic"]
+    if popular_by_hour:
+        popular = popular_by_hour[datetime.now(timezone.utc).hour]
+        if popular and popular not in suggestions:
+            suggestions[-1] = popular
 
-    # Late Morning (9AM-12PM): Focus and productivity time
-    elif 9 <= current_hour < 12:
-        return ["focused", "motivated", "happy"]
-
-    # Lunch Time (12PM-2PM): Light, social, positive vibes
-    elif 12 <= current_hour < 14:
-        return ["chill", "happy", "uplifting"]
-
-    # Afternoon (2PM-5PM): Peak productivity and energy hours
-    elif 14 <= current_hour < 17:
-        return ["focused", "energetic", "motivated"]
-
-    # Evening (5PM-8PM): Wind down, social time, or celebration
-    elif 17 <= current_hour < 20:
-        return ["chill", "happy", "party"]
-
-    # Night (8PM-10PM): Intimate, reflective, relaxation time
-    elif 20 <= current_hour < 22:
-        return ["romantic", "chill", "nostalgic"]
-
-    # Late Night (10PM-6AM): Sleep preparation and quiet moods
-    else:
-        return ["sleepy", "meditative", "chill"]
+    return suggestions
 
 
 def get_mood_display_info(mood_key):
@@ -244,12 +368,56 @@ def get_mood_display_info(mood_key):
     }
 
 
+def lookup_playlist_id(mood_key):
+    """
+    Resolve the Spotify playlist ID for a mood from the active catalog source.
+
+    Sources, in order of preference:
+    - Memory-mapped compiled catalog file (CATALOG_PATH)
+    - The application's catalog dictionaries (see MoodCatalog)
+
+    Args:
+        mood_key (str): Normalized mood identifier
+
+    Returns:
+        str | None: Playlist ID, or None if the mood is not in the catalog
+    """
+    catalog = current_app.extensions.get("catalog")
+    if catalog is not None:
+        return catalog.playlist_id(mood_key)
+    return current_app.extensions["mood_catalog"].playlists.get(mood_key)
+
+
+def client_time_suggestions():
+    """
+    Time-based suggestions for the requesting client.
+
+    The client's timezone is taken from the ``tz`` (IANA name) or
+    ``tz_offset`` (getTimezoneOffset minutes) query parameter, falling back
+    to cookies of the same names set by the frontend. Popularity from the
+    analytics snapshot is blended in when analytics is enabled.
+
+    Returns:
+        list: Three suggested mood keys
+    """
+    tz = request.args.get("tz") or request.cookies.get("tz")
+    tz_offset = request.args.get("tz_offset", type=int)
+    if tz_offset is None:
+        try:
+            tz_offset = int(request.cookies["tz_offset"])
+        except (KeyError, ValueError):
+            tz_offset = None
+
+    analytics = current_app.extensions.get("analytics")
+    popular = popular_moods_by_hour(analytics.snapshot()) if analytics else None
+    return get_time_based_suggestions(tz, tz_offset, popular)
+
+
 # ====================================================================
 # FLASK ROUTES - WEB APPLICATION ENDPOINTS
 # ====================================================================
 
 
-@app.route("/")
 def index():
     """
     Main application homepage route.
@@ -268,18 +436,19 @@ def index():
         - recent_moods: User's last 3 selected moods
         - time_suggestions: 3 moods appropriate for current time
         - get_mood_info: Helper function for mood display
+        - cover_art_enabled: Whether search cards show playlist covers
     """
     # Retrieve user's recent mood history from session storage
     # Session persists across requests for same user
     recent_moods = session.get("recent_moods", [])
 
-    # Disable time-based suggestions as per user request
-    time_suggestions = []
+    # Time-based suggestions stay off unless explicitly enabled (per user request)
+    time_suggestions = client_time_suggestions() if current_app.config["TIME_SUGGESTIONS_ENABLED"] else []
 
     # Prepare comprehensive data package for template rendering
     # All data is processed for immediate template consumption
     template_data = {
-        "mood_categories": mood_categories,  # Complete mood organization structure
+        "mood_categories": current_app.extensions["mood_catalog"].categories,  # Complete mood organization structure
         "recent_moods": [
             get_mood_display_info(mood) for mood in reversed(recent_moods[-3:])
         ],  # Last 3 moods in reverse order (most recent first)
@@ -288,13 +457,13 @@ def index():
         ],  # Current time suggestions with display info
         "get_mood_info": get_mood_display_info,  # Helper function for template use
         "version_info": BUILD_INFO,  # Application version information
+        "cover_art_enabled": "cover_art" in current_app.extensions,  # Search cards request /cover/<mood>
     }
 
     # Render main template with all mood data
     return render_template("index.html", **template_data)
 
 
-@app.route("/get-playlist", methods=["POST"])
 def get_playlist():
     """
     Retrieve Spotify playlist for a specific mood.
@@ -312,6 +481,7 @@ def get_playlist():
                 - playlist (str): Direct Spotify web URL
                 - embed_url (str): Spotify embed URL for web players
                 - mood (str): Confirmed mood key
+                - next_moods (list): Suggested follow-up moods (key, name, icon)
             Error (400):
                 - error (str): "Mood is required" or "Invalid mood selected"
             Error (500):
@@ -328,23 +498,24 @@ def get_playlist():
     """
     try:
         # Input Validation and Sanitization
-        # Extract mood from form data, normalize to lowercase
-        mood = request.form.get("mood", "").strip().lower()
+        # Extract mood from form data; Unicode-normalized ("ＨＡＰＰＹ!" -> "happy", see normalizer.py)
+        mood = normalize_mood_key(request.form.get("mood", ""))
+        mood = current_app.extensions["mood_aliases"].get(mood, mood)  # Catalog key spelled as stored
 
         # Validate that mood parameter is provided
         if not mood:
-            app.logger.warning("Empty mood parameter received")
+            current_app.logger.warning("Empty mood parameter received")
             return jsonify({"error": "Mood is required"}), 400
 
+        # Spotify URL Generation
+        # Get the curated playlist ID for this mood (None if it is not in the catalog)
+        playlist_id = lookup_playlist_id(mood)
+
         # Validate that mood exists in our curated playlist collection
-        if mood not in mood_playlists:
-            app.logger.warning(f"Invalid mood requested: {mood}")
+        if playlist_id is None:
+            current_app.logger.warning(f"Invalid mood requested: {mood}")
             return jsonify({"error": "Invalid mood selected"}), 400
 
-        # Spotify URL Generation
-        # Get the curated playlist ID for this mood
-        playlist_id = mood_playlists.get(mood)
-
         # Generate Spotify embed URL for in-app playback
         # utm_source and theme parameters optimize the embed experience
         embed_url = f"https://open.spotify.com/embed/playlist/{playlist_id}?utm_source=generator&theme=0"
@@ -356,6 +527,11 @@ def get_playlist():
         # Retrieve current recent moods list from user session
         recent_moods = session.get("recent_moods", [])
 
+        # Learn from the ordered history before it is reshuffled below
+        recommender = current_app.extensions.get("recommender")
+        if recommender:
+            recommender.observe(list(recent_moods), mood)
+
         # Remove mood if it already exists (to move it to end)
         if mood in recent_moods:
             recent_moods.remove(mood)
@@ -366,8 +542,16 @@ def get_playlist():
         # Maintain only last 5 moods to prevent session bloat
         session["recent_moods"] = recent_moods[-5:]
 
+        # Per-mood, per-hour popularity counts (in memory; flushed to SQLite in bulk)
+        analytics = current_app.extensions.get("analytics")
+        if analytics:
+            analytics.record(mood)
+
         # Success logging for monitoring and analytics
-        app.logger.info(f"Successfully served playlist for mood: {mood}")
+        current_app.logger.info(f"Successfully served playlist for mood: {mood}")
+
+        # "People who chose this mood next chose..." (empty until enough history exists)
+        next_moods = recommender.suggest(mood) if recommender else []
 
         # Return structured JSON response with all playlist information
         return jsonify(
@@ -375,12 +559,13 @@ def get_playlist():
                 "playlist": web_url,  # Direct Spotify link
                 "embed_url": embed_url,  # Embeddable player URL
                 "mood": mood,  # Confirmed mood for client verification
+                "next_moods": [get_mood_display_info(m) for m in next_moods],  # Recommended follow-ups
             }
         )
 
     except Exception as e:
         # Comprehensive error handling and logging
-        app.logger.error(f"Error in get_playlist: {str(e)}")
+        current_app.logger.error(f"Error in get_playlist: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
 
@@ -479,7 +664,246 @@ mood_metadata = {
 }
 
 
-@app.route("/search-playlists", methods=["POST"])
+# The catalog an application serves: the dictionaries above, or the ones decoded from a
+# compiled catalog file (CATALOG_PATH). Every index and view reads it from
+# app.extensions["mood_catalog"], so a compiled file is the single source of truth.
+MoodCatalog = namedtuple("MoodCatalog", "playlists metadata categories")
+
+
+# Largest page a client may request from /search-playlists
+SEARCH_MAX_LIMIT = 100
+
+
+def build_search_result(mood_key, terms=None):
+    """
+    Build the search result object for one mood.
+
+    Args:
+        mood_key (str): Internal mood identifier
+        terms (tuple, optional): Query and synonym expansions to highlight
+
+    Returns:
+        dict: mood_key, name, description, category, embed_url, web_url, icon,
+            plus highlights when terms are given (see HighlightIndex.spans)
+    """
+    # Get rich metadata for this mood (name, description, keywords, category)
+    catalog = current_app.extensions["mood_catalog"]
+    mood_info = catalog.metadata.get(mood_key, {})
+    playlist_id = catalog.playlists[mood_key]
+
+    result = {
+        "mood_key": mood_key,  # Internal identifier
+        "name": mood_info.get("name", mood_key.title()),  # Human-readable name
+        "description": mood_info.get("description", f"{mood_key.title()} playlist"),  # Descriptive text
+        "category": mood_info.get("category", "Other"),  # Mood grouping
+        "embed_url": f"https://open.spotify.com/embed/playlist/{playlist_id}?utm_source=generator&theme=0",  # Embeddable
+        "web_url": f"https://open.spotify.com/playlist/{playlist_id}",  # Direct Spotify URL
+        "icon": get_mood_display_info(mood_key)["icon"],  # Visual emoji representation
+    }
+    if terms:
+        # Offsets come from token positions recorded at startup, not from re-scanning the strings
+        result["highlights"] = current_app.extensions["highlights"].spans(mood_key, terms)
+    return result
+
+
+def semantic_fallback(query, page, found, deadline=None):
+    """
+    Semantic matches for a query whose lexical search found too few hits.
+
+    Only the first page is topped up, and only when fewer than
+    SEMANTIC_MIN_RESULTS moods matched lexically (see semantic.py).
+
+    Args:
+        query (str): Normalized search query
+        page (SearchPage | RankedPage): Fully iterated lexical page
+        found (list): Mood keys already returned lexically
+        deadline (SearchDeadline, optional): Skip the stage (marking the
+            search partial) if the budget is already spent
+
+    Returns:
+        list: Additional mood keys, most similar first
+    """
+    index = current_app.extensions.get("semantic_index")
+    if index is None or page.start or page.total >= current_app.config["SEMANTIC_MIN_RESULTS"]:
+        return []
+    if deadline is not None and deadline.expired():
+        deadline.partial = True
+        return []
+    with deadline.stage("semantic") if deadline is not None else nullcontext():
+        matches = index.search(
+            query,
+            k=current_app.config["SEMANTIC_TOP_K"],
+            min_similarity=current_app.config["SEMANTIC_MIN_SIMILARITY"],
+            exclude=found,
+        )
+    # Semantic matches honour the category filter too
+    positions = current_app.extensions["facets"].positions
+    return [
+        mood_key for mood_key, _similarity in matches if page.allowed is None or bit_is_set(page.allowed, positions[mood_key])
+    ]
+
+
+def build_semantic_result(mood_key):
+    """Search result object for a semantic match, marked with ``"match": "semantic"``."""
+    result = build_search_result(mood_key)
+    result["match"] = "semantic"
+    return result
+
+
+def search_results(query, page, deadline, terms=None, exact=None):
+    """
+    Run the search stages in order and generate result objects.
+
+    Stages: the exact-key lookup (already done by the caller, passed as
+    ``exact``), the lexical page, then the semantic fallback. Each is timed
+    on the deadline. If the lexical scan was cut short, the exact match is
+    added when the scan had not reached it, so a timed-out search still
+    returns the best hit; ``next_cursor`` then tells the resumed scan to
+    skip it. A match the scan already counted is left to its own page.
+
+    Args:
+        query (str): Normalized search query
+        page (SearchPage | RankedPage): Lazily evaluated page of matches
+        deadline (SearchDeadline): Budget shared by all stages
+        terms (tuple, optional): Query and expansions to highlight
+        exact (str, optional): Mood key equal to the query
+
+    Yields:
+        dict: Result objects; semantic ones carry "match": "semantic"
+    """
+    found = []
+    with deadline.stage("relevance" if isinstance(page, RankedPage) else "lexical"):
+        for mood_key in page:
+            found.append(mood_key)
+            yield build_search_result(mood_key, terms)
+    if deadline.partial and exact is not None and exact not in found and not page.start:
+        position = current_app.extensions["facets"].positions[exact]
+        # Moods before resume_at were scanned: counted already, and on a later page if past the limit
+        scanned = deadline.resume_at is not None and position < deadline.resume_at
+        if not scanned and (page.allowed is None or bit_is_set(page.allowed, position)):
+            found.append(exact)
+            page.total += 1
+            if page.next_cursor is not None:
+                page.next_cursor = encode_cursor(parse_cursor(page.next_cursor)[0], skip=position)
+            yield build_search_result(exact, terms)
+
+    for mood_key in semantic_fallback(query, page, found, deadline):
+        yield build_semantic_result(mood_key)
+
+
+def track_matches(query, page, deadline):
+    """
+    Songs and artists matching the query, grouped by mood (see track_index.py).
+
+    Only the first page carries track matches. The index picks up playlists
+    re-ingested by the worker at most every TRACK_INDEX_REFRESH_INTERVAL
+    seconds (one stat() per playlist). Skipped, marking the search partial,
+    once the deadline has expired.
+
+    Args:
+        query (str): Normalized search query
+        page (SearchPage | RankedPage): The mood page (for its start and category filter)
+        deadline (SearchDeadline): Budget shared by all stages
+
+    Returns:
+        list: Groups {"mood_key", "name", "icon", "total", "tracks": [...]},
+            moods with the most matching tracks first
+    """
+    index = current_app.extensions.get("track_index")
+    if index is None or page.start:
+        return []
+    if deadline.expired():
+        deadline.partial = True
+        return []
+
+    interval = current_app.config["TRACK_INDEX_REFRESH_INTERVAL"]
+    if index.refreshed_at is None or time.monotonic() - index.refreshed_at >= interval:
+        index.refresh(current_app.extensions["track_cache"], current_app.extensions["playlist_moods"])
+    if not len(index):
+        return []  # Nothing ingested yet
+
+    with deadline.stage("tracks"):
+        positions = current_app.extensions["facets"].positions
+        groups = []
+        matches = index.search(query, per_playlist=current_app.config["TRACK_MATCHES_PER_MOOD"])
+        for playlist_id, (total, tracks) in matches.items():
+            for mood_key in current_app.extensions["playlist_moods"].get(playlist_id, ()):
+                if page.allowed is not None and not bit_is_set(page.allowed, positions[mood_key]):
+                    continue
+                display = get_mood_display_info(mood_key)
+                groups.append(
+                    {
+                        "mood_key": mood_key,
+                        "name": display["name"],
+                        "icon": display["icon"],
+                        "total": total,  # Matching tracks in this playlist
+                        "tracks": [
+                            {
+                                "id": track.track_id,
+                                "title": track.title,
+                                "artists": list(track.artists),
+                                "duration_ms": track.duration_ms,
+                            }
+                            for track in tracks
+                        ],
+                    }
+                )
+        return groups
+
+
+def stream_search_results(query, page, with_facets=False, terms=None, deadline=None, exact=None):
+    """
+    Generate an NDJSON search response, one line per match as it is found.
+
+    The deadline is paused while the generator is suspended at a ``yield``,
+    so a slow client does not eat into the search budget.
+
+    Lines:
+        {"type": "mood", "mood": {...}} for each result on the page,
+        {"type": "tracks", "group": {...}} for each mood with matching songs, then
+        {"type": "end", "success": true, "query": ..., "total": ..., "next_cursor": ...,
+        "partial": ..., "timings": {...}} (plus "facets" when requested)
+        or {"type": "error", "success": false, "error": "Search failed"} if matching fails
+
+    Args:
+        query (str): Normalized search query
+        page (SearchPage | RankedPage): Lazily evaluated page of matches
+        with_facets (bool): Add category facet counts to the end line
+        terms (tuple, optional): Query and expansions to highlight in each mood
+        deadline (SearchDeadline, optional): Request budget (unlimited when omitted)
+        exact (str, optional): Mood key equal to the query (see search_results)
+    """
+    deadline = deadline or SearchDeadline()
+    semantic = 0
+    try:
+        for mood in search_results(query, page, deadline, terms, exact):
+            semantic += mood.get("match") == "semantic"
+            with deadline.paused():
+                yield json.dumps({"type": "mood", "mood": mood}) + "\n"
+        for group in track_matches(query, page, deadline):
+            with deadline.paused():
+                yield json.dumps({"type": "tracks", "group": group}) + "\n"
+    except Exception as e:
+        current_app.logger.error(f"Error streaming search results: {str(e)}")
+        yield json.dumps({"type": "error", "success": False, "error": "Search failed"}) + "\n"
+        return
+
+    total = page.total + semantic
+    current_app.logger.info(f"Playlist search for '{query}' streamed {total} results")
+    end = {
+        "type": "end",
+        "success": True,
+        "query": query,
+        "total": total,
+        "next_cursor": page.next_cursor,
+        "partial": deadline.partial,
+        "timings": deadline.timings,
+    }
+    if with_facets:
+        end["facets"] = {"category": current_app.extensions["facets"].counts(page.match_bitmap)}
+    yield json.dumps(end) + "\n"
+
+
 def search_playlists():
     """
     Advanced search through curated mood playlists.
@@ -490,6 +914,15 @@ def search_playlists():
 
     POST Parameters:
         query (str): Search term (minimum 2 characters)
+        limit (int, optional): Page size, 1-SEARCH_MAX_LIMIT (default: all results)
+        cursor (str, optional): next_cursor from the previous page
+        sort (str, optional): "relevance" to rank by weighted field matches
+            (see search_scorer.py) instead of catalog order
+        category (str, optional, repeatable): Only return moods in these
+            categories (any of them)
+        facets (str, optional): "1" to include per-category match counts
+        format (str, optional): "ndjson" to stream results (also selected by
+            Accept: application/x-ndjson); see stream_search_results()
 
     Returns:
         JSON Response:
@@ -498,6 +931,18 @@ def search_playlists():
                 - query (str): Original search query
                 - moods (list): Array of matching mood objects
                 - total (int): Number of results found
+                - track_matches (list): Moods whose cached playlist tracks match
+                  the query by title or artist (first page only), each
+                  {"mood_key", "name", "icon", "total", "tracks": [{"id", "title", "artists", "duration_ms"}]}
+                - next_cursor (str | None): With limit, None on the last page;
+                  without limit, only present when the deadline cut the scan short
+                - facets (dict): Only with facets=1; {"category": {name: count}}
+                - partial (bool): True if SEARCH_DEADLINE_MS expired before every
+                  stage finished; results are the best found so far (the
+                  exact-key match is always included) and next_cursor
+                  resumes a cut-short catalog scan
+                - timings (dict): Milliseconds spent per stage
+                  (exact, lexical or relevance, semantic, tracks)
             Error (400):
                 - success (bool): False
                 - error (str): Validation error message
@@ -513,18 +958,25 @@ def search_playlists():
         - embed_url (str): Spotify embed URL
         - web_url (str): Direct Spotify URL
         - icon (str): Emoji representation
+        - match (str): "semantic" on offline semantic fallback results only
+        - highlights (dict): Lexical results only; matched character spans,
+          {"name": [[start, end]], "description": [...], "keywords": [[index, start, end]]}
 
     Search Algorithm:
         - Searches mood names (exact and partial matches)
         - Searches descriptions for contextual matches
         - Searches keyword arrays for semantic matches
         - Case-insensitive matching throughout
-        - Returns results sorted by relevance
+        - Queries and catalog fields share one Unicode normalization (normalizer.py):
+          "ＨＡＰＰＹ", "Café" and "chill!!" match like "happy", "cafe" and "chill"
+        - Returns results in catalog order, generated lazily
+        - Expands the query and each of its words with compiled synonyms
+        - Falls back to hashed n-gram similarity when nothing matches lexically
     """
     try:
         # Input Processing and Validation
-        # Extract and normalize search query
-        query = request.form.get("query", "").strip().lower()
+        # Extract and normalize search query: NFKC, casefold, accent and punctuation folding (memoized)
+        query = normalize_query(request.form.get("query", ""))
 
         # Validate query presence
         if not query:
@@ -534,73 +986,323 @@ def search_playlists():
         if len(query) < 2:
             return jsonify({"success": False, "error": "Query must be at least 2 characters"}), 400
 
-        # Advanced Multi-Field Search Algorithm
-        # Search across multiple data sources for comprehensive results
-        matching_moods = []
-
-        # Iterate through all available mood playlists
-        for mood_key, playlist_id in mood_playlists.items():
-            # Get rich metadata for this mood (name, description, keywords, category)
-            mood_info = mood_metadata.get(mood_key, {})
-
-            # Multi-field Fuzzy Matching Algorithm
-            # Check query against multiple mood attributes for comprehensive matching
-            matches = (
-                query in mood_key.lower()
-                or query in mood_info.get("name", "").lower()  # Direct mood key match
-                or query in mood_info.get("description", "").lower()  # Display name match
-                or any(  # Description content match
-                    query in keyword.lower() for keyword in mood_info.get("keywords", [])
-                )  # Keyword semantic match
+        # Pagination: without a limit every match is returned (original behaviour)
+        limit = request.values.get("limit", type=int)
+        if limit is not None and not 1 <= limit <= SEARCH_MAX_LIMIT:
+            return jsonify({"success": False, "error": f"limit must be between 1 and {SEARCH_MAX_LIMIT}"}), 400
+        try:
+            start, skip = parse_cursor(request.values["cursor"]) if request.values.get("cursor") else (0, None)
+        except ValueError:
+            return jsonify({"success": False, "error": "Invalid cursor"}), 400
+
+        # Category facets: filters are precomputed bitsets, counts are popcounts (see FacetIndex)
+        facet_index = current_app.extensions["facets"]
+        with_facets = request.values.get("facets") in ("1", "true", "category")
+        try:
+            categories = request.values.getlist("category")
+            allowed = facet_index.allowed(categories) if categories else None
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        # Request time budget shared by all stages; cheaper stages run first
+        deadline = SearchDeadline(current_app.config["SEARCH_DEADLINE_MS"] / 1000)
+
+        # Stage 1: exact mood key (one dict lookup), kept even if later stages time out
+        with deadline.stage("exact"):
+            exact = current_app.extensions["mood_aliases"].get(normalize_mood_key(query))
+
+        # Stage 2: Advanced Multi-Field Search Algorithm
+        # Matches are generated lazily (see search_engine.py); only this page becomes result objects
+        # Synonym expansion is a precompiled dict lookup per word (see synonyms.py)
+        expander = current_app.extensions.get("query_expander")
+        expansions = expander.expand(query) if expander else ()
+        terms = (query, *expansions)
+        if request.values.get("sort") == "relevance":
+            scorer = current_app.extensions["search_scorer"]
+            page = RankedPage(
+                scorer, query, start=start, limit=limit, expansions=expansions, allowed=allowed, deadline=deadline
             )
+        else:
+            search_metadata = current_app.extensions["search_metadata"]
+            playlists = current_app.extensions["mood_catalog"].playlists
+            matches = iter_matches(query, playlists, search_metadata, expansions, deadline=deadline)
+            catalog_size = facet_index.size if with_facets else None
+            page = SearchPage(
+                matches, start=start, limit=limit, allowed=allowed, catalog_size=catalog_size, deadline=deadline, skip=skip
+            )
+
+        if request.values.get("format") == "ndjson" or request.accept_mimetypes.best == "application/x-ndjson":
+            stream = stream_search_results(query, page, with_facets, terms, deadline, exact)
+            return Response(stream_with_context(stream), mimetype="application/x-ndjson")
 
-            # Build result object for matching moods
-            if matches:
-                # Generate Spotify URLs for this playlist
-                embed_url = f"https://open.spotify.com/embed/playlist/{playlist_id}?utm_source=generator&theme=0"
-                web_url = f"https://open.spotify.com/playlist/{playlist_id}"
-
-                # Construct comprehensive mood result object
-                mood_result = {
-                    "mood_key": mood_key,  # Internal identifier
-                    "name": mood_info.get("name", mood_key.title()),  # Human-readable name
-                    "description": mood_info.get("description", f"{mood_key.title()} playlist"),  # Descriptive text
-                    "category": mood_info.get("category", "Other"),  # Mood grouping
-                    "embed_url": embed_url,  # Embeddable Spotify URL
-                    "web_url": web_url,  # Direct Spotify URL
-                    "icon": get_mood_display_info(mood_key)["icon"],  # Visual emoji representation
-                }
-
-                matching_moods.append(mood_result)
+        # Stage 3 (inside search_results): offline semantic fallback when the lexical search finds too few hits
+        matching_moods = list(search_results(query, page, deadline, terms, exact))
+        total = page.total + sum(mood.get("match") == "semantic" for mood in matching_moods)
+
+        # Stage 4: songs and artists inside the playlists (inverted index over cached tracks)
+        tracks = track_matches(query, page, deadline)
 
         # Search Analytics and Logging
         # Log search query and result count for usage analytics
-        app.logger.info(f"Playlist search for '{query}' returned {len(matching_moods)} results")
+        current_app.logger.info(f"Playlist search for '{query}' returned {total} results")
 
         # Return Structured Search Results
         # Provide comprehensive response with query echo and result metadata
-        return jsonify(
-            {
-                "success": True,  # Operation success indicator
-                "query": query,  # Echo original query for client verification
-                "moods": matching_moods,  # Array of matching mood objects
-                "total": len(matching_moods),  # Result count for pagination/UI
-            }
-        )
+        result = {
+            "success": True,  # Operation success indicator
+            "query": query,  # Echo original query for client verification
+            "moods": matching_moods,  # Array of matching mood objects (this page)
+            "total": total,  # Result count across all pages
+            "track_matches": tracks,  # Moods whose playlists contain matching songs (first page)
+            "partial": deadline.partial,  # True if the time budget cut a stage short
+            "timings": deadline.timings,  # Milliseconds per stage
+        }
+        if limit is not None or page.next_cursor is not None:
+            # None on the last page; also sent unpaginated when the deadline left the result incomplete
+            result["next_cursor"] = page.next_cursor
+        if with_facets:
+            # Counts ignore the category filter so clients can show every facet option
+            result["facets"] = {"category": facet_index.counts(page.match_bitmap)}
+        return jsonify(result)
 
     except Exception as e:
         # Comprehensive Error Handling
         # Log error details for debugging while providing safe user message
-        app.logger.error(f"Error in search_playlists: {str(e)}")
+        current_app.logger.error(f"Error in search_playlists: {str(e)}")
         return jsonify({"success": False, "error": "Search failed"}), 500
 
 
+def time_suggestions():
+    """
+    Mood suggestions for the client's current local time.
+
+    Query Parameters:
+        tz (str): IANA timezone name, e.g. "America/New_York"
+        tz_offset (int): Alternative to tz, JavaScript getTimezoneOffset() minutes
+
+    Returns:
+        JSON Response:
+            Success (200):
+                - success (bool): True
+                - moods (list): Suggested moods (key, name, icon)
+    """
+    return jsonify({"success": True, "moods": [get_mood_display_info(m) for m in client_time_suggestions()]})
+
+
+def recommendations(mood):
+    """
+    Mood recommendations learned from users' recent-mood histories.
+
+    URL Parameters:
+        mood (str): Mood key to get recommendations for
+
+    Query Parameters:
+        k (int): Maximum number of moods per list (default: 3)
+
+    Returns:
+        JSON Response:
+            Success (200):
+                - success (bool): True
+                - mood (str): Requested mood key
+                - next (list): Moods most often chosen right after this one
+                - related (list): Moods most often chosen in the same session
+            Error (400):
+                - error (str): "Invalid mood selected"
+            Error (404):
+                - error (str): "Recommendations disabled"
+    """
+    recommender = current_app.extensions.get("recommender")
+    if recommender is None:
+        return jsonify({"success": False, "error": "Recommendations disabled"}), 404
+
+    mood = current_app.extensions["mood_aliases"].get(normalize_mood_key(mood))
+    if mood is None or lookup_playlist_id(mood) is None:
+        return jsonify({"success": False, "error": "Invalid mood selected"}), 400
+
+    k = min(max(request.args.get("k", 3, type=int), 1), 10)
+    return jsonify(
+        {
+            "success": True,
+            "mood": mood,
+            "next": [get_mood_display_info(m) for m in recommender.next_moods(mood, k)],
+            "related": [get_mood_display_info(m) for m in recommender.related_moods(mood, k)],
+        }
+    )
+
+
+def playlist_tracks(mood):
+    """
+    Track list of a mood's playlist, served from the local track cache.
+
+    Tracks are fetched from Spotify by the ingestion worker
+    (spotify_ingest.py), never during a request; entries past their TTL
+    are still served, flagged stale, until the next ingestion run. Decoded
+    entries are shared through a CoalescingCache (coalescing_cache.py), so
+    a burst of requests for one mood reads its cache file once.
+
+    URL Parameters:
+        mood (str): Mood key
+
+    Returns:
+        JSON Response:
+            Success (200):
+                - success (bool): True
+                - mood (str): Mood key
+                - playlist_id (str): Spotify playlist ID
+                - fetched_at (float): Unix time of the last ingestion
+                - stale (bool): True if older than TRACK_CACHE_TTL
+                - total_duration_ms (int): Sum of track durations
+                - tracks (list): {"id", "title", "artists", "duration_ms"} in playlist order
+            Error (400):
+                - error (str): "Invalid mood selected"
+            Error (404):
+                - error (str): "Tracks not ingested yet"
+    """
+    mood = current_app.extensions["mood_aliases"].get(normalize_mood_key(mood))
+    playlist_id = lookup_playlist_id(mood) if mood else None
+    if playlist_id is None:
+        return jsonify({"success": False, "error": "Invalid mood selected"}), 400
+
+    cache = current_app.extensions["track_cache"]
+    entry = current_app.extensions["track_lookup"].get((playlist_id, cache.mtime(playlist_id)))
+    if entry is None:
+        return jsonify({"success": False, "error": "Tracks not ingested yet"}), 404
+
+    return jsonify(
+        {
+            "success": True,
+            "mood": mood,
+            "playlist_id": playlist_id,
+            "fetched_at": entry.fetched_at,
+            "stale": not cache.is_fresh(entry),
+            "total_duration_ms": sum(track.duration_ms for track in entry.tracks),
+            "tracks": [
+                {"id": track.track_id, "title": track.title, "artists": list(track.artists), "duration_ms": track.duration_ms}
+                for track in entry.tracks
+            ],
+        }
+    )
+
+
+# Browsers may reuse a /cover/<mood> redirect this long (seconds); the files it points to never change
+COVER_REDIRECT_MAX_AGE = 3600
+
+# Content-addressed cover files: the name changes whenever the bytes do
+COVER_FILE_MAX_AGE = 365 * 24 * 3600
+
+
+def cover(mood):
+    """
+    Cover art of a mood's playlist, as a redirect to an immutable file.
+
+    The first request for a mood fetches the cover upstream (see
+    cover_art.py); later ones are answered from memory. The redirect
+    target is named by the hash of the image, so it is cached forever by
+    browsers and the service worker, while this URL stays short-lived.
+
+    URL Parameters:
+        mood (str): Mood key
+
+    Query Parameters:
+        size (int): Wanted width/height in pixels; the smallest configured
+            size at least this big is used (default: the largest)
+
+    Returns:
+        Redirect (302): To /covers/<sha256>.jpg
+        JSON Response:
+            Error (400):
+                - error (str): "Invalid mood selected"
+            Error (404):
+                - error (str): "Cover art disabled"
+            Error (502):
+                - error (str): "Cover art unavailable" (upstream failed and
+                  nothing was cached)
+    """
+    art = current_app.extensions.get("cover_art")
+    if art is None:
+        return jsonify({"success": False, "error": "Cover art disabled"}), 404
+
+    mood = current_app.extensions["mood_aliases"].get(normalize_mood_key(mood))
+    playlist_id = lookup_playlist_id(mood) if mood else None
+    if playlist_id is None:
+        return jsonify({"success": False, "error": "Invalid mood selected"}), 400
+
+    try:
+        name = art.variant(playlist_id, request.args.get("size", type=int))
+    except Exception as e:
+        current_app.logger.warning(f"Cover art for '{mood}' unavailable: {str(e)}")
+        return jsonify({"success": False, "error": "Cover art unavailable"}), 502
+
+    response = redirect(url_for("cover_file", name=name))
+    response.headers["Cache-Control"] = f"public, max-age={COVER_REDIRECT_MAX_AGE}"
+    return response
+
+
+def cover_file(name):
+    """
+    Serve a stored cover variant with immutable cache headers.
+
+    URL Parameters:
+        name (str): "<sha256>.<extension>" from a /cover/<mood> redirect
+
+    Returns:
+        Response: The image (ETag is its hash; If-None-Match answers 304)
+        Error (404): Unknown or evicted file
+    """
+    art = current_app.extensions.get("cover_art")
+    if art is None or art.store.path(name) is None:  # path() also rejects names BlobStore never hands out
+        return jsonify({"success": False, "error": "Cover not found"}), 404
+
+    response = send_from_directory(art.store.directory, name, etag=name.split(".")[0], max_age=COVER_FILE_MAX_AGE)
+    response.headers["Cache-Control"] = f"public, max-age={COVER_FILE_MAX_AGE}, immutable"
+    return response
+
+
+# ====================================================================
+# ANALYTICS
+# ====================================================================
+
+
+def popular_stats():
+    """
+    Most popular moods from the cached analytics snapshot.
+
+    The snapshot is rebuilt by the analytics flush thread, so this endpoint
+    never queries the database on the request path.
+
+    Query Parameters:
+        limit (int): Maximum number of moods to return (default: 10)
+
+    Returns:
+        JSON Response:
+            Success (200):
+                - success (bool): True
+                - generated_at (str | None): When the snapshot was built (UTC)
+                - window_hours (int): Lookback window of the counts
+                - moods (list): [{"mood": str, "count": int}] most popular first
+                - by_hour_utc (dict): {hour of day: {mood: count}}
+            Error (404):
+                - error (str): "Analytics disabled"
+    """
+    analytics = current_app.extensions.get("analytics")
+    if analytics is None:
+        return jsonify({"success": False, "error": "Analytics disabled"}), 404
+
+    try:
+        limit = max(request.args.get("limit", 10, type=int), 0)
+        snapshot = analytics.snapshot()
+        return jsonify({"success": True, **snapshot, "moods": snapshot["moods"][:limit]})
+
+    except Exception as e:
+        current_app.logger.error(f"Error in popular_stats: {str(e)}")
+        return jsonify({"success": False, "error": "Internal server error"}), 500
+
+
 # ====================================================================
 # PROGRESSIVE WEB APP SUPPORT
 # ====================================================================
 
 
-@app.route("/version")
 def version_info():
     """
     Get application version and build information.
@@ -616,11 +1318,13 @@ def version_info():
             "commit": "latest",
             "status": "production"
         }
+
+    Served from memory (see static_cache.py): BUILD_INFO is serialized
+    once at startup, and If-None-Match/If-Modified-Since answer 304.
     """
-    return jsonify(BUILD_INFO)
+    return current_app.extensions["static_responses"]["version"].respond(request)
 
 
-@app.route("/static/service-worker.js")
 def service_worker():
     """
     Serve service worker file with proper PWA headers.
@@ -640,23 +1344,17 @@ def service_worker():
 
     Note:
         Service worker must be served from same origin with proper headers
-        to be registered by browsers for security reasons.
+        to be registered by browsers for security reasons. The file is held
+        in memory with a precomputed ETag and gzip variant (see
+        static_cache.py) and reloaded when it changes on disk.
     """
-    from flask import send_from_directory
+    # Headers (Content-Type, Service-Worker-Allowed) are attached by the StaticResource
+    resource = current_app.extensions["static_responses"].get("service_worker")
+    if resource is None:
+        return jsonify({"success": False, "error": "Not found"}), 404
+    return resource.respond(request)
 
-    # Serve service worker file from static directory
-    response = send_from_directory("static", "service-worker.js")
 
-    # Set proper MIME type for JavaScript file
-    response.headers["Content-Type"] = "application/javascript"
-
-    # Allow service worker to control entire application scope
-    response.headers["Service-Worker-Allowed"] = "/"
-
-    return response
-
-
-@app.route("/manifest.json")
 def manifest():
     """
     Serve PWA manifest file from root path for better discoverability.
@@ -672,19 +1370,404 @@ def manifest():
 
     Note:
         Manifest should be accessible from root for optimal PWA support
-        and browser compatibility.
+        and browser compatibility. Served from memory like the service
+        worker (see static_cache.py).
     """
-    from flask import send_from_directory
+    resource = current_app.extensions["static_responses"].get("manifest")
+    if resource is None:
+        return jsonify({"success": False, "error": "Not found"}), 404
+    return resource.respond(request)
 
-    # Serve manifest file from static directory
-    response = send_from_directory("static", "manifest.json")
 
-    # Set proper MIME type for PWA manifest
-    response.headers["Content-Type"] = "application/manifest+json"
+# ====================================================================
+# RATE LIMITING
+# ====================================================================
+
+# Endpoints that spend a rate limit token (see rate_limiter.py)
+RATE_LIMITED_ENDPOINTS = frozenset({"get_playlist", "search_playlists"})
 
+
+def rate_limit_key():
+    """
+    Identify the client a request is counted against.
+
+    Returns:
+        str: "session:<id>" when RATE_LIMIT_BY is "session", otherwise
+            "ip:<address>" (the client address; behind a proxy this
+            needs TRUST_PROXY, otherwise every visitor shares the proxy's bucket)
+    """
+    if current_app.config["RATE_LIMIT_BY"] == "session":
+        if "client_id" not in session:
+            session["client_id"] = os.urandom(8).hex()
+        return f"session:{session['client_id']}"
+    return f"ip:{request.remote_addr}"
+
+
+def enforce_rate_limit():
+    """
+    before_request hook: reject clients that exceeded their rate limit.
+
+    Returns:
+        None to continue, or a 429 JSON response with Retry-After
+    """
+    if request.endpoint not in RATE_LIMITED_ENDPOINTS:
+        return None
+
+    result = current_app.extensions["rate_limiter"].hit(rate_limit_key())
+    g.rate_limit = result
+    if result.allowed:
+        return None
+
+    current_app.logger.warning(f"Rate limit exceeded for {request.endpoint} from {request.remote_addr}")
+    return jsonify({"success": False, "error": "Too many requests, please slow down"}), 429
+
+
+def add_rate_limit_headers(response):
+    """after_request hook: attach RateLimit-* (and Retry-After) headers to limited endpoints."""
+    result = g.get("rate_limit")
+    if result is not None:
+        response.headers.update(result.headers())
     return response
 
 
+startup_profile.mark("catalog")
+
+# ====================================================================
+# APPLICATION FACTORY
+# ====================================================================
+
+
+def configure_app(flask_app, config=None):
+    """
+    Apply production configuration to a Flask instance.
+
+    Args:
+        flask_app (Flask): Application to configure
+        config (dict, optional): Overrides applied after the defaults (e.g. for tests)
+    """
+    # Security Configuration
+    # Use environment variable for secret key in production, fallback for development
+    flask_app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "your-secret-key-change-in-production")
+
+    # Production Security Configurations
+    # These settings ensure secure session handling and prevent common web vulnerabilities
+    flask_app.config["SESSION_COOKIE_SECURE"] = True  # Force HTTPS-only cookies (prevents man-in-the-middle attacks)
+    flask_app.config["SESSION_COOKIE_HTTPONLY"] = True  # Prevent XSS attacks by blocking JavaScript access to cookies
+    flask_app.config["SESSION_COOKIE_SAMESITE"] = "Lax"  # CSRF protection while allowing legitimate cross-site requests
+
+    # Reverse proxies in front of the app (Render: 1). Their X-Forwarded-For/-Proto entries are
+    # trusted through ProxyFix so request.remote_addr is the real client, not the proxy (0 = none)
+    flask_app.config["TRUST_PROXY"] = int(os.environ.get("MOODTUNES_TRUST_PROXY", "0"))
+
+    # Compiled binary catalog to memory-map instead of the built-in dictionaries
+    # (build one with: python catalog_format.py catalog.bin)
+    flask_app.config["CATALOG_PATH"] = os.environ.get("MOODTUNES_CATALOG_PATH")
+
+    # Mood analytics (see analytics.py); the database defaults to the instance folder
+    flask_app.config["ANALYTICS_ENABLED"] = os.environ.get("MOODTUNES_ANALYTICS", "1") == "1"
+    flask_app.config["ANALYTICS_DB"] = os.environ.get(
+        "MOODTUNES_ANALYTICS_DB", os.path.join(flask_app.instance_path, "analytics.sqlite3")
+    )
+    flask_app.config["ANALYTICS_FLUSH_INTERVAL"] = float(os.environ.get("MOODTUNES_ANALYTICS_FLUSH_INTERVAL", "30"))
+
+    # Time-of-day suggestions on the homepage (disabled by default per user request;
+    # the /suggestions endpoint is always available)
+    flask_app.config["TIME_SUGGESTIONS_ENABLED"] = os.environ.get("MOODTUNES_TIME_SUGGESTIONS", "0") == "1"
+
+    # Token-bucket rate limiting for the POST endpoints (see rate_limiter.py)
+    # The memory backend limits per worker; "sqlite" shares buckets across workers
+    flask_app.config["RATE_LIMIT_ENABLED"] = os.environ.get("MOODTUNES_RATE_LIMIT", "1") == "1"
+    flask_app.config["RATE_LIMIT_RATE"] = float(os.environ.get("MOODTUNES_RATE_LIMIT_RATE", "2"))  # Tokens per second
+    flask_app.config["RATE_LIMIT_BURST"] = int(os.environ.get("MOODTUNES_RATE_LIMIT_BURST", "60"))
+    flask_app.config["RATE_LIMIT_BY"] = os.environ.get("MOODTUNES_RATE_LIMIT_BY", "ip")  # "ip" or "session"
+    flask_app.config["RATE_LIMIT_BACKEND"] = os.environ.get("MOODTUNES_RATE_LIMIT_BACKEND", "memory")
+    flask_app.config["RATE_LIMIT_DB"] = os.environ.get(
+        "MOODTUNES_RATE_LIMIT_DB", os.path.join(flask_app.instance_path, "ratelimit.sqlite3")
+    )
+
+    # Relevance scorer for sort=relevance searches: "python", "numpy" or "auto"
+    # ("auto" uses NumPy from SEARCH_NUMPY_THRESHOLD moods, see scripts/benchmark_search.py)
+    flask_app.config["SEARCH_SCORER"] = os.environ.get("MOODTUNES_SEARCH_SCORER", "auto")
+    flask_app.config["SEARCH_NUMPY_THRESHOLD"] = int(os.environ.get("MOODTUNES_SEARCH_NUMPY_THRESHOLD", "1000"))
+
+    # Time budget per search request in milliseconds (0 = unlimited); see SearchDeadline
+    flask_app.config["SEARCH_DEADLINE_MS"] = float(os.environ.get("MOODTUNES_SEARCH_DEADLINE_MS", "200"))
+
+    # Synonym graph for query expansion: built-in graph or a JSON file (see synonyms.py)
+    flask_app.config["SYNONYMS_ENABLED"] = os.environ.get("MOODTUNES_SYNONYMS", "1") == "1"
+    flask_app.config["SYNONYMS_PATH"] = os.environ.get("MOODTUNES_SYNONYMS_PATH")
+    flask_app.config["SYNONYMS_MAX_DEPTH"] = int(os.environ.get("MOODTUNES_SYNONYMS_MAX_DEPTH", "2"))
+
+    # Offline semantic fallback for searches with too few lexical hits (see semantic.py, requires NumPy)
+    flask_app.config["SEMANTIC_SEARCH_ENABLED"] = os.environ.get("MOODTUNES_SEMANTIC_SEARCH", "1") == "1"
+    flask_app.config["SEMANTIC_MIN_RESULTS"] = int(os.environ.get("MOODTUNES_SEMANTIC_MIN_RESULTS", "1"))
+    flask_app.config["SEMANTIC_MIN_SIMILARITY"] = float(os.environ.get("MOODTUNES_SEMANTIC_MIN_SIMILARITY", "0.1"))
+    flask_app.config["SEMANTIC_TOP_K"] = int(os.environ.get("MOODTUNES_SEMANTIC_TOP_K", "3"))
+
+    # Co-occurrence recommender (see recommender.py, requires NumPy)
+    flask_app.config["RECOMMENDER_ENABLED"] = os.environ.get("MOODTUNES_RECOMMENDER", "1") == "1"
+
+    # Playlist track cache filled by the ingestion worker (see spotify_ingest.py, track_cache.py)
+    flask_app.config["TRACK_CACHE_DIR"] = os.environ.get(
+        "MOODTUNES_TRACK_CACHE_DIR", os.path.join(flask_app.instance_path, "tracks")
+    )
+    flask_app.config["TRACK_CACHE_TTL"] = float(os.environ.get("MOODTUNES_TRACK_CACHE_TTL", str(24 * 3600)))
+
+    # Track-level search index over the cache (see track_index.py)
+    flask_app.config["TRACK_INDEX_REFRESH_INTERVAL"] = float(os.environ.get("MOODTUNES_TRACK_INDEX_REFRESH_INTERVAL", "60"))
+    flask_app.config["TRACK_MATCHES_PER_MOOD"] = int(os.environ.get("MOODTUNES_TRACK_MATCHES_PER_MOOD", "5"))
+
+    # Seconds between checks for edits to the in-memory manifest and service worker (0 = never)
+    flask_app.config["STATIC_RELOAD_INTERVAL"] = float(os.environ.get("MOODTUNES_STATIC_RELOAD_INTERVAL", "2"))
+
+    # Thread pools of the ASGI entry point (see asgi.py); unused under gunicorn's sync workers
+    flask_app.config["ASGI_IO_THREADS"] = int(os.environ.get("MOODTUNES_ASGI_IO_THREADS", "32"))
+    flask_app.config["ASGI_CPU_THREADS"] = int(os.environ.get("MOODTUNES_ASGI_CPU_THREADS", str(os.cpu_count() or 1)))
+
+    # Playlist cover proxy with resized variants in a size-bounded disk cache (see cover_art.py)
+    # Off by default: a cold cover costs two blocking upstream fetches, which would hold one of the
+    # two sync workers per search card; enable it when serving asgi:application (see asgi.py)
+    flask_app.config["COVER_ART_ENABLED"] = os.environ.get("MOODTUNES_COVER_ART", "0") == "1"
+    flask_app.config["COVER_ART_UPSTREAM"] = os.environ.get("MOODTUNES_COVER_ART_UPSTREAM", "https://open.spotify.com/oembed")
+    flask_app.config["COVER_ART_DIR"] = os.environ.get(
+        "MOODTUNES_COVER_ART_DIR", os.path.join(flask_app.instance_path, "covers")
+    )
+    flask_app.config["COVER_ART_MAX_BYTES"] = int(os.environ.get("MOODTUNES_COVER_ART_MAX_BYTES", str(64 * 1024 * 1024)))
+    flask_app.config["COVER_ART_SIZES"] = [
+        int(size) for size in os.environ.get("MOODTUNES_COVER_ART_SIZES", "64,160,300").split(",")
+    ]
+    flask_app.config["COVER_ART_TTL"] = float(os.environ.get("MOODTUNES_COVER_ART_TTL", str(24 * 3600)))
+
+    if config:
+        flask_app.config.update(config)
+
+
+def configure_logging():
+    """
+    Production Logging Configuration.
+
+    Structured logging for monitoring and debugging in production environments.
+    basicConfig is a no-op once the root logger has handlers, so repeated
+    create_app() calls do not stack handlers.
+    """
+    logging.basicConfig(
+        level=logging.INFO,  # INFO level provides good balance of detail vs. noise
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",  # Timestamp + level + logger + message
+    )
+
+
+def register_routes(flask_app):
+    """
+    Attach all MoodTunes endpoints to a Flask instance.
+
+    View functions live at module level so they can be imported and tested
+    directly; the factory decides which application they are bound to.
+    """
+    flask_app.add_url_rule("/", view_func=index)
+    flask_app.add_url_rule("/get-playlist", view_func=get_playlist, methods=["POST"])
+    flask_app.add_url_rule("/search-playlists", view_func=search_playlists, methods=["POST"])
+    flask_app.add_url_rule("/suggestions", view_func=time_suggestions)
+    flask_app.add_url_rule("/recommendations/<mood>", view_func=recommendations)
+    flask_app.add_url_rule("/tracks/<mood>", view_func=playlist_tracks)
+    flask_app.add_url_rule("/cover/<mood>", view_func=cover)
+    flask_app.add_url_rule("/covers/<name>", view_func=cover_file)
+    flask_app.add_url_rule("/stats/popular", view_func=popular_stats)
+    flask_app.add_url_rule("/version", view_func=version_info)
+    flask_app.add_url_rule("/static/service-worker.js", view_func=service_worker)
+    flask_app.add_url_rule("/manifest.json", view_func=manifest)
+
+
+def create_app(config=None, profiler=None):
+    """
+    Create and configure a MoodTunes Flask application.
+
+    Args:
+        config (dict, optional): Configuration overrides (e.g. {"TESTING": True})
+        profiler (StartupProfiler, optional): Profiler to record startup phases in;
+            a fresh one is used when omitted
+
+    Returns:
+        Flask: Fully configured application with all routes registered
+
+    Startup Profile:
+        Phase timings are stored in ``app.extensions["startup_profile"]`` and
+        logged once at INFO level.
+    """
+    profiler = profiler or StartupProfiler()
+
+    with profiler.phase("logging"):
+        configure_logging()
+
+    with profiler.phase("flask"):
+        flask_app = Flask(__name__)
+
+    with profiler.phase("config"):
+        configure_app(flask_app, config)
+        if flask_app.config["TRUST_PROXY"]:
+            hops = flask_app.config["TRUST_PROXY"]
+            flask_app.wsgi_app = ProxyFix(flask_app.wsgi_app, x_for=hops, x_proto=hops)
+
+    with profiler.phase("routes"):
+        register_routes(flask_app)
+
+    catalog = MoodCatalog(mood_playlists, mood_metadata, mood_categories)
+    if flask_app.config["CATALOG_PATH"]:
+        with profiler.phase("catalog_file"):
+            from catalog_format import CatalogReader  # Lazy: only needed when configured
+
+            reader = flask_app.extensions["catalog"] = CatalogReader.open(flask_app.config["CATALOG_PATH"])
+            # Decoded before any index is built, so search, facets and recommendations see the file's moods
+            catalog = MoodCatalog(*reader.to_dicts())
+    flask_app.extensions["mood_catalog"] = catalog
+
+    if flask_app.config["ANALYTICS_ENABLED"]:
+        with profiler.phase("analytics"):
+            from analytics import MoodAnalytics  # Lazy: only needed when enabled
+
+            analytics = MoodAnalytics(
+                flask_app.config["ANALYTICS_DB"], flush_interval=flask_app.config["ANALYTICS_FLUSH_INTERVAL"]
+            )
+            flask_app.extensions["analytics"] = analytics  # Flushes remaining counts at exit once it has recorded any
+
+    with profiler.phase("normalizer"):
+        # Searchable fields normalized once, the same way as queries (see normalizer.py)
+        search_metadata = normalize_metadata(catalog.metadata)
+        flask_app.extensions["search_metadata"] = search_metadata
+        flask_app.extensions["mood_aliases"] = {normalize_mood_key(mood_key): mood_key for mood_key in catalog.playlists}
+
+    if flask_app.config["SYNONYMS_ENABLED"]:
+        with profiler.phase("synonyms"):
+            import synonyms  # Lazy: only needed when enabled
+
+            graph = (
+                synonyms.load_synonym_graph(flask_app.config["SYNONYMS_PATH"])
+                if flask_app.config["SYNONYMS_PATH"]
+                else synonyms.DEFAULT_SYNONYM_GRAPH
+            )
+            flask_app.extensions["query_expander"] = synonyms.QueryExpander.for_catalog(
+                graph, catalog.playlists, search_metadata, max_depth=flask_app.config["SYNONYMS_MAX_DEPTH"]
+            )
+
+    with profiler.phase("facets"):
+        flask_app.extensions["facets"] = FacetIndex(catalog.playlists, catalog.categories)
+
+    with profiler.phase("highlights"):
+        flask_app.extensions["highlights"] = HighlightIndex(catalog.playlists, catalog.metadata)
+
+    with profiler.phase("search_scorer"):
+        from search_scorer import create_scorer  # Lazy: may pull in NumPy
+
+        flask_app.extensions["search_scorer"] = create_scorer(
+            catalog.playlists,
+            search_metadata,
+            engine=flask_app.config["SEARCH_SCORER"],
+            numpy_threshold=flask_app.config["SEARCH_NUMPY_THRESHOLD"],
+        )
+
+    if flask_app.config["SEMANTIC_SEARCH_ENABLED"]:
+        with profiler.phase("semantic_index"):
+            import semantic  # Lazy: pulls in NumPy
+
+            if semantic.NUMPY_AVAILABLE:
+                flask_app.extensions["semantic_index"] = semantic.SemanticIndex(catalog.playlists, search_metadata)
+            else:
+                flask_app.logger.warning("NumPy not installed - semantic search fallback disabled")
+
+    if flask_app.config["RATE_LIMIT_ENABLED"]:
+        with profiler.phase("rate_limiter"):
+            import rate_limiter  # Lazy: only needed when enabled
+
+            rate, burst = flask_app.config["RATE_LIMIT_RATE"], flask_app.config["RATE_LIMIT_BURST"]
+            if flask_app.config["RATE_LIMIT_BACKEND"] == "sqlite":
+                limiter = rate_limiter.SQLiteRateLimiter(flask_app.config["RATE_LIMIT_DB"], rate, burst)
+            else:
+                limiter = rate_limiter.TokenBucketLimiter(rate, burst)
+            flask_app.extensions["rate_limiter"] = limiter
+            flask_app.before_request(enforce_rate_limit)
+            flask_app.after_request(add_rate_limit_headers)
+
+    if flask_app.config["RECOMMENDER_ENABLED"]:
+        with profiler.phase("recommender"):
+            import recommender  # Lazy: pulls in NumPy
+
+            if recommender.NUMPY_AVAILABLE:
+                flask_app.extensions["recommender"] = recommender.MoodRecommender(catalog.playlists)
+            else:
+                flask_app.logger.warning("NumPy not installed - mood recommendations disabled")
+
+    with profiler.phase("track_cache"):
+        from track_cache import TrackCache
+
+        track_cache = flask_app.extensions["track_cache"] = TrackCache(
+            flask_app.config["TRACK_CACHE_DIR"], ttl=flask_app.config["TRACK_CACHE_TTL"]
+        )
+
+        from coalescing_cache import CoalescingCache
+
+        # Decoded track lists, keyed by (playlist ID, cache file mtime): a re-ingested playlist
+        # gets a new key, so entries never expire and concurrent misses decode the file once
+        flask_app.extensions["track_lookup"] = CoalescingCache(
+            lambda key: track_cache.get(key[0], allow_stale=True), ttl=None, max_entries=2 * len(catalog.playlists)
+        )
+
+    with profiler.phase("track_index"):
+        from track_index import TrackIndex
+
+        playlist_moods = {}
+        for mood_key, playlist_id in catalog.playlists.items():
+            playlist_moods.setdefault(playlist_id, []).append(mood_key)
+        flask_app.extensions["playlist_moods"] = playlist_moods
+        track_index = TrackIndex()
+        track_index.refresh(flask_app.extensions["track_cache"], playlist_moods)
+        flask_app.extensions["track_index"] = track_index
+
+    with profiler.phase("static_responses"):
+        from static_cache import StaticResource
+
+        # PWA resources polled on every launch, held in memory with precomputed ETags
+        static_responses = {
+            "version": StaticResource.from_bytes(flask_app.json.response(BUILD_INFO).get_data(), "application/json")
+        }
+        for name, filename, content_type, headers in (
+            ("manifest", "manifest.json", "application/manifest+json", None),
+            ("service_worker", "service-worker.js", "application/javascript", {"Service-Worker-Allowed": "/"}),
+        ):
+            try:
+                static_responses[name] = StaticResource.from_file(
+                    os.path.join(flask_app.static_folder, filename),
+                    content_type,
+                    headers,
+                    reload_interval=flask_app.config["STATIC_RELOAD_INTERVAL"],
+                )
+            except OSError:
+                flask_app.logger.warning(f"{filename} not found - not served")
+        flask_app.extensions["static_responses"] = static_responses
+
+    if flask_app.config["COVER_ART_ENABLED"]:
+        with profiler.phase("cover_art"):
+            import cover_art  # Lazy: pulls in requests and Pillow
+
+            if cover_art.REQUESTS_AVAILABLE:
+                flask_app.extensions["cover_art"] = cover_art.CoverArt(
+                    cover_art.BlobStore(flask_app.config["COVER_ART_DIR"], flask_app.config["COVER_ART_MAX_BYTES"]),
+                    upstream_url=flask_app.config["COVER_ART_UPSTREAM"],
+                    sizes=flask_app.config["COVER_ART_SIZES"],
+                    ttl=flask_app.config["COVER_ART_TTL"],
+                    pool_size=flask_app.config["ASGI_IO_THREADS"],  # A keep-alive connection per ASGI I/O thread
+                )
+                if not cover_art.PILLOW_AVAILABLE:
+                    flask_app.logger.warning("Pillow not installed - covers served at upstream size")
+            else:
+                flask_app.logger.warning("requests not installed - cover art disabled")
+
+    flask_app.extensions["startup_profile"] = profiler
+    flask_app.logger.info(profiler.format_report())
+    return flask_app
+
+
+# Default application instance used by gunicorn (app:app) and the test suite
+app = create_app(profiler=startup_profile)
+
 # ====================================================================
 # APPLICATION ENTRY POINT
 # ====================================================================
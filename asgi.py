@@ -0,0 +1,227 @@
+"""
+ASGI Entry Point for MoodTunes PWA
+
+Under the default deployment (``gunicorn app:app``, 2 sync workers) a
+request waiting on an upstream (cover art from Spotify, a cold track
+cache read) holds one of only two workers, so a slow upstream stalls
+search and playlist requests too. This module serves the same Flask app
+from an asyncio event loop instead:
+
+- the event loop accepts and reads every connection, so slow clients and
+  waiting requests cost no worker
+- I/O-bound endpoints (IO_BOUND_ENDPOINTS) run on a large thread pool
+  (``ASGI_IO_THREADS``, default 32): they mostly wait, so many of them can
+  be in flight at once
+- everything else, the CPU-bound catalog lookups and search, stays
+  synchronous on a pool sized to the CPU count (``ASGI_CPU_THREADS``), so
+  an upstream backlog never queues in front of it and CPU work is not
+  oversubscribed
+
+Views are unchanged and called through WSGI, so both deployments run the
+same code and Flask's async-view extra is not needed. Cover art, the main
+I/O-bound feature, is off by default because of the sync deployment; set
+MOODTUNES_COVER_ART=1 when serving this module.
+
+Usage:
+    MOODTUNES_COVER_ART=1 uvicorn asgi:application --host 0.0.0.0 --port $PORT --workers 2
+    gunicorn -k uvicorn.workers.UvicornWorker asgi:application
+
+See scripts/benchmark_asgi.py for a comparison with the sync deployment.
+"""
+
+import io
+import os
+import sys
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import HTTPException
+
+# Endpoints that mostly wait on upstreams or the disk rather than the CPU
+IO_BOUND_ENDPOINTS = frozenset({"cover", "cover_file", "playlist_tracks"})
+
+# Marks the end of a WSGI response iterator
+_END = object()
+
+
+class ASGIApplication:
+    """
+    ASGI 3 application running a WSGI app on two thread pools.
+
+    Args:
+        wsgi_app (Flask): Application to serve
+        io_threads (int): Threads for IO_BOUND_ENDPOINTS
+        cpu_threads (int, optional): Threads for every other endpoint (default: CPU count)
+        io_endpoints (iterable): Endpoint names to run on the I/O pool
+    """
+
+    def __init__(self, wsgi_app, io_threads=32, cpu_threads=None, io_endpoints=IO_BOUND_ENDPOINTS):
+        self.wsgi_app = wsgi_app
+        self.io_endpoints = frozenset(io_endpoints)
+        self.io_pool = ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix="asgi-io")
+        self.cpu_pool = ThreadPoolExecutor(max_workers=cpu_threads or os.cpu_count() or 1, thread_name_prefix="asgi-cpu")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            raise ValueError(f"unsupported ASGI scope type {scope['type']!r}")
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        environ = build_environ(scope, bytes(body))
+        pool = self.pool_for(environ)
+        loop = asyncio.get_running_loop()
+        # Every step of one request runs in the same context, whichever pool thread picks it up:
+        # streamed responses set Flask's context variables in one step and reset them in a later one
+        context = contextvars.copy_context()
+        try:
+            status, headers, chunk, iterator, result = await loop.run_in_executor(pool, context.run, self._start, environ)
+        except Exception:
+            # Nothing was sent yet: answer 500, then re-raise so the server logs the error
+            await send({"type": "http.response.start", "status": 500, "headers": [(b"content-type", b"text/plain")]})
+            await send({"type": "http.response.body", "body": b"Internal Server Error"})
+            raise
+
+        # Streamed responses stop being pulled once the client goes away
+        disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            # Streamed responses (NDJSON search) are pulled one chunk at a time off the loop
+            while chunk is not _END and not disconnected.done():
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                chunk = await loop.run_in_executor(pool, context.run, next, iterator, _END)
+            if not disconnected.done():
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            disconnected.cancel()
+            if hasattr(result, "close"):
+                await loop.run_in_executor(pool, context.run, result.close)
+
+    def pool_for(self, environ):
+        """Thread pool for a request: the I/O pool for IO_BOUND_ENDPOINTS, else the CPU pool."""
+        try:
+            endpoint, _args = self.wsgi_app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            return self.cpu_pool  # 404/405 answered by Flask
+        return self.io_pool if endpoint in self.io_endpoints else self.cpu_pool
+
+    def _start(self, environ):
+        """Call the WSGI app and read the first chunk (runs on a pool thread)."""
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            iterator = iter(result)
+            chunk = next(iterator, _END)  # Generators may only call start_response once iterated
+            if "status" not in response:
+                raise RuntimeError("WSGI application returned without calling start_response")
+        except BaseException:
+            if hasattr(result, "close"):
+                result.close()
+            raise
+        return response["status"], response["headers"], chunk, iterator, result
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def close(self):
+        """Stop the thread pools (running requests finish first)."""
+        self.io_pool.shutdown(wait=True)
+        self.cpu_pool.shutdown(wait=True)
+
+
+async def wait_for_disconnect(receive):
+    """Return once the client has disconnected (the request body is already read)."""
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def build_environ(scope, body):
+    """
+    PEP 3333 environ for an ASGI HTTP scope.
+
+    Args:
+        scope (dict): ASGI HTTP connection scope
+        body (bytes): Complete request body
+
+    Returns:
+        dict: WSGI environ
+    """
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": scope["client"][0] if scope.get("client") else "",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name, value = raw_name.decode("latin-1").upper().replace("-", "_"), raw_value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[name] = value
+            continue
+        key = f"HTTP_{name}"
+        if key in environ:
+            value = environ[key] + ("; " if key == "HTTP_COOKIE" else ",") + value
+        environ[key] = value
+    return environ
+
+
+def create_asgi_app(flask_app=None):
+    """
+    Wrap a MoodTunes Flask app for an ASGI server.
+
+    Args:
+        flask_app (Flask, optional): Application to serve (default: the module-level app.app)
+
+    Returns:
+        ASGIApplication: Sized by the app's ASGI_IO_THREADS and ASGI_CPU_THREADS
+    """
+    if flask_app is None:
+        from app import app as flask_app
+
+    return ASGIApplication(
+        flask_app, io_threads=flask_app.config["ASGI_IO_THREADS"], cpu_threads=flask_app.config["ASGI_CPU_THREADS"]
+    )
+
+
+application = create_asgi_app()
+
+if __name__ == "__main__":
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("uvicorn is not installed (pip install uvicorn); any ASGI server can serve asgi:application")
+
+    uvicorn.run(application, host="0.0.0.0", port=int(os.environ.get("PORT", 5000)))
@@ -0,0 +1,412 @@
+"""
+Compact Binary Catalog Format for MoodTunes PWA
+
+A versioned, read-only file format for the mood catalog that can be
+memory-mapped and queried in place. Nothing is parsed at load time, so
+opening even a very large catalog is near-instant, and every process that maps
+the same file shares its pages through the OS page cache.
+
+File Layout (little-endian, every section 8-byte aligned):
+    header        magic, version, element counts, section offsets
+    string index  uint32 x (strings + 1) offsets into the string blob
+    string blob   UTF-8 bytes of every distinct (interned) string
+    moods         fixed-width mood records in catalog order
+    keywords      uint32 string ids referenced by mood records
+    sorted        uint32 mood positions ordered by mood key (binary search)
+    categories    fixed-width category records, each followed by a bitset
+                  of ceil(moods / 8) bytes over catalog positions
+    terms         fixed-width term records ordered by term bytes
+    postings      uint32 mood positions (term and category member lists)
+
+Usage:
+    python catalog_format.py catalog.bin    # compile the built-in catalog to a file
+"""
+
+import os
+import re
+import mmap
+import struct
+
+MAGIC = b"MTCAT\0"
+FORMAT_VERSION = 1
+
+# magic, version, then counts: strings, moods, categories, terms, keyword ids, postings, bitset bytes;
+# then offsets: string index, string blob, moods, keywords, sorted, categories, terms, postings, end
+HEADER = struct.Struct("<6sH7I9I")
+# key, name, description, playlist (string ids), category index, keyword count, first keyword id
+MOOD_RECORD = struct.Struct("<IIIIHHI")
+# name, icon, description (string ids), first member posting, member count
+CATEGORY_RECORD = struct.Struct("<IIIII")
+# term (string id), first posting, posting count
+TERM_RECORD = struct.Struct("<III")
+
+NO_CATEGORY = 0xFFFF
+TOKEN_PATTERN = re.compile(r"[\w-]+")
+
+
+class CatalogFormatError(ValueError):
+    """Raised when a buffer is not a readable MoodTunes catalog."""
+
+
+def _align(size, boundary=8):
+    return (size + boundary - 1) // boundary * boundary
+
+
+def catalog_terms(mood_key, metadata):
+    """Return the lowercase terms a mood is indexed under (whole keywords and words)."""
+    terms = {mood_key.lower()}
+    for keyword in metadata.get("keywords", []):
+        terms.add(keyword.lower())
+        terms.update(TOKEN_PATTERN.findall(keyword.lower()))
+    for field in ("name", "description"):
+        terms.update(TOKEN_PATTERN.findall(metadata.get(field, "").lower()))
+    return terms
+
+
+# ====================================================================
+# COMPILER
+# ====================================================================
+
+
+def compile_catalog(mood_playlists, mood_metadata, mood_categories=None):
+    """
+    Compile the catalog dictionaries into the binary format.
+
+    Args:
+        mood_playlists (dict): mood key -> Spotify playlist ID (defines catalog order)
+        mood_metadata (dict): mood key -> {name, description, keywords, category}
+        mood_categories (dict, optional): category name -> {moods, icon, description}
+
+    Returns:
+        bytes: The compiled catalog
+    """
+    mood_categories = mood_categories or {}
+    mood_keys = list(mood_playlists)
+    positions = {mood_key: position for position, mood_key in enumerate(mood_keys)}
+
+    strings = {}  # Interned string table: text -> string id
+
+    def intern(text):
+        if text not in strings:
+            strings[text] = len(strings)
+        return strings[text]
+
+    category_names = list(mood_categories)
+    for name in (mood_metadata.get(key, {}).get("category") for key in mood_keys):
+        if name and name not in category_names:
+            category_names.append(name)
+    category_index = {name: index for index, name in enumerate(category_names)}
+
+    # Mood records and their keyword id lists
+    moods = bytearray()
+    keyword_ids = []
+    for mood_key in mood_keys:
+        info = mood_metadata.get(mood_key, {})
+        keywords = [intern(keyword) for keyword in info.get("keywords", [])]
+        moods += MOOD_RECORD.pack(
+            intern(mood_key),
+            intern(info.get("name", mood_key.title())),
+            intern(info.get("description", "")),
+            intern(mood_playlists[mood_key]),
+            category_index.get(info.get("category"), NO_CATEGORY),
+            len(keywords),
+            len(keyword_ids),
+        )
+        keyword_ids.extend(keywords)
+
+    sorted_positions = sorted(range(len(mood_keys)), key=lambda i: mood_keys[i].encode("utf-8"))
+
+    # Categories: member list (display order) + bitset over catalog positions
+    postings = []
+    bitset_bytes = (len(mood_keys) + 7) // 8
+    categories = bytearray()
+    for name in category_names:
+        info = mood_categories.get(name, {})
+        members = [positions[key] for key in info.get("moods", []) if key in positions]
+        if not members:
+            members = [positions[key] for key in mood_keys if mood_metadata.get(key, {}).get("category") == name]
+        bitset = 0
+        for position in members:
+            bitset |= 1 << position
+        categories += CATEGORY_RECORD.pack(
+            intern(name), intern(info.get("icon", "")), intern(info.get("description", "")), len(postings), len(members)
+        )
+        categories += bitset.to_bytes(bitset_bytes, "little")
+        postings.extend(members)
+
+    # Term index
+    term_postings = {}
+    for mood_key in mood_keys:
+        for term in catalog_terms(mood_key, mood_metadata.get(mood_key, {})):
+            term_postings.setdefault(term, []).append(positions[mood_key])
+    terms = bytearray()
+    for term in sorted(term_postings, key=lambda t: t.encode("utf-8")):
+        terms += TERM_RECORD.pack(intern(term), len(postings), len(term_postings[term]))
+        postings.extend(term_postings[term])
+
+    # String table
+    blob = bytearray()
+    string_offsets = []
+    for text in strings:  # dicts preserve insertion order == string id order
+        string_offsets.append(len(blob))
+        blob += text.encode("utf-8")
+    string_offsets.append(len(blob))
+
+    sections = [
+        struct.pack(f"<{len(string_offsets)}I", *string_offsets),
+        bytes(blob),
+        bytes(moods),
+        struct.pack(f"<{len(keyword_ids)}I", *keyword_ids),
+        struct.pack(f"<{len(sorted_positions)}I", *sorted_positions),
+        bytes(categories),
+        bytes(terms),
+        struct.pack(f"<{len(postings)}I", *postings),
+    ]
+
+    body = bytearray()
+    offsets = []
+    cursor = HEADER.size
+    for section in sections:
+        padding = _align(cursor) - cursor
+        body += bytes(padding)
+        cursor += padding
+        offsets.append(cursor)
+        body += section
+        cursor += len(section)
+    offsets.append(cursor)
+
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        len(strings),
+        len(mood_keys),
+        len(category_names),
+        len(term_postings),
+        len(keyword_ids),
+        len(postings),
+        bitset_bytes,
+        *offsets,
+    )
+    return header + bytes(body)
+
+
+def write_catalog(path, mood_playlists, mood_metadata, mood_categories=None):
+    """Compile the catalog and write it atomically to ``path``."""
+    data = compile_catalog(mood_playlists, mood_metadata, mood_categories)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return len(data)
+
+
+# ====================================================================
+# READER
+# ====================================================================
+
+
+class CatalogReader:
+    """
+    Zero-copy reader over a compiled catalog buffer.
+
+    Works on any object exposing the buffer protocol: a memory-mapped file
+    (``CatalogReader.open``) or plain bytes. Strings
+    are decoded on access; nothing is materialized up front.
+    """
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer)
+        if len(self._view) < HEADER.size:
+            raise CatalogFormatError("Buffer too small for a catalog header")
+        fields = HEADER.unpack_from(self._view, 0)
+        magic, version = fields[0], fields[1]
+        if magic != MAGIC:
+            raise CatalogFormatError("Not a MoodTunes catalog")
+        if version != FORMAT_VERSION:
+            raise CatalogFormatError(f"Unsupported catalog version {version} (expected {FORMAT_VERSION})")
+        (
+            self.string_count,
+            self.mood_count,
+            self.category_count,
+            self.term_count,
+            self._keyword_id_count,
+            self._posting_count,
+            self._bitset_bytes,
+        ) = fields[2:9]
+        (
+            self._string_index_off,
+            self._string_blob_off,
+            self._moods_off,
+            self._keywords_off,
+            self._sorted_off,
+            self._categories_off,
+            self._terms_off,
+            self._postings_off,
+            self.size,
+        ) = fields[9:]
+        if len(self._view) < self.size:
+            raise CatalogFormatError("Catalog buffer is truncated")
+        self._mmap = None
+        self._file = None
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a compiled catalog file read-only."""
+        f = open(path, "rb")
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            f.close()
+            raise
+        reader = cls(mapped)
+        reader._mmap, reader._file = mapped, f
+        return reader
+
+    def close(self):
+        """Release the buffer (and the mapping, when opened from a file)."""
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+
+    # ----------------------------------------------------------------
+    # Low-level accessors
+    # ----------------------------------------------------------------
+
+    def _uint32(self, offset, index):
+        return struct.unpack_from("<I", self._view, offset + index * 4)[0]
+
+    def _string_bytes(self, string_id):
+        start, end = struct.unpack_from("<II", self._view, self._string_index_off + string_id * 4)
+        return self._view[self._string_blob_off + start : self._string_blob_off + end]
+
+    def string(self, string_id):
+        """Decode string ``string_id`` from the interned string table."""
+        return str(self._string_bytes(string_id), "utf-8")
+
+    def _mood_record(self, position):
+        return MOOD_RECORD.unpack_from(self._view, self._moods_off + position * MOOD_RECORD.size)
+
+    def _category_offset(self, index):
+        return self._categories_off + index * (CATEGORY_RECORD.size + self._bitset_bytes)
+
+    def _postings(self, start, count):
+        return struct.unpack_from(f"<{count}I", self._view, self._postings_off + start * 4)
+
+    # ----------------------------------------------------------------
+    # Moods
+    # ----------------------------------------------------------------
+
+    def position(self, mood_key):
+        """Return the catalog position of ``mood_key`` (binary search), or None."""
+        target = mood_key.encode("utf-8")
+        low, high = 0, self.mood_count
+        while low < high:
+            middle = (low + high) // 2
+            position = self._uint32(self._sorted_off, middle)
+            candidate = bytes(self._string_bytes(self._mood_record(position)[0]))
+            if candidate == target:
+                return position
+            if candidate < target:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def mood_key(self, position):
+        return self.string(self._mood_record(position)[0])
+
+    def mood_keys(self):
+        """Return all mood keys in catalog order."""
+        return [self.mood_key(position) for position in range(self.mood_count)]
+
+    def playlist_id(self, mood_key):
+        """Return the Spotify playlist ID for ``mood_key``, or None if unknown."""
+        position = self.position(mood_key)
+        return None if position is None else self.string(self._mood_record(position)[3])
+
+    def mood_at(self, position):
+        """Decode the metadata dict of the mood at ``position``."""
+        _, name_id, desc_id, _, category, keyword_count, keyword_start = self._mood_record(position)
+        info = {
+            "name": self.string(name_id),
+            "description": self.string(desc_id),
+            "keywords": [self.string(self._uint32(self._keywords_off, keyword_start + i)) for i in range(keyword_count)],
+        }
+        if category != NO_CATEGORY:
+            info["category"] = self.string(CATEGORY_RECORD.unpack_from(self._view, self._category_offset(category))[0])
+        return info
+
+    def metadata(self, mood_key):
+        """Return the metadata dict for ``mood_key``, or None if unknown."""
+        position = self.position(mood_key)
+        return None if position is None else self.mood_at(position)
+
+    # ----------------------------------------------------------------
+    # Categories and terms
+    # ----------------------------------------------------------------
+
+    def category_names(self):
+        return [
+            self.string(CATEGORY_RECORD.unpack_from(self._view, self._category_offset(i))[0])
+            for i in range(self.category_count)
+        ]
+
+    def category_bitset(self, name):
+        """Return the category's membership bitset over catalog positions as an int (0 if unknown)."""
+        for index in range(self.category_count):
+            offset = self._category_offset(index)
+            if self.string(CATEGORY_RECORD.unpack_from(self._view, offset)[0]) == name:
+                start = offset + CATEGORY_RECORD.size
+                return int.from_bytes(self._view[start : start + self._bitset_bytes], "little")
+        return 0
+
+    def postings(self, term):
+        """Return the catalog positions indexed under ``term`` (lowercase), in catalog order."""
+        target = term.lower().encode("utf-8")
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            term_id, start, count = TERM_RECORD.unpack_from(self._view, self._terms_off + middle * TERM_RECORD.size)
+            candidate = bytes(self._string_bytes(term_id))
+            if candidate == target:
+                return self._postings(start, count)
+            if candidate < target:
+                low = middle + 1
+            else:
+                high = middle
+        return ()
+
+    def to_dicts(self):
+        """
+        Materialize the catalog back into the dictionaries used by app.py.
+
+        Returns:
+            tuple: (mood_playlists, mood_metadata, mood_categories)
+        """
+        mood_playlists, mood_metadata = {}, {}
+        for position in range(self.mood_count):
+            record = self._mood_record(position)
+            key = self.string(record[0])
+            mood_playlists[key] = self.string(record[3])
+            mood_metadata[key] = self.mood_at(position)
+
+        mood_categories = {}
+        for index in range(self.category_count):
+            name_id, icon_id, desc_id, start, count = CATEGORY_RECORD.unpack_from(self._view, self._category_offset(index))
+            mood_categories[self.string(name_id)] = {
+                "moods": [self.mood_key(position) for position in self._postings(start, count)],
+                "icon": self.string(icon_id),
+                "description": self.string(desc_id),
+            }
+        return mood_playlists, mood_metadata, mood_categories
+
+
+if __name__ == "__main__":
+    import sys
+
+    from app import mood_playlists, mood_metadata, mood_categories
+
+    output = sys.argv[1] if len(sys.argv) > 1 else "catalog.bin"
+    size = write_catalog(output, mood_playlists, mood_metadata, mood_categories)
+    print(f"✅ Wrote {output} ({size} bytes, {len(mood_playlists)} moods)")
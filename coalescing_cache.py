@@ -0,0 +1,244 @@
+"""
+Request Coalescing Cache for Upstream Lookups
+
+Lookups keyed by playlist ID (track lists, cover art) are requested by
+many clients at once, so a naive cache stampedes its upstream whenever a
+popular entry expires. CoalescingCache puts three guards in front of any
+``fetch(key)`` function:
+
+- single flight: concurrent misses for the same key share one in-flight
+  fetch; every waiter gets its result (or its exception)
+- stale-while-revalidate: an entry older than ``ttl`` but younger than
+  ``ttl + stale_ttl`` is served immediately while one background thread
+  refreshes it; older entries are refetched before answering
+- circuit breaker: after ``failure_threshold`` consecutive fetch failures
+  the upstream is left alone for ``reset_timeout`` seconds, then a single
+  trial fetch decides whether to close the circuit again. While fetches
+  fail or the circuit is open, the last good value is served; only keys
+  that never loaded raise (the fetch's exception, or CircuitOpenError)
+
+Entries are kept in LRU order up to ``max_entries``; last good values are
+only dropped by that eviction, so they outlive ``stale_ttl`` as fallbacks.
+"""
+
+import time
+import threading
+from collections import Counter, OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# fetched_at: clock() when the value was fetched
+_Entry = namedtuple("_Entry", "value fetched_at")
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit is open and the key has no last good value."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one upstream.
+
+    States: "closed" (calls allowed), "open" (calls refused until
+    ``reset_timeout`` has passed) and "half_open" (one trial call allowed;
+    its outcome closes or re-opens the circuit).
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the circuit
+        reset_timeout (float): Seconds the circuit stays open
+        clock (callable): Monotonic time source (injectable for tests)
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False  # A half-open trial call is in progress
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    @property
+    def state(self):
+        """Current state: "closed", "open" or "half_open"."""
+        with self._lock:
+            return self._state()
+
+    def allow(self):
+        """Whether a call may go to the upstream now (claims the trial when half open)."""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        """Close the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        """Count a failure; open the circuit at the threshold or when a trial fails."""
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial = False
+
+
+class CoalescingCache:
+    """
+    Single-flight, stale-while-revalidate cache in front of ``fetch(key)``.
+
+    Args:
+        fetch (callable): Loads the value for a key; may raise
+        ttl (float | None): Seconds an entry is fresh (None = forever)
+        stale_ttl (float): Further seconds a stale entry is served while it
+            refreshes in the background
+        max_entries (int): Entries kept (least recently used evicted first)
+        breaker (CircuitBreaker, optional): Breaker guarding ``fetch``
+            (a default CircuitBreaker when omitted)
+        max_workers (int): Threads for background refreshes
+        clock (callable): Monotonic time source (injectable for tests)
+    """
+
+    def __init__(self, fetch, ttl=60.0, stale_ttl=300.0, max_entries=1024, breaker=None, max_workers=2, clock=time.monotonic):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.breaker = breaker if breaker is not None else CircuitBreaker(clock=clock)
+        self.max_workers = max_workers
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # Key -> _Entry, least recently used first
+        self._inflight = {}  # Key -> Future shared by everyone waiting on that key
+        self._executor = None  # Created by the first background refresh
+        self._stats = Counter()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Value for a key, fetching it at most once however many threads ask.
+
+        Args:
+            key: Hashable lookup key passed to ``fetch``
+
+        Returns:
+            The cached, stale or freshly fetched value
+
+        Raises:
+            CircuitOpenError: The circuit is open and the key never loaded
+            Exception: Whatever ``fetch`` raised, if the key never loaded
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                age = self._clock() - entry.fetched_at
+                if self.ttl is None or age < self.ttl:
+                    self._stats["hits"] += 1
+                    return entry.value
+                if age < self.ttl + self.stale_ttl:
+                    self._stats["stale"] += 1
+                    self._refresh_in_background(key)
+                    return entry.value
+
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if leader:
+            self._run(key, future)
+        return future.result()
+
+    def _refresh_in_background(self, key):
+        # Called with the lock held
+        if key in self._inflight:
+            return  # Someone is already fetching it
+        future = self._inflight[key] = Future()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="coalescing-refresh")
+        self._executor.submit(self._run, key, future)
+
+    def _run(self, key, future):
+        """Fetch a key for everyone waiting on ``future``."""
+        try:
+            value = self._load(key)
+        except Exception as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+        else:
+            with self._lock:
+                del self._inflight[key]
+            future.set_result(value)
+
+    def _load(self, key):
+        """Fetch through the breaker, falling back to the last good value."""
+        if not self.breaker.allow():
+            with self._lock:
+                self._stats["rejected"] += 1
+            return self._fallback(key, CircuitOpenError(f"circuit open, not fetching {key!r}"))
+
+        try:
+            value = self.fetch(key)
+        except Exception as e:
+            self.breaker.record_failure()
+            with self._lock:
+                self._stats["failures"] += 1
+            return self._fallback(key, e)
+
+        self.breaker.record_success()
+        with self._lock:
+            self._entries[key] = _Entry(value, self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def _fallback(self, key, error):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                raise error
+            self._stats["fallbacks"] += 1
+            return entry.value  # fetched_at is kept, so the next request tries again
+
+    def invalidate(self, key):
+        """Forget a key (an in-flight fetch still completes and stores its value)."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        """Counters (hits, stale, misses, coalesced, failures, fallbacks, rejected), size and breaker state."""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "circuit": self.breaker.state}
+
+    def close(self):
+        """Stop the background refresh threads (waiting for running refreshes)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
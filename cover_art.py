@@ -0,0 +1,287 @@
+"""
+Playlist Cover Art Proxy for MoodTunes PWA
+
+Mood cards show their playlist's cover instead of loading the Spotify
+embed, and the images come from our own origin so the service worker can
+cache them.
+
+Pipeline for ``/cover/<mood>?size=N``:
+
+1. The playlist's cover URL is looked up through an oEmbed endpoint
+   (Spotify's by default; ``COVER_ART_UPSTREAM`` points it elsewhere, e.g.
+   at fake_spotify.py) and the image is downloaded once.
+2. Pillow renders square JPEG variants at every configured size. Without
+   Pillow (``PILLOW_AVAILABLE`` False) the upstream image is stored as is
+   and served for every size.
+3. Variants go into a BlobStore: files named by the SHA-256 of their
+   bytes, so a name always means the same content and can be served with
+   ``Cache-Control: immutable``. The store evicts least recently used
+   files once their total size exceeds ``max_bytes``.
+
+Lookups go through a CoalescingCache (coalescing_cache.py): a burst of
+requests for one mood makes a single upstream fetch, covers older than
+``ttl`` are revalidated in the background, and a failing upstream trips
+the circuit breaker while the last good covers keep being served.
+"""
+
+import os
+import re
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from coalescing_cache import CoalescingCache
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+try:
+    from PIL import Image, ImageOps
+
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+SPOTIFY_OEMBED_URL = "https://open.spotify.com/oembed"
+SPOTIFY_PLAYLIST_URL = "https://open.spotify.com/playlist/{}"
+
+DEFAULT_SIZES = (64, 160, 300)
+JPEG_QUALITY = 85
+
+# Refuse upstream images larger than this (bytes)
+MAX_UPSTREAM_BYTES = 8 * 1024 * 1024
+
+# Stored file extension per upstream Content-Type (used without Pillow)
+EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp", "image/gif": "gif"}
+
+# "<sha256 hex>.<extension>", the only names BlobStore hands out
+BLOB_NAME_PATTERN = re.compile(r"^[0-9a-f]{64}\.(?:jpg|png|webp|gif)$")
+
+
+class BlobStore:
+    """
+    Content-addressed files with least-recently-used eviction by total size.
+
+    Recency is tracked in memory (seeded from file modification times at
+    startup), so with several worker processes each one evicts by its own
+    view. A known name is therefore checked on disk before it is handed
+    out: path() forgets a file another worker removed (so CoverArt renders
+    it again) and put() writes it back.
+
+    Args:
+        directory (str): Directory holding the files (created on first write)
+        max_bytes (int): Total size kept before the oldest files are removed
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+        self._blobs = OrderedDict()  # Name -> size, least recently used first
+
+        try:
+            existing = [(entry.stat(), entry.name) for entry in os.scandir(directory) if BLOB_NAME_PATTERN.match(entry.name)]
+        except OSError:
+            existing = []  # Nothing stored yet
+        for stat, name in sorted(existing, key=lambda item: item[0].st_mtime):
+            self._blobs[name] = stat.st_size
+            self.total_bytes += stat.st_size
+
+    def __len__(self):
+        return len(self._blobs)
+
+    def put(self, data, extension):
+        """
+        Store bytes under the hash of their content.
+
+        Args:
+            data (bytes): File content
+            extension (str): File extension, e.g. "jpg"
+
+        Returns:
+            str: Blob name, "<sha256>.<extension>"
+        """
+        name = f"{hashlib.sha256(data).hexdigest()}.{extension}"
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            if name in self._blobs:
+                if os.path.exists(path):
+                    self._blobs.move_to_end(name)
+                    return name
+                self._forget(name)  # Evicted by another worker: write it again
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as blob_file:
+                blob_file.write(data)
+            os.replace(tmp_path, path)  # Atomic: readers never see partial files
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            if name not in self._blobs:
+                self._blobs[name] = len(data)
+                self.total_bytes += len(data)
+            self._evict()
+        return name
+
+    def path(self, name):
+        """
+        Path of a stored blob, marking it recently used.
+
+        Returns:
+            str | None: File path, or None if the blob is not (or no longer) stored,
+                including when another worker removed the file
+        """
+        if not BLOB_NAME_PATTERN.match(name):
+            return None  # Not a blob name (e.g. a path traversal attempt)
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            if name not in self._blobs:
+                return None
+            if not os.path.exists(path):
+                self._forget(name)
+                return None
+            self._blobs.move_to_end(name)
+        return path
+
+    def _forget(self, name):
+        # Called with the lock held: drop a blob whose file is gone
+        self.total_bytes -= self._blobs.pop(name)
+
+    def _evict(self):
+        # Called with the lock held; the newest blob always stays
+        while self.total_bytes > self.max_bytes and len(self._blobs) > 1:
+            name, size = self._blobs.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass  # Already removed by another worker
+
+
+class CoverArt:
+    """
+    Fetches, resizes and caches playlist covers.
+
+    Args:
+        store (BlobStore): Where variants are written
+        upstream_url (str): oEmbed endpoint answering ``?url=<playlist URL>``
+            with a JSON object holding ``thumbnail_url``
+        sizes (iterable): Square variant sizes in pixels
+        ttl (float): Seconds before a playlist's cover is revalidated upstream
+        timeout (float): Seconds per upstream HTTP request
+        pool_size (int): Keep-alive connections kept per upstream host
+    """
+
+    def __init__(self, store, upstream_url=SPOTIFY_OEMBED_URL, sizes=DEFAULT_SIZES, ttl=24 * 3600, timeout=5.0, pool_size=4):
+        if not REQUESTS_AVAILABLE:
+            raise RuntimeError("CoverArt requires requests (pip install requests)")
+
+        self.store = store
+        self.upstream_url = upstream_url
+        self.sizes = tuple(sorted(set(sizes)))
+        self.timeout = timeout
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Playlist ID -> {size: blob name}; stale covers are served up to 7 * ttl longer while revalidating
+        self._variants = CoalescingCache(self._fetch_variants, ttl=ttl, stale_ttl=7 * ttl)
+
+    def pick_size(self, requested=None):
+        """Smallest configured size at least ``requested`` (the largest when omitted or too big)."""
+        if requested is not None:
+            for size in self.sizes:
+                if size >= requested:
+                    return size
+        return self.sizes[-1]
+
+    def variant(self, playlist_id, size=None):
+        """
+        Blob name of a playlist's cover at (about) the requested size.
+
+        Args:
+            playlist_id (str): Spotify playlist ID
+            size (int, optional): Requested width/height in pixels
+
+        Returns:
+            str: Blob name in ``store``
+
+        Raises:
+            CircuitOpenError, requests.RequestException, ValueError: The cover
+                could not be fetched and was never cached
+        """
+        size = self.pick_size(size)
+        name = self._variants.get(playlist_id)[size]
+        if self.store.path(name) is None:  # Evicted since it was rendered
+            self._variants.invalidate(playlist_id)
+            name = self._variants.get(playlist_id)[size]
+        return name
+
+    def _download(self, url, params=None):
+        with self.session.get(url, params=params, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            chunks, received = [], 0
+            for chunk in response.iter_content(64 * 1024):
+                received += len(chunk)
+                if received > MAX_UPSTREAM_BYTES:
+                    raise ValueError(f"upstream response larger than {MAX_UPSTREAM_BYTES} bytes")
+                chunks.append(chunk)
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+        return b"".join(chunks), content_type
+
+    def _fetch_variants(self, playlist_id):
+        """Fetch a playlist's cover and store every size variant (CoalescingCache fetch)."""
+        body, _content_type = self._download(self.upstream_url, {"url": SPOTIFY_PLAYLIST_URL.format(playlist_id)})
+        thumbnail_url = json.loads(body).get("thumbnail_url")
+        if not thumbnail_url:
+            raise ValueError(f"no cover for playlist {playlist_id}")
+        return self.render(*self._download(thumbnail_url))
+
+    def render(self, data, content_type):
+        """
+        Store the size variants of one image.
+
+        Args:
+            data (bytes): Upstream image
+            content_type (str): Its Content-Type (used when Pillow is missing)
+
+        Returns:
+            dict: Size -> blob name
+        """
+        if not PILLOW_AVAILABLE:
+            extension = EXTENSIONS.get(content_type)
+            if extension is None:
+                raise ValueError(f"unsupported cover type {content_type!r}")
+            name = self.store.put(data, extension)
+            return {size: name for size in self.sizes}
+
+        with Image.open(BytesIO(data)) as image:
+            image = ImageOps.exif_transpose(image).convert("RGB")
+        names = {}
+        for size in self.sizes:
+            buffer = BytesIO()
+            ImageOps.fit(image, (size, size), Image.LANCZOS).save(
+                buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True
+            )
+            names[size] = self.store.put(buffer.getvalue(), "jpg")
+        return names
+
+    def close(self):
+        """Close pooled connections and background refreshes."""
+        self._variants.close()
+        self.session.close()
@@ -0,0 +1,264 @@
+"""
+Fake Spotify Web API for Offline Development and Tests
+
+Serves just enough of the Spotify API for spotify_ingest.py:
+
+- POST /api/token: client-credentials token (any client ID and secret)
+- GET /v1/playlists/<id>/tracks?offset=&limit=: paged playlist tracks;
+  requires the bearer token
+- GET /oembed?url=https://open.spotify.com/playlist/<id>: oEmbed object
+  whose ``thumbnail_url`` points at the cover below (cover_art.py)
+- GET /images/<id>.png: 640x640 single-colour PNG cover
+
+Track lists are generated deterministically from the playlist ID (seeded
+with its CRC32), so every run sees the same data; so are cover colours. Playlists registered
+through ``playlists`` override the generated ones, and IDs listed in
+``failing`` answer 500 to exercise error handling.
+
+Usage:
+    python fake_spotify.py --port 8765
+    python spotify_ingest.py --api-url http://127.0.0.1:8765/v1 --token-url http://127.0.0.1:8765/api/token
+    MOODTUNES_COVER_ART_UPSTREAM=http://127.0.0.1:8765/oembed python app.py
+"""
+
+import json
+import random
+import struct
+import time
+import zlib
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FAKE_TOKEN = "fake-spotify-token"
+
+_ARTISTS = ["Luna Vale", "The Night Owls", "Kai Rivers", "Mira Solis", "Echo Park", "Juno Hart", "Static Bloom", "Ava Stone"]
+_WORDS = ["Golden", "Midnight", "Summer", "Electric", "Quiet", "Neon", "Ocean", "Paper", "Wild", "Slow", "Heart", "Sky"]
+_NOUNS = ["Dreams", "Lights", "Roads", "Waves", "Rain", "Fire", "Echoes", "Hours", "Streets", "Stars"]
+
+
+def generate_tracks(playlist_id, count=None):
+    """
+    Deterministic fake tracks for a playlist.
+
+    Args:
+        playlist_id (str): Playlist ID (seeds the generator)
+        count (int, optional): Number of tracks (20-40 when omitted)
+
+    Returns:
+        list: Spotify-style track objects (id, name, duration_ms, artists)
+    """
+    rng = random.Random(zlib.crc32(playlist_id.encode()))
+    count = count if count is not None else rng.randint(20, 40)
+    return [
+        {
+            "id": f"{playlist_id[:8]}{index:04d}",
+            "name": f"{rng.choice(_WORDS)} {rng.choice(_NOUNS)}",
+            "duration_ms": rng.randint(120, 300) * 1000,
+            "artists": [{"name": name} for name in rng.sample(_ARTISTS, rng.choice((1, 1, 2)))],
+        }
+        for index in range(count)
+    ]
+
+
+def generate_cover(playlist_id, size=640):
+    """
+    Deterministic single-colour PNG cover for a playlist (no Pillow needed).
+
+    Args:
+        playlist_id (str): Playlist ID (seeds the colour)
+        size (int): Width and height in pixels
+
+    Returns:
+        bytes: PNG file
+    """
+    colour = zlib.crc32(playlist_id.encode()).to_bytes(4, "big")[:3]
+    rows = (b"\x00" + colour * size) * size  # Filter byte 0, then RGB pixels
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)  # 8-bit RGB
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+class FakeSpotifyServer:
+    """
+    In-process fake Spotify API on a background thread.
+
+    Args:
+        host (str): Interface to bind
+        port (int): Port to bind (0 = any free port)
+        page_size (int): Maximum tracks per page, whatever ``limit`` asks for
+
+    Attributes:
+        playlists (dict): Playlist ID -> list of track objects (overrides generation)
+        failing (set): Playlist IDs that answer 500
+        latency (float): Seconds every response is delayed (simulates a slow upstream)
+        requests (Counter): Request path -> number of requests received
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, page_size=100):
+        self.playlists = {}
+        self.failing = set()
+        self.latency = 0.0
+        self.requests = Counter()
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """Root URL, e.g. http://127.0.0.1:54321"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self):
+        """Value for SpotifyClient(api_url=...)"""
+        return f"{self.base_url}/v1"
+
+    @property
+    def token_url(self):
+        """Value for SpotifyClient(token_url=...)"""
+        return f"{self.base_url}/api/token"
+
+    @property
+    def oembed_url(self):
+        """Value for CoverArt(upstream_url=...) / MOODTUNES_COVER_ART_UPSTREAM"""
+        return f"{self.base_url}/oembed"
+
+    def start(self):
+        """Serve on a daemon thread; returns self."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-spotify", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serve_forever(self):
+        """Serve on the calling thread until interrupted."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def tracks(self, playlist_id):
+        """Track objects served for a playlist."""
+        if playlist_id not in self.playlists:
+            self.playlists[playlist_id] = generate_tracks(playlist_id)
+        return self.playlists[playlist_id]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass  # Keep test output clean
+
+            def _send(self, status, payload, content_type="application/json"):
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                path = urlsplit(self.path).path
+                with server._lock:
+                    server.requests[path] += 1
+                time.sleep(server.latency)
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if path != "/api/token":
+                    return self._send(404, {"error": "not found"})
+                self._send(200, {"access_token": FAKE_TOKEN, "token_type": "Bearer", "expires_in": 3600})
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                with server._lock:
+                    server.requests[url.path] += 1
+                time.sleep(server.latency)
+                parts = url.path.strip("/").split("/")
+                if parts == ["oembed"]:
+                    return self._oembed(parse_qs(url.query).get("url", [""])[0])
+                if len(parts) == 2 and parts[0] == "images" and parts[1].endswith(".png"):
+                    playlist_id = parts[1][: -len(".png")]
+                    if playlist_id in server.failing:
+                        return self._send(500, {"error": "Server error"})
+                    return self._send(200, generate_cover(playlist_id), "image/png")
+                if len(parts) != 4 or parts[:2] != ["v1", "playlists"] or parts[3] != "tracks":
+                    return self._send(404, {"error": {"status": 404, "message": "Not found"}})
+                if self.headers.get("Authorization") != f"Bearer {FAKE_TOKEN}":
+                    return self._send(401, {"error": {"status": 401, "message": "Invalid access token"}})
+
+                playlist_id = parts[2]
+                if playlist_id in server.failing:
+                    return self._send(500, {"error": {"status": 500, "message": "Server error"}})
+
+                query = parse_qs(url.query)
+                offset = int(query.get("offset", ["0"])[0])
+                limit = min(int(query.get("limit", ["100"])[0]), server.page_size)
+                with server._lock:
+                    tracks = server.tracks(playlist_id)
+                end = offset + limit
+                next_url = None
+                if end < len(tracks):
+                    next_url = f"{server.api_url}/playlists/{playlist_id}/tracks?offset={end}&limit={limit}"
+                self._send(
+                    200,
+                    {
+                        "items": [{"track": track} for track in tracks[offset:end]],
+                        "next": next_url,
+                        "total": len(tracks),
+                    },
+                )
+
+            def _oembed(self, playlist_url):
+                playlist_id = playlist_url.rstrip("/").rsplit("/", 1)[-1]
+                if not playlist_url.startswith("https://open.spotify.com/playlist/") or not playlist_id:
+                    return self._send(404, {"error": "Not found"})
+                if playlist_id in server.failing:
+                    return self._send(500, {"error": "Server error"})
+                self._send(
+                    200,
+                    {
+                        "type": "rich",
+                        "title": f"Playlist {playlist_id}",
+                        "provider_name": "Spotify",
+                        "thumbnail_url": f"{server.base_url}/images/{playlist_id}.png",
+                        "thumbnail_width": 640,
+                        "thumbnail_height": 640,
+                    },
+                )
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake Spotify Web API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    fake = FakeSpotifyServer(args.host, args.port)
+    print(f"Fake Spotify API on {fake.api_url} (token endpoint {fake.token_url}, oEmbed {fake.oembed_url})")
+    try:
+        fake.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,192 @@
+"""
+Gunicorn Production Configuration for MoodTunes PWA
+
+Gunicorn loads this module automatically when started from the project root
+(``gunicorn app:app``) or explicitly with ``gunicorn -c gunicorn.conf.py app:app``.
+
+Sizing:
+- Workers default to ``2 * CPU + 1``, capped by GUNICORN_MAX_WORKERS so small
+  instances are not oversubscribed
+- Threads default to 1 (sync worker); any value above 1 switches to the
+  threaded ``gthread`` worker class unless GUNICORN_WORKER_CLASS says otherwise
+
+Preloading:
+- With ``preload_app`` the master imports app.py once and builds the catalog
+  and indexes before forking, so workers share those pages copy-on-write
+  instead of each building their own copy
+
+Environment Variables:
+- PORT: Bind port (default: 5000)
+- WEB_CONCURRENCY: Exact worker count (overrides CPU-based sizing)
+- GUNICORN_MAX_WORKERS: Upper bound for CPU-based sizing (default: 4)
+- GUNICORN_THREADS: Threads per worker (default: 1)
+- GUNICORN_WORKER_CLASS: sync | gthread (default: derived from threads)
+- GUNICORN_PRELOAD: Preload the app in the master (default: true)
+- GUNICORN_TIMEOUT: Worker timeout in seconds (default: 120)
+- GUNICORN_MAX_REQUESTS: Recycle workers after N requests (default: 0, disabled)
+- MOODTUNES_VERIFY_ON_START: Abort startup if the warm-up requests fail (default: false)
+
+Startup Verification:
+- The warm-up requests double as the smoke test start.sh used to run in a
+  separate interpreter, so the app is imported and verified in one process
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+import multiprocessing
+
+
+def _env_int(name, default):
+    """Read an integer environment variable, ignoring malformed values."""
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name, default):
+    """Read a boolean environment variable (1/true/yes/on)."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# ====================================================================
+# SERVER SOCKET AND WORKER SIZING
+# ====================================================================
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+workers = _env_int("WEB_CONCURRENCY", min(cpu_count * 2 + 1, _env_int("GUNICORN_MAX_WORKERS", 4)))
+threads = max(1, _env_int("GUNICORN_THREADS", 1))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync")
+
+preload_app = _env_bool("GUNICORN_PRELOAD", True)
+verify_on_start = _env_bool("MOODTUNES_VERIFY_ON_START", False)
+
+timeout = _env_int("GUNICORN_TIMEOUT", 120)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+# Recycling workers bounds slow memory growth; jitter avoids restarting all at once
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 0)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10)
+
+# ====================================================================
+# PER-WORKER METRICS
+# ====================================================================
+# Each worker process keeps its own counters (reset after fork) and logs
+# a summary when it exits. A lock keeps them consistent under gthread.
+
+_metrics_lock = threading.Lock()
+worker_metrics = {"requests": 0, "errors": 0, "total_time": 0.0, "max_time": 0.0, "started": 0.0}
+
+_log = logging.getLogger("gunicorn.error")
+
+
+def _reset_metrics():
+    with _metrics_lock:
+        worker_metrics.update(requests=0, errors=0, total_time=0.0, max_time=0.0, started=time.time())
+
+
+WARMUP_PATHS = ("/", "/version")
+
+
+def _warm_up(flask_app):
+    """
+    Render the main routes once so templates and lazy state are built ahead of traffic.
+
+    Returns:
+        list: Descriptions of warm-up requests that did not answer 200
+    """
+    failures = []
+    with flask_app.test_client() as client:
+        for path in WARMUP_PATHS:
+            status = client.get(path).status_code
+            if status != 200:
+                failures.append(f"{path} -> {status}")
+    return failures
+
+
+# ====================================================================
+# SERVER LIFECYCLE HOOKS
+# ====================================================================
+
+
+def on_starting(server):
+    """Log the effective configuration once in the master."""
+    _log.info(
+        "MoodTunes gunicorn: %s workers x %s threads (%s), preload=%s, timeout=%ss",
+        workers,
+        threads,
+        worker_class,
+        preload_app,
+        timeout,
+    )
+
+
+def when_ready(server):
+    """Warm caches (and verify) in the master when preloading so forked workers inherit them."""
+    if not preload_app:
+        return
+    flask_app = server.app.wsgi()
+    failures = _warm_up(flask_app)
+    if failures and verify_on_start:
+        server.halt(reason=f"Startup verification failed: {', '.join(failures)}", exit_status=1)
+    elif failures:
+        _log.warning("Warm-up requests failed: %s", ", ".join(failures))
+    else:
+        _log.info("Startup verification passed (%s)", ", ".join(WARMUP_PATHS))
+
+
+def post_fork(server, worker):
+    """Start every worker with fresh metrics."""
+    _reset_metrics()
+
+
+def post_worker_init(worker):
+    """Warm caches per worker when the app was not preloaded in the master."""
+    if not preload_app:
+        failures = _warm_up(worker.wsgi)
+        if failures and verify_on_start:
+            _log.error("Worker %s failed startup verification: %s", worker.pid, ", ".join(failures))
+            sys.exit(3)  # Arbiter.WORKER_BOOT_ERROR: the master shuts down instead of respawning
+        elif failures:
+            _log.warning("Warm-up requests failed: %s", ", ".join(failures))
+    _log.info("Worker %s ready", worker.pid)
+
+
+def pre_request(worker, req):
+    req.moodtunes_start = time.perf_counter()
+
+
+def post_request(worker, req, environ, resp):
+    elapsed = time.perf_counter() - getattr(req, "moodtunes_start", time.perf_counter())
+    with _metrics_lock:
+        worker_metrics["requests"] += 1
+        worker_metrics["total_time"] += elapsed
+        worker_metrics["max_time"] = max(worker_metrics["max_time"], elapsed)
+        if resp.status_code and resp.status_code >= 500:
+            worker_metrics["errors"] += 1
+
+
+def worker_exit(server, worker):
+    """Log the worker's request metrics when it shuts down or is recycled."""
+    with _metrics_lock:
+        served = worker_metrics["requests"]
+        avg_ms = worker_metrics["total_time"] * 1000 / served if served else 0.0
+        _log.info(
+            "Worker %s exiting: %s requests, %s errors, avg %.1f ms, max %.1f ms, uptime %.0fs",
+            worker.pid,
+            served,
+            worker_metrics["errors"],
+            avg_ms,
+            worker_metrics["max_time"] * 1000,
+            time.time() - worker_metrics["started"] if worker_metrics["started"] else 0.0,
+        )
@@ -0,0 +1,113 @@
+"""
+Unicode-Aware Text Normalization for MoodTunes Search
+
+Queries arrive as "chill!!", "Café", "ＨＡＰＰＹ" or "happy 😊". The same
+pipeline is applied to user input and, once at startup, to the catalog
+fields it is matched against, so both sides agree:
+
+1. NFKC: compatibility forms fold to their plain equivalents
+   (full-width "ＨＡＰＰＹ" -> "HAPPY", ligature "ﬁ" -> "fi")
+2. casefold: caseless matching, stronger than lower() ("ß" -> "ss")
+3. accent folding: decompose (NFD) and drop combining marks ("café" -> "cafe")
+4. punctuation, symbols (emoji included), separators and control
+   characters become spaces; runs of whitespace collapse to one space
+
+Plain ASCII input, the common case, skips the Unicode passes and is handled
+by a single ``str.translate``. normalize_query() adds an LRU cache in front,
+since the query distribution is heavily repetitive.
+"""
+
+import unicodedata
+from functools import lru_cache
+
+# Entries kept by the normalize_query() cache
+QUERY_CACHE_SIZE = 4096
+
+# Longer inputs are normalized without caching so one huge query cannot pin memory
+MAX_CACHED_LENGTH = 256
+
+# Characters whose general category starts with one of these become spaces:
+# Punctuation, Symbol (including emoji), separator (Z), Control/format (C)
+SEPARATOR_CATEGORIES = frozenset("PSZC")
+
+# Emoji presentation helpers removed outright rather than leaving stray marks:
+# variation selectors, zero-width joiner, combining enclosing keycap
+_IGNORED = {codepoint: None for codepoint in [*range(0xFE00, 0xFE10), 0x200D, 0x20E3]}
+
+_ASCII_TABLE = str.maketrans(
+    {chr(codepoint): " " for codepoint in range(128) if unicodedata.category(chr(codepoint))[0] in SEPARATOR_CATEGORIES}
+)
+
+
+def normalize_text(text):
+    """
+    Normalize text for matching.
+
+    Args:
+        text (str): Raw query or catalog field
+
+    Returns:
+        str: Casefolded, accent-free text with punctuation and symbols
+            replaced by single spaces and no leading/trailing whitespace
+    """
+    if text.isascii():
+        return " ".join(text.lower().translate(_ASCII_TABLE).split())
+
+    text = unicodedata.normalize("NFKC", text).casefold().translate(_IGNORED)
+    folded = []
+    for char in unicodedata.normalize("NFD", text):
+        if unicodedata.combining(char):
+            continue  # Accents and other combining marks
+        folded.append(" " if unicodedata.category(char)[0] in SEPARATOR_CATEGORIES else char)
+    return " ".join("".join(folded).split())
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _normalize_cached(text):
+    return normalize_text(text)
+
+
+def normalize_query(text):
+    """
+    Memoized normalize_text() for user input.
+
+    Args:
+        text (str): Raw query as submitted
+
+    Returns:
+        str: Normalized query (see normalize_text)
+    """
+    if len(text) > MAX_CACHED_LENGTH:
+        return normalize_text(text)
+    return _normalize_cached(text)
+
+
+def normalize_mood_key(text):
+    """
+    Normalize a mood identifier: normalized words joined with underscores.
+
+    "Happy", " ＨＡＰＰＹ! " and "happy" all give "happy"; "Deep Focus" gives
+    "deep_focus".
+    """
+    return normalize_query(text).replace(" ", "_")
+
+
+def normalize_metadata(mood_metadata):
+    """
+    Normalized copy of the searchable metadata fields, built once per catalog.
+
+    Args:
+        mood_metadata (dict): Mood key -> metadata
+
+    Returns:
+        dict: Mood key -> {"name", "description", "keywords"} normalized with
+            normalize_text (other fields are left out)
+    """
+    return {
+        mood_key: {
+            "name": normalize_text(mood_info.get("name", "")),
+            "description": normalize_text(mood_info.get("description", "")),
+            "keywords": [normalize_text(keyword) for keyword in mood_info.get("keywords", [])],
+        }
+        for mood_key, mood_info in mood_metadata.items()
+    }
@@ -0,0 +1,134 @@
+"""
+Mood Recommendation Engine for MoodTunes PWA
+
+Learns "people who chose X next chose Y" from the ordered mood selections
+already recorded in ``session["recent_moods"]``.
+
+Two square NumPy matrices are indexed by catalog position:
+
+- transitions[x, y]: how often mood y was chosen right after mood x
+- cooccurrence[x, y]: how often x and y appear in the same recent-mood window
+
+Both are updated incrementally on every selection (a handful of scalar or
+fancy-indexed increments). Suggestions are a vectorized top-k over one matrix
+row with ``argpartition``, and the result is cached per row until that row
+changes, so a request costs a dictionary lookup in the common case.
+
+NumPy is optional: without it the recommender is disabled and
+``NUMPY_AVAILABLE`` is False.
+"""
+
+import threading
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class MoodRecommender:
+    """
+    Incrementally updated mood transition and co-occurrence model.
+
+    Args:
+        mood_keys (iterable): Catalog mood keys; their order defines matrix indices
+        window (int): Number of previous moods that count as co-occurring
+    """
+
+    def __init__(self, mood_keys, window=5):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("MoodRecommender requires NumPy (pip install numpy)")
+
+        self.mood_keys = list(mood_keys)
+        self.window = window
+        self._positions = {mood_key: position for position, mood_key in enumerate(self.mood_keys)}
+
+        size = len(self.mood_keys)
+        self.transitions = np.zeros((size, size), dtype=np.int64)
+        self.cooccurrence = np.zeros((size, size), dtype=np.int64)
+
+        self._lock = threading.Lock()
+        self._top_cache = {}  # (matrix name, row, k) -> [mood keys]
+        self._row_versions = {}  # (matrix name, row) -> update count, guards against caching stale rows
+
+    def observe(self, history, mood):
+        """
+        Record that ``mood`` was selected after the moods in ``history``.
+
+        Args:
+            history (list): Previously selected moods, oldest first
+            mood (str): The mood selected now
+        """
+        target = self._positions.get(mood)
+        if target is None:
+            return
+
+        recent = [self._positions[m] for m in history[-self.window :] if m in self._positions]
+        previous = recent[-1] if recent else None
+        others = np.unique([position for position in recent if position != target])
+
+        with self._lock:
+            if previous is not None and previous != target:
+                self.transitions[previous, target] += 1
+                self._invalidate("transitions", previous)
+            if others.size:
+                self.cooccurrence[target, others] += 1
+                self.cooccurrence[others, target] += 1
+                self._invalidate("cooccurrence", target, *others.tolist())
+
+    def _invalidate(self, matrix_name, *rows):
+        """Drop cached top-k results for the given rows (caller holds the lock)."""
+        for row in rows:
+            self._row_versions[(matrix_name, row)] = self._row_versions.get((matrix_name, row), 0) + 1
+        for key in [key for key in self._top_cache if key[0] == matrix_name and key[1] in rows]:
+            del self._top_cache[key]
+
+    def _top_k(self, matrix_name, row, k):
+        cache_key = (matrix_name, row, k)
+        cached = self._top_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            counts = getattr(self, matrix_name)[row].copy()
+            version = self._row_versions.get((matrix_name, row), 0)
+        counts[row] = 0  # Never suggest the mood itself
+
+        available = int(np.count_nonzero(counts))
+        k = min(k, available)
+        if k == 0:
+            result = []
+        else:
+            # Fold catalog order into the score so ties resolve deterministically
+            size = counts.size
+            scores = counts * size + (size - 1 - np.arange(size))
+            candidates = np.argpartition(-scores, k - 1)[:k]
+            ordered = candidates[np.argsort(-scores[candidates])]
+            result = [self.mood_keys[position] for position in ordered.tolist()]
+
+        with self._lock:
+            if self._row_versions.get((matrix_name, row), 0) == version:
+                self._top_cache[cache_key] = result
+        return result
+
+    def next_moods(self, mood, k=3):
+        """Moods most often chosen right after ``mood``, most frequent first."""
+        row = self._positions.get(mood)
+        return [] if row is None else self._top_k("transitions", row, k)
+
+    def related_moods(self, mood, k=3):
+        """Moods most often found in the same recent-mood window as ``mood``."""
+        row = self._positions.get(mood)
+        return [] if row is None else self._top_k("cooccurrence", row, k)
+
+    def suggest(self, mood, k=3):
+        """Next-mood suggestions, topped up with co-occurring moods when transitions are sparse."""
+        suggestions = list(self.next_moods(mood, k))
+        for related in self.related_moods(mood, k):
+            if len(suggestions) >= k:
+                break
+            if related not in suggestions:
+                suggestions.append(related)
+        return suggestions
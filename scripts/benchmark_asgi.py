@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Sync vs ASGI Serving Benchmark for MoodTunes PWA
+
+Replays the same request mix against two deployments of the app, in
+process and without sockets so only the concurrency model differs:
+
+- sync: the Flask app behind ``--workers`` slots (default 2), like
+  ``gunicorn app:app`` with sync workers: a request waits for a free slot
+- asgi: asgi.py's ASGIApplication, I/O-bound endpoints on its I/O pool,
+  everything else on its CPU pool
+
+The mix is ``--cover-share`` GET /cover/<mood> (I/O-bound: every request
+goes to fake_spotify.py, delayed by ``--latency``, because the cover TTL is
+zero) and the rest POST /search-playlists (CPU-bound). ``--clients``
+closed-loop clients send ``--requests`` requests in total.
+
+Usage:
+    python scripts/benchmark_asgi.py [--requests 400] [--clients 32] [--latency 0.05]
+"""
+
+import sys
+import time
+import logging
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+import statistics
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import create_app, mood_playlists  # noqa: E402  (path set up above)
+from asgi import ASGIApplication  # noqa: E402
+from cover_art import REQUESTS_AVAILABLE  # noqa: E402
+from fake_spotify import FakeSpotifyServer  # noqa: E402
+
+QUERIES = ["happy", "chill vibes", "focus", "energy", "sad songs", "party", "calm", "in"]
+
+
+def request_mix(count, cover_share, seed=7):
+    """Deterministic list of (kind, method, path, form body)."""
+    rng = random.Random(seed)
+    moods = sorted(mood_playlists)
+    mix = []
+    for _ in range(count):
+        if rng.random() < cover_share:
+            mix.append(("cover", "GET", f"/cover/{rng.choice(moods)}", b""))
+        else:
+            mix.append(("search", "POST", "/search-playlists", urlencode({"query": rng.choice(QUERIES)}).encode()))
+    return mix
+
+
+def build_app(oembed_url, cover_dir, io_threads, cpu_threads):
+    return create_app(
+        {
+            "ANALYTICS_ENABLED": False,
+            "RATE_LIMIT_ENABLED": False,
+            "COVER_ART_ENABLED": True,
+            "COVER_ART_UPSTREAM": oembed_url,
+            "COVER_ART_DIR": cover_dir,
+            "COVER_ART_TTL": 0,  # Every cover request waits on the upstream
+            "ASGI_IO_THREADS": io_threads,
+            "ASGI_CPU_THREADS": cpu_threads,
+        }
+    )
+
+
+def run_sync(flask_app, mix, clients, workers):
+    """Closed-loop clients against ``workers`` sync workers; returns [(kind, status, seconds)]."""
+    local = threading.local()
+    results = []
+
+    def handle(method, path, body):
+        if not hasattr(local, "client"):
+            local.client = flask_app.test_client()
+        response = local.client.open(path, method=method, data=body, content_type="application/x-www-form-urlencoded")
+        response.close()
+        return response.status_code
+
+    # Requests queue (first come, first served) for a free worker, as in the gunicorn listen backlog
+    with ThreadPoolExecutor(max_workers=workers) as server:
+
+        def send(item):
+            kind, method, path, body = item
+            started = time.perf_counter()
+            status = server.submit(handle, method, path, body).result()
+            results.append((kind, status, time.perf_counter() - started))
+
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            list(pool.map(send, mix))
+    return results
+
+
+async def run_asgi(application, mix, clients):
+    """Closed-loop clients against the ASGI app; returns [(kind, status, seconds)]."""
+    queue = list(reversed(mix))
+    results = []
+
+    async def call(kind, method, path, body):
+        scope = {
+            "type": "http",
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "query_string": b"",
+            "headers": [(b"content-type", b"application/x-www-form-urlencoded"), (b"content-length", str(len(body)).encode())],
+            "client": ("127.0.0.1", 50000),
+            "server": ("127.0.0.1", 5000),
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        status = {}
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+
+        started = time.perf_counter()
+        await application(scope, receive, send)
+        results.append((kind, status["code"], time.perf_counter() - started))
+
+    async def client():
+        while queue:
+            await call(*queue.pop())
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return results
+
+
+def summarize(name, results, elapsed):
+    errors = sum(status >= 400 for _kind, status, _seconds in results)
+    line = f"{name:<6} {len(results) / elapsed:>8.1f} req/s"
+    for kind in ("cover", "search"):
+        latencies = sorted(seconds for k, _status, seconds in results if k == kind)
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            line += f"  {kind} p50 {statistics.median(latencies) * 1000:>7.1f}ms p95 {p95 * 1000:>7.1f}ms"
+    print(line + (f"  ({errors} errors)" if errors else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05, help="Upstream delay per response in seconds")
+    parser.add_argument("--cover-share", type=float, default=0.8)
+    parser.add_argument("--workers", type=int, default=2, help="Sync worker slots (gunicorn sync workers)")
+    parser.add_argument("--io-threads", type=int, default=32)
+    parser.add_argument("--cpu-threads", type=int, default=2)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # One log line per search would dominate the timings
+
+    if not REQUESTS_AVAILABLE:
+        print("requests is not installed - cover art (the I/O-bound endpoint) is disabled")
+        return 1
+
+    mix = request_mix(args.requests, args.cover_share)
+    print(
+        f"{args.requests} requests, {args.clients} clients, {args.cover_share:.0%} covers, "
+        f"upstream latency {args.latency * 1000:.0f}ms per response (oEmbed + image = 2 per cover)"
+    )
+    print(f"limits: sync {args.workers} workers | asgi {args.io_threads} I/O + {args.cpu_threads} CPU threads")
+
+    with FakeSpotifyServer() as server, tempfile.TemporaryDirectory() as cover_dir:
+        server.latency = args.latency
+
+        flask_app = build_app(server.oembed_url, cover_dir, args.io_threads, args.cpu_threads)
+        started = time.perf_counter()
+        results = run_sync(flask_app, mix, args.clients, args.workers)
+        summarize("sync", results, time.perf_counter() - started)
+        flask_app.extensions["cover_art"].close()
+
+        flask_app = build_app(server.oembed_url, cover_dir, args.io_threads, args.cpu_threads)
+        application = ASGIApplication(flask_app, io_threads=args.io_threads, cpu_threads=args.cpu_threads)
+        started = time.perf_counter()
+        results = asyncio.run(run_asgi(application, mix, args.clients))
+        summarize("asgi", results, time.perf_counter() - started)
+        application.close()
+        flask_app.extensions["cover_art"].close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Search Scorer Benchmark for MoodTunes PWA
+
+Compares the pure-Python and NumPy relevance scorers (search_scorer.py) on
+synthetic catalogs of increasing size, checks that both return identical
+rankings, and reports where the vectorized scorer starts to win.
+
+Usage:
+    python scripts/benchmark_search.py [--sizes 24 1000 10000 100000] [--repeat 5]
+
+Synthetic moods reuse the vocabulary of the real catalog, so query
+selectivity is realistic: broad queries ("e", "in") match most moods,
+narrow ones ("good vibes") only a few.
+"""
+
+import sys
+import random
+import argparse
+import statistics
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402  (path set up above)
+from search_scorer import NUMPY_AVAILABLE, NumpyScorer, PythonScorer  # noqa: E402
+
+QUERIES = ["e", "in", "calm", "energy", "good vibes", "zzz"]
+
+
+def synthetic_catalog(size, seed=42):
+    """
+    Build a catalog of ``size`` moods from words used in the real metadata.
+
+    Returns:
+        tuple: (mood_playlists, mood_metadata)
+    """
+    rng = random.Random(seed)
+    words = sorted(
+        {
+            word
+            for info in app.mood_metadata.values()
+            for text in [info["description"], *info["keywords"]]
+            for word in text.lower().split()
+        }
+    )
+    categories = sorted({info["category"] for info in app.mood_metadata.values()})
+
+    playlists, metadata = {}, {}
+    for index in range(size):
+        key = f"{rng.choice(words)}-{index}"
+        playlists[key] = f"playlist{index:08d}"
+        metadata[key] = {
+            "name": " ".join(rng.sample(words, 2)).title(),
+            "description": " ".join(rng.sample(words, 8)).capitalize(),
+            "keywords": rng.sample(words, 4),
+            "category": rng.choice(categories),
+        }
+    return playlists, metadata
+
+
+def time_queries(scorer, repeat):
+    """Median seconds to run every benchmark query once (top 20)."""
+    samples = []
+    for _ in range(repeat):
+        started = perf_counter()
+        for query in QUERIES:
+            scorer.top_k(query, k=20)
+        samples.append(perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[24, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("NumPy is not installed - nothing to compare")
+        return 1
+
+    print(f"{'moods':>8} {'build py':>10} {'build np':>10} {'query py':>10} {'query np':>10} {'speedup':>8}")
+    for size in args.sizes:
+        if size == len(app.mood_playlists):
+            playlists, metadata = app.mood_playlists, app.mood_metadata
+        else:
+            playlists, metadata = synthetic_catalog(size)
+
+        started = perf_counter()
+        python_scorer = PythonScorer(playlists, metadata)
+        build_python = perf_counter() - started
+        started = perf_counter()
+        numpy_scorer = NumpyScorer(playlists, metadata)
+        build_numpy = perf_counter() - started
+
+        for query in QUERIES:
+            if python_scorer.top_k(query) != numpy_scorer.top_k(query):
+                print(f"❌ Rankings differ for {query!r} at {size} moods")
+                return 1
+
+        query_python = time_queries(python_scorer, args.repeat)
+        query_numpy = time_queries(numpy_scorer, args.repeat)
+        print(
+            f"{size:>8} {build_python * 1000:>8.1f}ms {build_numpy * 1000:>8.1f}ms "
+            f"{query_python * 1000 / len(QUERIES):>8.2f}ms {query_numpy * 1000 / len(QUERIES):>8.2f}ms "
+            f"{query_python / query_numpy:>7.1f}x"
+        )
+
+    print("✅ Both scorers returned identical rankings for every query")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
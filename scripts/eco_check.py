@@ -5,20 +5,60 @@
 This script performs a simplified environmental impact assessment
 that can be run locally during development.
 
+Besides the static checks (bundle size, complexity, lines of code) it boots
+the Flask app in-process and measures what real requests cost: CPU time per
+request, response bytes (raw and gzip-compressed) and peak allocations.
+
 Usage:
     python scripts/eco_check.py
 
+Runtime budgets can be tuned with environment variables:
+    ECO_CPU_MS_BUDGET         CPU milliseconds per request (default: 5)
+    ECO_RESPONSE_KB_BUDGET    Compressed KB per response (default: 8)
+    ECO_PEAK_ALLOC_KB_BUDGET  Peak traced allocations in KB (default: 1024)
+    ECO_RUNTIME_ITERATIONS    Requests per route (default: 20)
+    ECO_SKIP_RUNTIME          Set to 1 to skip the runtime factor (the only way to
+                              leave it out of the score)
+
 Exit codes:
     0: Eco check passed
-    1: Eco check failed (high environmental impact)
+    1: Eco check failed (high environmental impact, or the runtime
+       measurement could not boot the app or a route failed)
 """
 
 import os
 import sys
+import gzip
 import json
+import time
+import logging
+import tracemalloc
 import subprocess
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
+
+# ====================================================================
+# RUNTIME BUDGETS
+# ====================================================================
+# A route that stays within its budget scores 100; the score falls
+# linearly to 0 at three times the budget.
+
+RUNTIME_BUDGETS = {
+    "cpu_ms_per_request": float(os.getenv("ECO_CPU_MS_BUDGET", "5")),
+    "compressed_kb_per_response": float(os.getenv("ECO_RESPONSE_KB_BUDGET", "8")),
+    "peak_alloc_kb": float(os.getenv("ECO_PEAK_ALLOC_KB_BUDGET", "1024")),
+}
+
+RUNTIME_ITERATIONS = int(os.getenv("ECO_RUNTIME_ITERATIONS", "20"))
+
+# Main routes exercised in-process: (method, path, form data)
+RUNTIME_ROUTES = [
+    ("GET", "/", None),
+    ("GET", "/version", None),
+    ("GET", "/manifest.json", None),
+    ("POST", "/get-playlist", {"mood": "happy"}),
+    ("POST", "/search-playlists", {"query": "calm"}),
+]
 
 
 def run_command(cmd: str) -> Tuple[str, str, int]:
@@ -189,6 +229,126 @@ def calculate_efficiency_factor(total_lines: int, bundle_size_kb: float) -> floa
         return 60
 
 
+# Subsystems that would distort or pollute the measurement: the rate limiter answers most
+# timed POSTs with 429s, analytics writes to instance/ and cover art calls Spotify
+RUNTIME_APP_CONFIG = {"RATE_LIMIT_ENABLED": False, "ANALYTICS_ENABLED": False, "COVER_ART_ENABLED": False}
+
+
+def _issue_request(client, method: str, path: str, data: Optional[Dict[str, str]]):
+    """
+    Send a single request through the Flask test client.
+
+    Raises:
+        RuntimeError: The route did not answer with a 2xx status, so its
+            timings would describe an error path rather than the route
+    """
+    response = client.post(path, data=data) if method == "POST" else client.get(path)
+    if not 200 <= response.status_code < 300:
+        raise RuntimeError(f"{method} {path} returned {response.status_code}")
+    return response
+
+
+def measure_runtime_metrics(iterations: int = RUNTIME_ITERATIONS) -> Dict[str, any]:
+    """
+    Boot the app in-process and measure what the main routes cost at runtime.
+
+    A dedicated app is built with RUNTIME_APP_CONFIG. Each route is warmed
+    up once, then requested ``iterations`` times while CPU time is sampled
+    with ``time.process_time``. A second pass runs under ``tracemalloc`` so
+    allocation tracing does not inflate the CPU numbers. Every request must
+    succeed (2xx).
+
+    Args:
+        iterations (int): Number of timed requests per route
+
+    Returns:
+        Dict[str, any]: Per-route and aggregate runtime metrics
+
+    Raises:
+        RuntimeError: The app could not be booted or a route failed; the
+            budget gate must not pass without a measurement (set
+            ECO_SKIP_RUNTIME=1 to opt out explicitly)
+    """
+    sys.path.insert(0, os.getcwd())
+    try:
+        from app import create_app
+
+        flask_app = create_app(RUNTIME_APP_CONFIG)
+    except Exception as e:
+        raise RuntimeError(f"could not boot app for runtime measurement: {e}") from e
+
+    routes = {}
+    previous_disable_level = logging.root.manager.disable
+    logging.disable(logging.WARNING)  # Request logging would dominate the measurement
+
+    try:
+        with flask_app.test_client() as client:
+            for method, path, data in RUNTIME_ROUTES:
+                label = f"{method} {path}"
+                response = _issue_request(client, method, path, data)  # Warm-up (template compile, imports)
+                body = response.get_data()
+
+                cpu_start = time.process_time()
+                for _ in range(iterations):
+                    _issue_request(client, method, path, data)
+                cpu_ms = (time.process_time() - cpu_start) * 1000 / max(iterations, 1)
+
+                tracemalloc.start()
+                for _ in range(iterations):
+                    _issue_request(client, method, path, data)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                routes[label] = {
+                    "status": response.status_code,
+                    "cpu_ms": cpu_ms,
+                    "raw_bytes": len(body),
+                    "compressed_bytes": len(gzip.compress(body, compresslevel=6)),
+                    "peak_alloc_kb": peak / 1024,
+                }
+    except RuntimeError as e:
+        raise RuntimeError(f"runtime measurement aborted: {e}") from e
+    finally:
+        logging.disable(previous_disable_level)
+
+    route_count = max(len(routes), 1)
+    return {
+        "iterations": iterations,
+        "routes": routes,
+        "avg_cpu_ms": sum(r["cpu_ms"] for r in routes.values()) / route_count,
+        "avg_raw_kb": sum(r["raw_bytes"] for r in routes.values()) / route_count / 1024,
+        "avg_compressed_kb": sum(r["compressed_bytes"] for r in routes.values()) / route_count / 1024,
+        "peak_alloc_kb": max((r["peak_alloc_kb"] for r in routes.values()), default=0.0),
+    }
+
+
+def _budget_score(value: float, budget: float) -> float:
+    """Score a measurement against its budget: 100 within budget, 0 at 3x budget."""
+    if budget <= 0 or value <= budget:
+        return 100
+    return max(0, 100 - ((value - budget) / (2 * budget)) * 100)
+
+
+def calculate_runtime_factor(runtime_metrics: Dict[str, any], budgets: Dict[str, float] = None) -> float:
+    """
+    Calculate runtime eco factor score from measured request costs.
+
+    Args:
+        runtime_metrics (Dict[str, any]): Output of measure_runtime_metrics()
+        budgets (Dict[str, float]): Budgets to score against (defaults to RUNTIME_BUDGETS)
+
+    Returns:
+        float: Score from 0-100 (higher is better)
+    """
+    budgets = budgets or RUNTIME_BUDGETS
+    scores = [
+        _budget_score(runtime_metrics["avg_cpu_ms"], budgets["cpu_ms_per_request"]),
+        _budget_score(runtime_metrics["avg_compressed_kb"], budgets["compressed_kb_per_response"]),
+        _budget_score(runtime_metrics["peak_alloc_kb"], budgets["peak_alloc_kb"]),
+    ]
+    return sum(scores) / len(scores)
+
+
 def calculate_eco_score() -> Dict[str, any]:
     """Calculate comprehensive environmental impact score for the application.
 
@@ -196,6 +356,7 @@ def calculate_eco_score() -> Dict[str, any]:
     - Bundle size (affects download time and bandwidth usage)
     - Code complexity (affects CPU processing requirements)
     - Code efficiency (lines of code per KB of bundle size)
+    - Runtime cost (CPU time, response bytes and allocations per request)
 
     Returns:
         Dict[str, any]: Dictionary containing eco metrics and overall score
@@ -206,22 +367,36 @@ def calculate_eco_score() -> Dict[str, any]:
     bundle_size_kb = calculate_bundle_size()
     code_metrics = analyze_code_efficiency()
     avg_complexity = get_complexity_metrics()
+    runtime_metrics = None if os.getenv("ECO_SKIP_RUNTIME") == "1" else measure_runtime_metrics()
 
     print(f"📦 Total bundle size: {bundle_size_kb:.1f} KB")
     print(f"📄 Total code lines: {code_metrics['total_lines']}")
     print(f"🔄 Average complexity: {avg_complexity:.1f}")
+    if runtime_metrics:
+        print(f"⏱️  Average CPU per request: {runtime_metrics['avg_cpu_ms']:.2f} ms")
 
     # Calculate individual eco factors
     bundle_factor = calculate_bundle_factor(bundle_size_kb)
     complexity_factor = calculate_complexity_factor(avg_complexity)
     efficiency_factor = calculate_efficiency_factor(code_metrics["total_lines"], bundle_size_kb)
 
+    # None only when ECO_SKIP_RUNTIME=1; measurement failures raise instead of dropping the factor
+    runtime_factor = calculate_runtime_factor(runtime_metrics) if runtime_metrics else None
+
     # Calculate weighted eco score (bundle size has highest impact)
-    eco_score = (
-        bundle_factor * 0.4
-        + complexity_factor * 0.3  # Bundle size affects download/bandwidth
-        + efficiency_factor * 0.3  # Complexity affects CPU processing  # Efficiency affects overall resource usage
-    )
+    if runtime_factor is None:
+        eco_score = (
+            bundle_factor * 0.4
+            + complexity_factor * 0.3  # Bundle size affects download/bandwidth
+            + efficiency_factor * 0.3  # Complexity affects CPU processing  # Efficiency affects overall resource usage
+        )
+    else:
+        eco_score = (
+            bundle_factor * 0.3  # Bundle size affects download/bandwidth
+            + complexity_factor * 0.2  # Complexity affects CPU processing
+            + efficiency_factor * 0.2  # Efficiency affects overall resource usage
+            + runtime_factor * 0.3  # Measured request cost on the server
+        )
 
     # Estimate environmental impact
     # Simplified calculation based on bundle size and complexity
@@ -236,10 +411,13 @@ def calculate_eco_score() -> Dict[str, any]:
         "avg_complexity": avg_complexity,
         "energy_per_1000_visits": energy_per_1000_visits,
         "co2_per_1000_visits": co2_per_1000_visits,
+        "runtime": runtime_metrics,
+        "runtime_budgets": RUNTIME_BUDGETS,
         "factors": {
             "bundle_factor": bundle_factor,
             "complexity_factor": complexity_factor,
             "efficiency_factor": efficiency_factor,
+            "runtime_factor": runtime_factor,
         },
     }
 
@@ -263,6 +441,19 @@ def display_eco_report(eco_data: Dict[str, any]) -> None:
     print(f"  📦 Bundle Factor:     {eco_data['factors']['bundle_factor']:.1f}/100")
     print(f"  🔄 Complexity Factor: {eco_data['factors']['complexity_factor']:.1f}/100")
     print(f"  ⚡ Efficiency Factor: {eco_data['factors']['efficiency_factor']:.1f}/100")
+    if eco_data["factors"]["runtime_factor"] is not None:
+        print(f"  ⏱️  Runtime Factor:    {eco_data['factors']['runtime_factor']:.1f}/100")
+
+    runtime = eco_data.get("runtime")
+    if runtime:
+        print(f"\n⏱️  Runtime Breakdown ({runtime['iterations']} requests per route):")
+        for label, route in runtime["routes"].items():
+            print(
+                f"  {label:<24} {route['cpu_ms']:6.2f} ms CPU | "
+                f"{route['raw_bytes'] / 1024:6.1f} KB raw | "
+                f"{route['compressed_bytes'] / 1024:5.1f} KB gzip | "
+                f"{route['peak_alloc_kb']:7.1f} KB peak"
+            )
 
 
 def assess_eco_quality_gate(score: float) -> int:
@@ -326,6 +517,9 @@ def main():
                 print("  🔄 Reduce code complexity - break down complex functions")
             if eco_data["factors"]["efficiency_factor"] < 80:
                 print("  ⚡ Improve code efficiency - optimize algorithms")
+            runtime_factor = eco_data["factors"]["runtime_factor"]
+            if runtime_factor is not None and runtime_factor < 80:
+                print("  ⏱️  Reduce per-request cost - CPU time, payload size or allocations exceed budget")
 
         # Save report for CI/CD if needed
         if os.getenv("CI"):
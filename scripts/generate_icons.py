@@ -1,7 +1,19 @@
 #!/usr/bin/env python3
 """
-Simple script to generate basic PWA icons for MoodTunes
-Run this script to create placeholder icons until you design custom ones
+Incremental PWA icon pipeline for MoodTunes
+
+Renders a single high-resolution master icon and derives every size listed in
+ICON_SIZES from it with Lanczos resampling, spread across a process pool.
+Each size is written as an optimized PNG and a WebP variant, and
+static/manifest.json is updated to advertise both.
+
+Outputs are only rewritten when they are out of date: the fingerprint of the
+master and the hash of every generated file are recorded in
+static/icons/.icon-hashes.json and compared on the next run.
+
+Usage:
+    python scripts/generate_icons.py           # regenerate stale icons only
+    python scripts/generate_icons.py --force   # rebuild everything
 """
 
 try:
@@ -11,72 +23,203 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
+import io
 import os
-
-
-def create_simple_icon(size, color="#667eea", text="🎵"):
-    """Create a simple colored icon with emoji"""
-    if PIL_AVAILABLE:
-        # Create with PIL if available
-        img = Image.new("RGB", (size, size), color)
-        draw = ImageDraw.Draw(img)
-
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+ICONS_DIR = "static/icons"
+MANIFEST_PATH = "static/manifest.json"
+HASHES_FILE = ".icon-hashes.json"
+
+MASTER_SIZE = 1024
+ICON_SIZES = [72, 96, 128, 144, 152, 192, 384, 512]
+ICON_FORMATS = {
+    # extension: (PIL format, save options, manifest MIME type)
+    "webp": ("WEBP", {"quality": 90, "method": 6}, "image/webp"),
+    "png": ("PNG", {"optimize": True}, "image/png"),
+}
+
+# Bump when rendering or encoding changes so every output is rebuilt
+PIPELINE_VERSION = 2
+
+
+def load_font(size):
+    """Load a scalable font for the master render, falling back to Pillow's default."""
+    for candidate in ("arial.ttf", "DejaVuSans.ttf", "NotoColorEmoji.ttf"):
         try:
-            # Try to use a system font
-            font_size = size // 2
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
-
-        # Get text size and center it
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-
-        x = (size - text_width) // 2
-        y = (size - text_height) // 2
-
-        draw.text((x, y), text, fill="white", font=font)
-        return img
-    else:
-        print(f"PIL not available. Creating placeholder for {size}x{size}")
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)  # Pillow >= 10.1
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def render_master(size=MASTER_SIZE, color="#667eea", text="🎵"):
+    """Render the high-resolution master icon and return it as PNG bytes."""
+    img = Image.new("RGB", (size, size), color)
+    draw = ImageDraw.Draw(img)
+    font = load_font(size // 2)
+
+    # Get text size and center it
+    bbox = draw.textbbox((0, 0), text, font=font)
+    x = (size - (bbox[2] - bbox[0])) // 2 - bbox[0]
+    y = (size - (bbox[3] - bbox[1])) // 2 - bbox[1]
+    draw.text((x, y), text, fill="white", font=font)
+
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def icon_filename(size, extension):
+    """Return the output filename for an icon size and format."""
+    return f"icon-{size}x{size}.{extension}"
+
+
+def file_sha256(path):
+    """Hash a file on disk, returning None if it does not exist."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
         return None
 
 
-def generate_icons():
-    """Generate all required PWA icons"""
-    icons_dir = "static/icons"
+def derive_icon(master_png, size, extension, output_path):
+    """
+    Downscale the master to one size/format and write it (runs in a worker process).
+
+    Returns:
+        tuple: (filename, sha256 of the written file)
+    """
+    pil_format, options, _ = ICON_FORMATS[extension]
+    master = Image.open(io.BytesIO(master_png))
+    icon = master.resize((size, size), Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    icon.save(buffer, pil_format, **options)
+    data = buffer.getvalue()
+
+    with open(output_path, "wb") as f:
+        f.write(data)
+    return os.path.basename(output_path), hashlib.sha256(data).hexdigest()
+
+
+def load_hashes(icons_dir):
+    """Load the recorded fingerprints from the previous run."""
+    try:
+        with open(os.path.join(icons_dir, HASHES_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"source": None, "files": {}}
+
+
+def save_hashes(icons_dir, hashes):
+    """Persist fingerprints so the next run can skip up-to-date outputs."""
+    with open(os.path.join(icons_dir, HASHES_FILE), "w", encoding="utf-8") as f:
+        json.dump(hashes, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def plan_outputs(icons_dir, source_fingerprint, hashes, force=False):
+    """Return the (size, extension) pairs whose outputs are missing or stale."""
+    stale = []
+    source_changed = hashes.get("source") != source_fingerprint
+    for size in ICON_SIZES:
+        for extension in ICON_FORMATS:
+            filename = icon_filename(size, extension)
+            recorded = hashes.get("files", {}).get(filename)
+            on_disk = file_sha256(os.path.join(icons_dir, filename))
+            if force or source_changed or recorded is None or recorded != on_disk:
+                stale.append((size, extension))
+    return stale
+
+
+def build_manifest_icons():
+    """Build the manifest ``icons`` list, WebP first so capable browsers pick it."""
+    icons = []
+    for size in ICON_SIZES:
+        for extension, (_, _, mime_type) in ICON_FORMATS.items():
+            icons.append(
+                {
+                    "src": f"/{ICONS_DIR}/{icon_filename(size, extension)}",
+                    "sizes": f"{size}x{size}",
+                    "type": mime_type,
+                    "purpose": "any maskable",
+                }
+            )
+    return icons
+
+
+def update_manifest(manifest_path):
+    """Rewrite the manifest icon list if it does not match the generated set."""
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    icons = build_manifest_icons()
+    if manifest.get("icons") == icons:
+        return False
+
+    manifest["icons"] = icons
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return True
+
+
+def generate_icons(icons_dir=ICONS_DIR, manifest_path=MANIFEST_PATH, force=False, max_workers=None):
+    """Generate all required PWA icons, skipping outputs that are already up to date"""
+    if not PIL_AVAILABLE:
+        print("PIL not available - icons were left untouched.")
+        print("\n📋 Next steps:")
+        print("1. Install Pillow for icon generation: pip install Pillow")
+        print("2. Or create custom icons using online tools:")
+        print("   - https://realfavicongenerator.net/")
+        print("   - https://www.favicon-generator.org/")
+        return 1
+
     os.makedirs(icons_dir, exist_ok=True)
+    print("Generating PWA icons for MoodTunes...")
 
-    sizes = [72, 96, 128, 144, 152, 192, 384, 512]
+    master_png = render_master()
+    source_fingerprint = hashlib.sha256(master_png + f"v{PIPELINE_VERSION}".encode()).hexdigest()
+    hashes = load_hashes(icons_dir)
+    stale = plan_outputs(icons_dir, source_fingerprint, hashes, force=force)
+
+    files = {}
+    if stale:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(derive_icon, master_png, size, ext, os.path.join(icons_dir, icon_filename(size, ext)))
+                for size, ext in stale
+            ]
+            for future in futures:
+                filename, digest = future.result()
+                files[filename] = digest
+                print(f"✅ Created {filename}")
 
-    print("Generating PWA icons for MoodTunes...")
+    skipped = len(ICON_SIZES) * len(ICON_FORMATS) - len(stale)
+    if skipped:
+        print(f"⏭️  Skipped {skipped} up-to-date icons")
 
-    for size in sizes:
-        filename = f"icon-{size}x{size}.png"
-        filepath = os.path.join(icons_dir, filename)
+    hashes = {"source": source_fingerprint, "files": {**hashes.get("files", {}), **files}}
+    save_hashes(icons_dir, hashes)
 
-        if PIL_AVAILABLE:
-            icon = create_simple_icon(size)
-            if icon:
-                icon.save(filepath, "PNG")
-                print(f"✅ Created {filename}")
-        else:
-            # Create empty file as placeholder
-            with open(filepath, "w") as f:
-                f.write(f"# Placeholder for {size}x{size} icon")
-            print(f"📝 Created placeholder {filename}")
+    if os.path.exists(manifest_path) and update_manifest(manifest_path):
+        print(f"📝 Updated icon list in {manifest_path}")
 
     print("\n🎉 Icon generation complete!")
-
-    if not PIL_AVAILABLE:
-        print("\n📋 Next steps:")
-        print("1. Install Pillow for better icon generation: pip install Pillow")
-        print("2. Or create custom icons using online tools:")
-        print("   - https://realfavicongenerator.net/")
-        print("   - https://www.favicon-generator.org/")
-        print("3. Replace placeholder files in static/icons/ with actual PNG icons")
+    return 0
 
 
 if __name__ == "__main__":
-    generate_icons()
+    parser = argparse.ArgumentParser(description="Generate MoodTunes PWA icons")
+    parser.add_argument("--force", action="store_true", help="rebuild every icon even if up to date")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    args = parser.parse_args()
+    sys.exit(generate_icons(force=args.force, max_workers=args.workers))
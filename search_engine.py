@@ -0,0 +1,466 @@
+"""
+Playlist Search Engine for MoodTunes PWA
+
+Lazy, generator-based matching behind the /search-playlists endpoint.
+
+Matches are produced one at a time in catalog order, so callers decide how
+much work to do:
+
+- the classic JSON response drains the generator
+- ``limit``/``cursor`` pagination builds only one page of results and
+  resumes later from the catalog position encoded in the cursor
+- the NDJSON response streams each match as soon as it is found
+
+Only one page of result objects is ever held in memory per request; the
+remaining matches are merely counted to report ``total``.
+
+``sort=relevance`` swaps the catalog-order generator for RankedPage, which
+takes the top results from a weighted relevance scorer instead.
+
+A SearchDeadline bounds the whole request: stages run cheapest first
+(exact key, lexical scan, semantic fallback), the lexical scan checks the
+clock every DEADLINE_CHECK_INTERVAL moods, and later stages are skipped
+once the budget is spent, leaving a partial result.
+
+Category facets are bitsets over catalog positions (bit i = i-th mood),
+the same layout as the binary catalog format: a filter is a bit test per
+match (an AND with the match set), and facet counts are popcounts of the
+match bitmap ANDed with each category.
+"""
+
+import base64
+import binascii
+import re
+import time
+from contextlib import contextmanager
+
+from normalizer import normalize_text
+
+
+def mood_matches(query, mood_key, mood_info):
+    """
+    Check whether a mood matches a (lowercase) search query.
+
+    Args:
+        query (str): Lowercased search term
+        mood_key (str): Internal mood identifier
+        mood_info (dict): Entry from mood_metadata
+
+    Returns:
+        bool: True if the query is a substring of the key, name,
+            description or any keyword (case-insensitive)
+    """
+    return (
+        query in mood_key.lower()
+        or query in mood_info.get("name", "").lower()
+        or query in mood_info.get("description", "").lower()
+        or any(query in keyword.lower() for keyword in mood_info.get("keywords", []))
+    )
+
+
+# Moods scanned between two clock reads of a search deadline
+DEADLINE_CHECK_INTERVAL = 32
+
+
+class SearchDeadline:
+    """
+    Time budget shared by the stages of one search.
+
+    Args:
+        budget (float, optional): Seconds available; None or 0 = unlimited
+        clock (callable): Monotonic clock in seconds (injectable for tests)
+
+    Attributes:
+        partial (bool): Set when a stage stopped early or was skipped
+        resume_at (int | None): Catalog position where the lexical scan stopped
+        timings (dict): Stage name -> milliseconds spent in it
+    """
+
+    def __init__(self, budget=None, clock=time.perf_counter):
+        self._clock = clock
+        self.expires_at = clock() + budget if budget else None
+        self.partial = False
+        self.resume_at = None
+        self.timings = {}
+        self._paused = 0.0  # Seconds spent inside paused()
+
+    def expired(self):
+        """True once the budget is spent (never for an unlimited deadline)."""
+        return self.expires_at is not None and self._clock() >= self.expires_at
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as stage ``name`` (excluding time spent paused)."""
+        start, paused = self._clock(), self._paused
+        try:
+            yield
+        finally:
+            self.timings[name] = round((self._clock() - start - (self._paused - paused)) * 1000, 3)
+
+    @contextmanager
+    def paused(self):
+        """
+        Stop the clock while the enclosed block runs.
+
+        Used around a streaming generator's ``yield``: time the response
+        spends waiting on the client neither uses up the budget nor counts
+        towards the stage being timed.
+        """
+        start = self._clock()
+        try:
+            yield
+        finally:
+            elapsed = self._clock() - start
+            self._paused += elapsed
+            if self.expires_at is not None:
+                self.expires_at += elapsed
+
+
+def iter_matches(query, mood_playlists, mood_metadata, expansions=(), deadline=None):
+    """
+    Yield matching moods lazily in catalog order.
+
+    Args:
+        query (str): Lowercased search term
+        mood_playlists (dict): Mood key -> Spotify playlist ID
+        mood_metadata (dict): Mood key -> metadata
+        expansions (tuple): Synonyms of the query (see synonyms.py); a mood
+            matching any of them matches too
+        deadline (SearchDeadline, optional): Stop early (marking the deadline
+            partial) once it expires
+
+    Yields:
+        tuple: (catalog position, mood key) for each match
+    """
+    for position, mood_key in enumerate(mood_playlists):
+        if deadline is not None and not position % DEADLINE_CHECK_INTERVAL and deadline.expired():
+            deadline.partial, deadline.resume_at = True, position
+            return
+        mood_info = mood_metadata.get(mood_key, {})
+        if mood_matches(query, mood_key, mood_info) or (
+            expansions and any(mood_matches(term, mood_key, mood_info) for term in expansions)
+        ):
+            yield position, mood_key
+
+
+# Raw cursor text: resume position, then an optional position already returned earlier
+CURSOR_PATTERN = re.compile(r"p(\d+)(?:s(\d+))?")
+
+
+def encode_cursor(position, skip=None):
+    """
+    Encode the catalog position to resume from as an opaque, URL-safe cursor.
+
+    Args:
+        position (int): Catalog position the next page starts at
+        skip (int, optional): Later catalog position the resumed scan must not
+            return again (an exact match already added to an earlier,
+            deadline-cut page)
+    """
+    raw = f"p{position}" if skip is None else f"p{position}s{skip}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def parse_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Args:
+        cursor (str): Cursor from a previous response
+
+    Returns:
+        tuple: (catalog position to resume from, position to skip or None)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    match = CURSOR_PATTERN.fullmatch(raw)
+    if match is None:
+        raise ValueError("Invalid cursor")
+    position, skip = match.groups()
+    return int(position), None if skip is None else int(skip)
+
+
+def decode_cursor(cursor):
+    """Catalog position (or rank offset) a cursor resumes from; see parse_cursor()."""
+    return parse_cursor(cursor)[0]
+
+
+if hasattr(int, "bit_count"):  # Python 3.10+
+    popcount = int.bit_count
+else:
+
+    def popcount(value):
+        """Number of set bits in a non-negative int."""
+        return bin(value).count("1")
+
+
+def bit_is_set(bitmap, position):
+    """Test one bit of a little-endian bitmap (bytes-like)."""
+    return bitmap[position >> 3] >> (position & 7) & 1
+
+
+class FacetIndex:
+    """
+    Precomputed category bitsets over catalog positions.
+
+    Args:
+        mood_playlists (dict): Mood key -> playlist ID (defines catalog order)
+        mood_categories (dict): Category name -> {"moods": [...], ...}
+    """
+
+    def __init__(self, mood_playlists, mood_categories):
+        self.size = len(mood_playlists)
+        self.positions = {mood_key: position for position, mood_key in enumerate(mood_playlists)}
+        self.bitsets = {}
+        for name, info in mood_categories.items():
+            bits = 0
+            for mood_key in info.get("moods", []):
+                if mood_key in self.positions:
+                    bits |= 1 << self.positions[mood_key]
+            self.bitsets[name] = bits
+        self._names = {name.lower(): name for name in self.bitsets}
+
+    def allowed(self, categories):
+        """
+        Bitmap of the moods in any of the given categories.
+
+        Args:
+            categories (list): Category names (case-insensitive)
+
+        Returns:
+            bytes: Little-endian bitmap over catalog positions
+
+        Raises:
+            ValueError: If a category does not exist
+        """
+        mask = 0
+        for category in categories:
+            name = self._names.get(category.lower())
+            if name is None:
+                raise ValueError(f"Unknown category: {category}")
+            mask |= self.bitsets[name]
+        return mask.to_bytes((self.size + 7) // 8, "little")
+
+    def counts(self, match_bitmap):
+        """
+        Facet counts for a match set.
+
+        Args:
+            match_bitmap (bytes-like | None): Little-endian bitmap of matching
+                positions (None when no stage produced one, e.g. after a deadline)
+
+        Returns:
+            dict: Category name -> number of matching moods in it
+        """
+        matches = int.from_bytes(match_bitmap or b"", "little")
+        return {name: popcount(matches & bits) for name, bits in self.bitsets.items()}
+
+
+class SearchPage:
+    """
+    One page of lazily computed search results.
+
+    Iterating the page yields at most ``limit`` mood keys straight from the
+    match generator, so streaming consumers can send the first matches
+    before later ones are computed. Matches before the cursor and after the
+    page are only counted; once iteration finishes, ``total`` and
+    ``next_cursor`` describe the whole (filtered) result set.
+
+    Args:
+        matches (iterator): Output of iter_matches()
+        start (int): Catalog position the page starts at (see decode_cursor)
+        limit (int, optional): Maximum results on this page (None = all)
+        allowed (bytes, optional): Category filter bitmap (see FacetIndex.allowed)
+        catalog_size (int, optional): Record every match, before filtering, in
+            ``match_bitmap`` (needed for facet counts)
+        deadline (SearchDeadline, optional): Deadline given to iter_matches();
+            if it cut the scan short, ``next_cursor`` resumes where it stopped
+        skip (int, optional): Catalog position counted in ``total`` but not
+            yielded, because an earlier page already returned it (see
+            parse_cursor); carried into ``next_cursor`` until the scan passes it
+    """
+
+    def __init__(self, matches, start=0, limit=None, allowed=None, catalog_size=None, deadline=None, skip=None):
+        self._matches = matches
+        self.deadline = deadline
+        self.skip = skip
+        self.start = start
+        self.limit = limit
+        self.allowed = allowed
+        self.total = 0
+        self.next_cursor = None
+        self.match_bitmap = bytearray((catalog_size + 7) // 8) if catalog_size is not None else None
+
+    def __iter__(self):
+        emitted = 0
+        allowed, match_bitmap = self.allowed, self.match_bitmap
+        for position, mood_key in self._matches:
+            if match_bitmap is not None:
+                match_bitmap[position >> 3] |= 1 << (position & 7)
+            if allowed is not None and not bit_is_set(allowed, position):
+                continue
+            self.total += 1
+            if position < self.start or position == self.skip:
+                continue
+            if self.limit is None or emitted < self.limit:
+                emitted += 1
+                yield mood_key
+            elif self.next_cursor is None:
+                self.next_cursor = self._cursor(position)
+        deadline = self.deadline
+        if deadline is not None and deadline.resume_at is not None and self.next_cursor is None:
+            self.next_cursor = self._cursor(max(deadline.resume_at, self.start))
+
+    def _cursor(self, position):
+        skip = self.skip if self.skip is not None and self.skip >= position else None
+        return encode_cursor(position, skip)
+
+
+class RankedPage:
+    """
+    One page of relevance-ranked search results (see search_scorer.py).
+
+    Offers the same interface as SearchPage; here the cursor encodes the
+    rank offset of the next page rather than a catalog position.
+
+    Args:
+        scorer (PythonScorer | NumpyScorer): Relevance scorer
+        query (str): Lowercased search term
+        start (int): Rank offset the page starts at
+        limit (int, optional): Maximum results on this page (None = all)
+        expansions (tuple): Synonyms of the query (see synonyms.py)
+        allowed (bytes, optional): Category filter bitmap (see FacetIndex.allowed)
+        deadline (SearchDeadline, optional): Scoring is one step; it is skipped
+            (leaving the page empty and partial) if the deadline already expired
+    """
+
+    def __init__(self, scorer, query, start=0, limit=None, expansions=(), allowed=None, deadline=None):
+        self._scorer = scorer
+        self.deadline = deadline
+        self.query = query
+        self.expansions = expansions
+        self.allowed = allowed
+        self.start = start
+        self.limit = limit
+        self.total = 0
+        self.next_cursor = None
+        self.match_bitmap = None
+
+    def __iter__(self):
+        if self.deadline is not None and self.deadline.expired():
+            self.deadline.partial = True
+            return
+        end = None if self.limit is None else self.start + self.limit
+        ranking = self._scorer.rank(self.query, end, expansions=self.expansions, allowed=self.allowed)
+        self.total, self.match_bitmap = ranking.total, ranking.match_bitmap
+        if end is not None and end < self.total:
+            self.next_cursor = encode_cursor(end)
+        for mood_key, _score in ranking.results[self.start :]:
+            yield mood_key
+
+
+# Word tokens of highlightable fields; "feel-good" is two tokens
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class HighlightIndex:
+    """
+    Token positions of every highlightable field, recorded once per catalog.
+
+    Each name, description and keyword is tokenized when the index is
+    built; every token prefix maps to the slots of the tokens it starts, so
+    locating a query word in a result is one dict lookup instead of a
+    string scan. Multi-word terms match runs of consecutive tokens in the
+    same field value (all but the last word whole, the last as a prefix).
+    Tokens are normalized like queries (see normalizer.py) while their
+    offsets still point into the original strings, so "cafe" highlights
+    "Café".
+
+    Spans are token aligned: a term that only occurs inside a word ("appy"
+    in "happy") still matches the mood but is not highlighted.
+
+    Args:
+        mood_playlists (dict): Mood key -> playlist ID (defines the catalog)
+        mood_metadata (dict): Mood key -> metadata
+    """
+
+    def __init__(self, mood_playlists, mood_metadata):
+        self._moods = {}
+        for mood_key in mood_playlists:
+            mood_info = mood_metadata.get(mood_key, {})
+            values = [("name", None, mood_info.get("name", "")), ("description", None, mood_info.get("description", ""))]
+            values += [("keywords", index, keyword) for index, keyword in enumerate(mood_info.get("keywords", []))]
+
+            tokens = []  # (field, keyword index, normalized token, start offset, end offset)
+            prefixes = {}  # Token prefix -> token slots
+            for field, item, value in values:
+                for match in TOKEN_PATTERN.finditer(value):
+                    token = normalize_text(match.group())
+                    if not token:
+                        continue  # e.g. a lone underscore
+                    slot = len(tokens)
+                    tokens.append((field, item, token, match.start(), match.end()))
+                    for length in range(1, len(token) + 1):
+                        prefixes.setdefault(token[:length], []).append(slot)
+            self._moods[mood_key] = (tokens, prefixes)
+
+    def spans(self, mood_key, terms):
+        """
+        Highlight spans of search terms in one mood's fields.
+
+        Args:
+            mood_key (str): Internal mood identifier
+            terms (iterable): Normalized query plus any synonym expansions
+
+        Returns:
+            dict: {"name": [[start, end], ...], "description": [...],
+                "keywords": [[keyword index, start, end], ...]} with sorted,
+                merged character offsets into the original strings
+        """
+        tokens, prefixes = self._moods.get(mood_key, ((), {}))
+        found = {}
+        for term in terms:
+            words = TOKEN_PATTERN.findall(term)
+            if not words:
+                continue
+            last = len(words) - 1
+            for slot in prefixes.get(words[0], ()):
+                end_slot = slot + last
+                if end_slot >= len(tokens):
+                    continue
+                field, item, first, start, _end = tokens[slot]
+                run = tokens[slot + 1 : end_slot + 1]
+                # A multi-word term is a run in one value: whole words, then a prefix
+                if last and first != words[0]:
+                    continue
+                if any((other[0], other[1]) != (field, item) for other in run):
+                    continue
+                if any(other[2] != word for other, word in zip(run[:-1], words[1:last])):
+                    continue
+                if run and not run[-1][2].startswith(words[last]):
+                    continue
+                _, _, token, token_start, token_end = tokens[end_slot]
+                # Prefix offsets hold while normalization kept the length; otherwise mark the whole token
+                end = token_start + len(words[last]) if len(token) == token_end - token_start else token_end
+                found.setdefault((field, item), []).append((start, end))
+
+        highlights = {"name": [], "description": [], "keywords": []}
+        for (field, item), spans in sorted(found.items(), key=lambda entry: (entry[0][0], entry[0][1] or 0)):
+            for start, end in _merge_spans(spans):
+                highlights[field].append([start, end] if item is None else [item, start, end])
+        return highlights
+
+
+def _merge_spans(spans):
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
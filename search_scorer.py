@@ -0,0 +1,253 @@
+"""
+Weighted Relevance Scoring for MoodTunes Search
+
+Ranks moods by where a query matches: a hit in the mood key or display name
+is worth more than one in a keyword, which is worth more than one in the
+description (see FIELD_WEIGHTS). A field counts once however many of its
+keywords match, so scores are small integers and ranking is exact.
+
+Two interchangeable scorers produce identical results:
+
+- PythonScorer: scans every mood, fastest for the built-in catalog
+- NumpyScorer: stores the catalog as a sparse term-document matrix in CSR
+  form (rows = unique lowercased field values, columns = (field, mood)
+  pairs). A query marks the matching vocabulary rows with vectorized
+  substring search, gathers their columns, and scores every mood with one
+  dense product of the field weights and the resulting hit matrix. Top-k
+  uses ``argpartition``. Pays off on large catalogs
+  (see scripts/benchmark_search.py).
+
+Ties are broken by catalog order in both scorers. NumPy is optional:
+without it ``NUMPY_AVAILABLE`` is False and only PythonScorer can be used.
+"""
+
+from collections import namedtuple
+
+from search_engine import bit_is_set
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Result of a scorer's rank(): results are (mood_key, score) pairs best first,
+# total counts every (filtered) match, match_bitmap marks every match before filtering
+Ranking = namedtuple("Ranking", "results total match_bitmap")
+
+# Relevance weight of a query hit in each field, in column-block order
+FIELD_WEIGHTS = {"key": 4, "name": 4, "keywords": 2, "description": 1}
+
+# Vocabulary length buckets: each bucket is a fixed-width string array padded
+# only to its own limit, so long descriptions do not inflate short terms
+VOCABULARY_BUCKETS = (16, 32, 64, 128, 256)
+
+
+def field_values(mood_key, mood_info):
+    """
+    Lowercased searchable values of one mood, grouped by field.
+
+    Args:
+        mood_key (str): Internal mood identifier
+        mood_info (dict): Entry from mood_metadata
+
+    Returns:
+        dict: Field name (as in FIELD_WEIGHTS) -> list of strings
+    """
+    return {
+        "key": [mood_key.lower()],
+        "name": [mood_info.get("name", "").lower()],
+        "keywords": [keyword.lower() for keyword in mood_info.get("keywords", [])],
+        "description": [mood_info.get("description", "").lower()],
+    }
+
+
+class PythonScorer:
+    """
+    Reference scorer: one pass over the catalog per query.
+
+    Args:
+        mood_playlists (dict): Mood key -> playlist ID (defines catalog order)
+        mood_metadata (dict): Mood key -> metadata
+    """
+
+    def __init__(self, mood_playlists, mood_metadata):
+        self.mood_keys = list(mood_playlists)
+        self._fields = [field_values(mood_key, mood_metadata.get(mood_key, {})) for mood_key in self.mood_keys]
+
+    def rank(self, query, k=None, expansions=(), allowed=None):
+        """
+        Rank moods by relevance.
+
+        Args:
+            query (str): Lowercased search term
+            k (int, optional): Number of results to return (None = all matches)
+            expansions (tuple): Synonyms of the query; a field counts as hit
+                when it contains the query or any synonym
+            allowed (bytes, optional): Category filter bitmap (see search_engine.FacetIndex)
+
+        Returns:
+            Ranking: Top results, total matches and the unfiltered match bitmap
+        """
+        scored = []
+        match_bitmap = bytearray((len(self.mood_keys) + 7) // 8)
+        for position, fields in enumerate(self._fields):
+            score = 0
+            for field, values in fields.items():
+                for value in values:
+                    if query in value or (expansions and any(term in value for term in expansions)):
+                        score += FIELD_WEIGHTS[field]
+                        break
+            if score:
+                match_bitmap[position >> 3] |= 1 << (position & 7)
+                if allowed is None or bit_is_set(allowed, position):
+                    scored.append((-score, position))
+
+        scored.sort()
+        results = [(self.mood_keys[position], -score) for score, position in scored[:k]]
+        return Ranking(results, len(scored), bytes(match_bitmap))
+
+    def top_k(self, query, k=None, expansions=()):
+        """
+        Rank moods by relevance without filtering.
+
+        Returns:
+            tuple: ([(mood_key, score), ...] best first, total number of matches)
+        """
+        ranking = self.rank(query, k, expansions)
+        return ranking.results, ranking.total
+
+
+class NumpyScorer:
+    """
+    Vectorized scorer over a sparse (CSR) term-document matrix.
+
+    Args:
+        mood_playlists (dict): Mood key -> playlist ID (defines catalog order)
+        mood_metadata (dict): Mood key -> metadata
+    """
+
+    def __init__(self, mood_playlists, mood_metadata):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumpyScorer requires NumPy (pip install numpy)")
+
+        self.mood_keys = list(mood_playlists)
+        size = len(self.mood_keys)
+        fields = list(FIELD_WEIGHTS)
+
+        # Collect (term, column) pairs; column = field block * size + catalog position
+        term_ids = {}
+        pairs = set()
+        for position, mood_key in enumerate(self.mood_keys):
+            values = field_values(mood_key, mood_metadata.get(mood_key, {}))
+            for block, field in enumerate(fields):
+                for value in values[field]:
+                    if value:
+                        pairs.add((term_ids.setdefault(value, len(term_ids)), block * size + position))
+
+        # Renumber terms by length so every length bucket is a contiguous id range
+        terms = sorted(term_ids, key=len)
+        renumber = np.empty(len(terms), dtype=np.int64)
+        renumber[[term_ids[term] for term in terms]] = np.arange(len(terms))
+
+        self._buckets = []  # (first term id, longest term, fixed-width string array)
+        first = 0
+        longest = len(terms[-1]) if terms else 0
+        for limit in sorted({*VOCABULARY_BUCKETS, longest}):
+            last = first
+            while last < len(terms) and len(terms[last]) <= limit:
+                last += 1
+            if last > first:
+                self._buckets.append((first, len(terms[last - 1]), np.array(terms[first:last])))
+            first = last
+
+        # CSR arrays: columns of term t are indices[indptr[t]:indptr[t + 1]]
+        pair_array = np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+        rows = renumber[pair_array[:, 0]]
+        order = np.argsort(rows, kind="stable")
+        self.indices = pair_array[order, 1]
+        self.indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(terms)), out=self.indptr[1:])
+
+        self._size = size
+        self._weights = np.array([FIELD_WEIGHTS[field] for field in fields], dtype=np.int64)
+        # Fold catalog order into the sort key so ties resolve like PythonScorer
+        self._tiebreak = size - 1 - np.arange(size, dtype=np.int64)
+
+    def _matching_terms(self, terms):
+        matched = [
+            first + np.flatnonzero(np.char.find(bucket, term) >= 0)
+            for term in terms
+            for first, longest, bucket in self._buckets
+            if longest >= len(term)
+        ]
+        return np.unique(np.concatenate(matched)) if matched else np.empty(0, dtype=np.int64)
+
+    def scores(self, query, expansions=()):
+        """
+        Score every mood at once.
+
+        Returns:
+            numpy.ndarray: int64 relevance per catalog position
+        """
+        rows = self._matching_terms((query, *expansions))
+        starts, ends = self.indptr[rows], self.indptr[rows + 1]
+        lengths = ends - starts
+        # Gather every column of the matched rows without a Python loop
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        hits = np.zeros(len(self._weights) * self._size, dtype=np.int64)
+        hits[self.indices[offsets]] = 1
+        return self._weights @ hits.reshape(len(self._weights), self._size)
+
+    def rank(self, query, k=None, expansions=(), allowed=None):
+        """
+        Rank moods by relevance (same contract as PythonScorer.rank).
+
+        Returns:
+            Ranking: Top results, total matches and the unfiltered match bitmap
+        """
+        scores = self.scores(query, expansions)
+        match_bitmap = np.packbits(scores > 0, bitorder="little").tobytes()
+        if allowed is not None:
+            # The category filter is one vectorized AND with the match set
+            scores = scores * np.unpackbits(np.frombuffer(allowed, dtype=np.uint8), count=self._size, bitorder="little")
+
+        total = int(np.count_nonzero(scores))
+        k = total if k is None else min(k, total)
+        if k == 0:
+            return Ranking([], total, match_bitmap)
+
+        keys = scores * self._size + self._tiebreak
+        candidates = np.argpartition(-keys, k - 1)[:k]
+        ordered = candidates[np.argsort(-keys[candidates])]
+        results = [(self.mood_keys[position], int(scores[position])) for position in ordered.tolist()]
+        return Ranking(results, total, match_bitmap)
+
+    def top_k(self, query, k=None, expansions=()):
+        """
+        Rank moods by relevance without filtering (same contract as PythonScorer.top_k).
+
+        Returns:
+            tuple: ([(mood_key, score), ...] best first, total number of matches)
+        """
+        ranking = self.rank(query, k, expansions)
+        return ranking.results, ranking.total
+
+
+def create_scorer(mood_playlists, mood_metadata, engine="auto", numpy_threshold=1000):
+    """
+    Build the scorer best suited to the catalog.
+
+    Args:
+        mood_playlists (dict): Mood key -> playlist ID
+        mood_metadata (dict): Mood key -> metadata
+        engine (str): "python", "numpy" or "auto"
+        numpy_threshold (int): Catalog size from which "auto" picks NumPy
+
+    Returns:
+        PythonScorer | NumpyScorer: Scorer instance
+    """
+    if engine == "numpy" or (engine == "auto" and NUMPY_AVAILABLE and len(mood_playlists) >= numpy_threshold):
+        return NumpyScorer(mood_playlists, mood_metadata)
+    return PythonScorer(mood_playlists, mood_metadata)
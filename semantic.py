@@ -0,0 +1,160 @@
+"""
+Offline Semantic Matching for MoodTunes Search
+
+Fallback for queries that share no substring with the catalog, e.g.
+"gym session" or "need to concentrate". Everything runs locally: no model
+download, no network.
+
+Each mood's name, description and keywords are embedded with the hashing
+trick: character n-grams of every word (plus the whole word) are hashed
+with CRC32 into a fixed number of signed buckets. Related word forms share
+most of their n-grams ("concentrate" / "concentration"), which is what lets
+the fallback match without an exact keyword hit.
+
+Bucket weights are scaled by inverse document frequency, so n-grams that
+occur in most moods count for little. Rows are L2-normalized and stacked
+into one NumPy matrix, so a query costs one matrix-vector product (cosine
+similarity for every mood) plus an ``argpartition`` top-k.
+
+NumPy is optional: without it ``NUMPY_AVAILABLE`` is False and the
+fallback is disabled.
+"""
+
+import re
+import zlib
+from collections import Counter
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Frequent words that carry no mood information and would only add noise
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from get i in into is it me my need of on or so some "
+    "something songs music playlist that the to want with you your".split()
+)
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class HashingVectorizer:
+    """
+    Stateless text embedder using hashed character n-grams.
+
+    Args:
+        dim (int): Number of hash buckets (a power of two)
+        ngram_sizes (tuple): Character n-gram lengths taken from each padded word
+        word_weight (float): Extra weight of the whole-word feature
+    """
+
+    def __init__(self, dim=4096, ngram_sizes=(3, 4), word_weight=2.0):
+        if dim & (dim - 1):
+            raise ValueError("dim must be a power of two")
+        self.dim = dim
+        self.ngram_sizes = ngram_sizes
+        self.word_weight = word_weight
+
+    def features(self, text):
+        """
+        Hash ``text`` into sparse signed bucket weights.
+
+        Returns:
+            Counter: Bucket index -> weight
+        """
+        features = Counter()
+        for word in WORD_PATTERN.findall(text.lower()):
+            if word in STOP_WORDS:
+                continue
+            self._add(features, "w:" + word, self.word_weight)
+            padded = f" {word} "
+            for size in self.ngram_sizes:
+                for start in range(len(padded) - size + 1):
+                    self._add(features, padded[start : start + size], 1.0)
+        return features
+
+    def _add(self, features, token, weight):
+        hashed = zlib.crc32(token.encode())  # Stable across processes, unlike hash()
+        features[hashed & (self.dim - 1)] += -weight if hashed >> 31 else weight
+
+    def transform(self, texts):
+        """
+        Embed texts as dense rows of raw bucket weights.
+
+        Args:
+            texts (list): Strings to embed
+
+        Returns:
+            numpy.ndarray: float32 matrix of shape (len(texts), dim)
+        """
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for bucket, weight in self.features(text).items():
+                matrix[row, bucket] = weight
+        return matrix
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def mood_document(mood_key, mood_info):
+    """Text embedded for one mood: key, name, description and keywords."""
+    return " ".join([mood_key, mood_info.get("name", ""), mood_info.get("description", ""), *mood_info.get("keywords", [])])
+
+
+class SemanticIndex:
+    """
+    Cosine top-k over embedded mood documents.
+
+    Args:
+        mood_playlists (dict): Mood key -> playlist ID (defines catalog order)
+        mood_metadata (dict): Mood key -> metadata
+        vectorizer (HashingVectorizer, optional): Embedder (default settings when omitted)
+    """
+
+    def __init__(self, mood_playlists, mood_metadata, vectorizer=None):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("SemanticIndex requires NumPy (pip install numpy)")
+
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.mood_keys = list(mood_playlists)
+        self._positions = {mood_key: position for position, mood_key in enumerate(self.mood_keys)}
+
+        counts = self.vectorizer.transform(
+            [mood_document(mood_key, mood_metadata.get(mood_key, {})) for mood_key in self.mood_keys]
+        )
+        # Inverse document frequency: n-grams shared by many moods ("ing", "ous") say little
+        document_frequency = np.count_nonzero(counts, axis=0)
+        self.idf = (np.log((len(self.mood_keys) + 1) / (document_frequency + 1)) + 1).astype(np.float32)
+        self.matrix = _normalize_rows(counts * self.idf)
+
+    def search(self, query, k=3, min_similarity=0.1, exclude=()):
+        """
+        Find the moods most similar to ``query``.
+
+        Args:
+            query (str): Free-text query
+            k (int): Maximum number of results
+            min_similarity (float): Cosine similarity a mood needs to be returned
+            exclude (iterable): Mood keys to leave out (e.g. lexical hits)
+
+        Returns:
+            list: [(mood_key, similarity), ...] most similar first
+        """
+        vector = _normalize_rows(self.vectorizer.transform([query]) * self.idf)[0]
+        similarities = self.matrix @ vector
+        for mood_key in exclude:
+            if mood_key in self._positions:
+                similarities[self._positions[mood_key]] = 0.0
+
+        candidates = np.flatnonzero(similarities >= min_similarity)
+        if candidates.size > k:
+            candidates = candidates[np.argpartition(-similarities[candidates], k - 1)[:k]]
+        # Stable sort keeps catalog order among equal similarities
+        ordered = candidates[np.argsort(-similarities[candidates], kind="stable")]
+        return [(self.mood_keys[position], float(similarities[position])) for position in ordered.tolist()]
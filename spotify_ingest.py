@@ -0,0 +1,227 @@
+"""
+Spotify Playlist Track Ingestion for MoodTunes PWA
+
+The catalog only stores playlist IDs. This worker fetches each playlist's
+tracks (title, artists, duration) from the Spotify Web API and keeps them
+in an on-disk cache that the app serves from (``/tracks/<mood>``), so
+requests never wait on Spotify.
+
+Pieces:
+
+- SpotifyClient: client-credentials auth plus paged playlist fetches over
+  one pooled ``requests`` session (keep-alive connections sized to the
+  worker count, retries with backoff on 429/5xx). Any object with a
+  ``fetch_playlist(playlist_id)`` method can stand in for it.
+- TrackCache (track_cache.py): the on-disk cache; entries older than its
+  TTL are stale and get refetched on the next run.
+- ingest(): fetches every stale playlist concurrently on a thread pool and
+  reports what was fetched, reused and failed.
+
+Run ``python spotify_ingest.py`` with SPOTIFY_CLIENT_ID/SPOTIFY_CLIENT_SECRET
+set, or point ``--api-url``/``--token-url`` at fake_spotify.py to run the
+whole pipeline offline. ``requests`` is optional for the app itself:
+without it ``REQUESTS_AVAILABLE`` is False and only the cache can be read.
+"""
+
+import os
+import time
+import argparse
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from track_cache import PlaylistTracks, Track, TrackCache
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+SPOTIFY_API_URL = "https://api.spotify.com/v1"
+SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
+
+# Only the fields we store, which keeps Spotify's responses small
+TRACK_FIELDS = "items(track(id,name,duration_ms,artists(name))),next"
+
+# fetched / cached: playlist IDs; failed: playlist ID -> error message
+IngestReport = namedtuple("IngestReport", "fetched cached failed")
+
+
+class SpotifyClient:
+    """
+    Minimal Spotify Web API client for playlist contents.
+
+    Args:
+        client_id (str): Spotify application client ID
+        client_secret (str): Spotify application client secret
+        api_url (str): Web API base URL
+        token_url (str): Accounts service token endpoint
+        pool_size (int): Keep-alive connections kept per host
+        timeout (float): Seconds per HTTP request
+        retries (int): Retries for connection errors, 429 and 5xx responses
+    """
+
+    def __init__(
+        self,
+        client_id,
+        client_secret,
+        api_url=SPOTIFY_API_URL,
+        token_url=SPOTIFY_TOKEN_URL,
+        pool_size=8,
+        timeout=10.0,
+        retries=3,
+    ):
+        if not REQUESTS_AVAILABLE:
+            raise RuntimeError("SpotifyClient requires requests (pip install requests)")
+
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.api_url = api_url.rstrip("/")
+        self.token_url = token_url
+        self.timeout = timeout
+
+        # One session shared by all worker threads: its adapter pools the connections
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._token = None
+        self._token_expires = 0.0
+        self._token_lock = threading.Lock()
+
+    def _access_token(self):
+        """Client-credentials token, refreshed a minute before it expires."""
+        with self._token_lock:
+            if self._token is None or time.time() >= self._token_expires - 60:
+                response = self.session.post(
+                    self.token_url,
+                    data={"grant_type": "client_credentials"},
+                    auth=(self.client_id, self.client_secret),
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+                payload = response.json()
+                self._token = payload["access_token"]
+                self._token_expires = time.time() + payload.get("expires_in", 3600)
+            return self._token
+
+    def fetch_playlist(self, playlist_id):
+        """
+        Fetch every track of a playlist, following the API's paging.
+
+        Args:
+            playlist_id (str): Spotify playlist ID
+
+        Returns:
+            PlaylistTracks: Tracks in playlist order
+
+        Raises:
+            requests.RequestException: On HTTP errors that survive the retries
+        """
+        url = f"{self.api_url}/playlists/{playlist_id}/tracks"
+        params = {"limit": 100, "fields": TRACK_FIELDS}
+        tracks = []
+        while url:
+            response = self.session.get(
+                url, params=params, headers={"Authorization": f"Bearer {self._access_token()}"}, timeout=self.timeout
+            )
+            response.raise_for_status()
+            page = response.json()
+            for item in page.get("items", []):
+                track = item.get("track")
+                if track:  # Removed or local tracks come back as null
+                    tracks.append(
+                        Track(
+                            track.get("id"),
+                            track.get("name", ""),
+                            tuple(artist.get("name", "") for artist in track.get("artists", [])),
+                            int(track.get("duration_ms") or 0),
+                        )
+                    )
+            url, params = page.get("next"), None  # "next" already carries the query string
+        return PlaylistTracks(playlist_id, time.time(), tuple(tracks))
+
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
+
+
+def ingest(client, cache, playlist_ids, workers=4, force=False):
+    """
+    Fetch playlists whose cache entries are missing or stale, concurrently.
+
+    Args:
+        client (SpotifyClient): Anything with fetch_playlist(playlist_id)
+        cache (TrackCache): Destination cache
+        playlist_ids (iterable): Playlist IDs to ingest (duplicates are fetched once)
+        workers (int): Concurrent fetches
+        force (bool): Refetch even fresh entries
+
+    Returns:
+        IngestReport: Which playlists were fetched, reused from the cache or failed
+    """
+    playlist_ids = list(dict.fromkeys(playlist_ids))
+    cached = [] if force else [playlist_id for playlist_id in playlist_ids if cache.get(playlist_id) is not None]
+    pending = [playlist_id for playlist_id in playlist_ids if playlist_id not in cached]
+
+    def fetch(playlist_id):
+        entry = client.fetch_playlist(playlist_id)
+        cache.put(entry)
+        return playlist_id
+
+    fetched, failed = [], {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {playlist_id: pool.submit(fetch, playlist_id) for playlist_id in pending}
+        for playlist_id, future in futures.items():
+            try:
+                fetched.append(future.result())
+            except Exception as e:  # One bad playlist must not abort the run
+                failed[playlist_id] = str(e)
+    return IngestReport(fetched, cached, failed)
+
+
+def main(argv=None):
+    """Ingest every playlist of the built-in catalog into the track cache."""
+    parser = argparse.ArgumentParser(description="Fetch playlist tracks into the MoodTunes track cache")
+    parser.add_argument("--cache-dir", default=os.environ.get("MOODTUNES_TRACK_CACHE_DIR", os.path.join("instance", "tracks")))
+    parser.add_argument("--ttl", type=float, default=float(os.environ.get("MOODTUNES_TRACK_CACHE_TTL", 24 * 3600)))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="Refetch fresh entries too")
+    parser.add_argument("--api-url", default=os.environ.get("SPOTIFY_API_URL", SPOTIFY_API_URL))
+    parser.add_argument("--token-url", default=os.environ.get("SPOTIFY_TOKEN_URL", SPOTIFY_TOKEN_URL))
+    args = parser.parse_args(argv)
+
+    from app import mood_playlists  # Lazy: the catalog lives in the app module
+
+    client = SpotifyClient(
+        os.environ.get("SPOTIFY_CLIENT_ID", ""),
+        os.environ.get("SPOTIFY_CLIENT_SECRET", ""),
+        api_url=args.api_url,
+        token_url=args.token_url,
+        pool_size=args.workers,
+    )
+    try:
+        report = ingest(client, TrackCache(args.cache_dir, ttl=args.ttl), mood_playlists.values(), args.workers, args.force)
+    finally:
+        client.close()
+
+    print(f"fetched {len(report.fetched)}, cached {len(report.cached)}, failed {len(report.failed)}")
+    for playlist_id, error in report.failed.items():
+        print(f"  {playlist_id}: {error}")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+"""
+Startup Profiler for MoodTunes PWA
+
+Records how long each startup phase takes (imports, catalog, Flask setup,
+route registration, ...) so cold starts on Render and every scale-up can be
+measured instead of guessed.
+
+A process-wide profiler is created the moment this module is imported, which
+is why app.py imports it before Flask: the first ``mark("imports")`` then
+covers the cost of importing the web stack.
+
+Usage:
+    python startup_profiler.py    # import app in a fresh interpreter and print the report
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """
+    Collects named startup phases and their durations.
+
+    Phases can be recorded either as a ``with profiler.phase(name):`` block or
+    with ``profiler.mark(name)``, which closes a phase that started at the
+    previous mark (or when the profiler was created).
+    """
+
+    def __init__(self):
+        self.phases = []  # (name, seconds) in the order they completed
+        self._started = time.perf_counter()
+        self._last_mark = self._started
+
+    def mark(self, name):
+        """Record the time elapsed since the previous mark as phase ``name``."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last_mark))
+        self._last_mark = now
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as phase ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.phases.append((name, end - start))
+            self._last_mark = end
+
+    @property
+    def total(self):
+        """Wall time from profiler creation to the last recorded phase."""
+        return self._last_mark - self._started
+
+    def as_dict(self):
+        """Return phase durations in milliseconds, plus the total."""
+        report = {name: round(seconds * 1000, 2) for name, seconds in self.phases}
+        report["total"] = round(self.total * 1000, 2)
+        return report
+
+    def format_report(self):
+        """Format the phases as a single log-friendly line."""
+        parts = [f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.phases]
+        return f"Startup {self.total * 1000:.1f}ms ({', '.join(parts)})"
+
+
+# Process-wide profiler covering module imports and the default app instance
+startup_profile = StartupProfiler()
+
+
+if __name__ == "__main__":
+    import app
+
+    for name, millis in app.app.extensions["startup_profile"].as_dict().items():
+        print(f"{name:<12} {millis:8.2f} ms")
@@ -10,8 +10,23 @@ const loadingDiv = document.getElementById('loading');
 const spotifyPlayer = document.getElementById('spotify-player');
 const spotifyIframe = document.getElementById('spotify-iframe');
 
+// Remember the user's timezone so the server can suggest moods for their local time
+function rememberTimezone() {
+    try {
+        const tz = Intl.DateTimeFormat().resolvedOptions().timeZone;
+        if (tz) {
+            document.cookie = `tz=${tz}; path=/; max-age=31536000; SameSite=Lax`;
+        }
+    } catch (e) {
+        // Intl unavailable: fall back to the numeric offset
+    }
+    document.cookie = `tz_offset=${new Date().getTimezoneOffset()}; path=/; max-age=31536000; SameSite=Lax`;
+}
+
 // Initialize app when DOM is loaded
 document.addEventListener('DOMContentLoaded', function() {
+    rememberTimezone();
+
     if (moodSelect) {
         moodSelect.addEventListener('change', handleMoodChange);
     }
@@ -51,6 +66,13 @@ document.addEventListener('DOMContentLoaded', function() {
             announceToScreenReader(`Selected ${moodText} mood from quick selection`);
         }
     });
+    
+    // Remove covers that fail to load so the emoji shows (error events do not bubble, so listen in the capture phase)
+    document.addEventListener('error', function(event) {
+        if (event.target.classList && event.target.classList.contains('mood-cover')) {
+            event.target.remove();
+        }
+    }, true);
 });
 
 // Handle mood selection change
@@ -315,7 +337,7 @@ async function performPlaylistSearch() {
         const data = await response.json();
         
         if (data.success) {
-            displaySearchResults(data.moods, query);
+            displaySearchResults(data.moods, query, data.track_matches);
         } else {
             throw new Error(data.error || 'Search failed');
         }
@@ -337,9 +359,18 @@ async function performPlaylistSearch() {
     }
 }
 
-// Display search results
-function displaySearchResults(moods, query) {
-    if (!moods || moods.length === 0) {
+// Display search results (moods, then moods whose playlists contain matching songs)
+function displaySearchResults(moods, query, trackMatches) {
+    moods = moods || [];
+    const songGroups = renderTrackMatches(trackMatches);
+    
+    if (moods.length === 0 && songGroups) {
+        searchResultsList.innerHTML = songGroups;
+        announceToScreenReader(`Found songs matching "${query}" in ${trackMatches.length} mood${trackMatches.length === 1 ? '' : 's'}.`);
+        return;
+    }
+    
+    if (moods.length === 0) {
         searchResultsList.innerHTML = `
             <div class="no-results">
                 <span role="img" aria-label="no results">🎵</span>
@@ -350,14 +381,14 @@ function displaySearchResults(moods, query) {
         return;
     }
     
-    // If only one result, automatically select it
-    if (moods.length === 1) {
+    // If only one result (and no song matches to choose from), automatically select it
+    if (moods.length === 1 && !songGroups) {
         const mood = moods[0];
         searchResultsList.innerHTML = `
             <div class="single-result">
                 <span role="img" aria-label="found">${mood.icon}</span>
-                <p>Found perfect match: <strong>${mood.name}</strong></p>
-                <p class="mood-description">${mood.description}</p>
+                <p>Found perfect match: <strong>${highlightText(mood.name, mood.highlights && mood.highlights.name)}</strong></p>
+                <p class="mood-description">${highlightText(mood.description, mood.highlights && mood.highlights.description)}</p>
             </div>
         `;
         
@@ -372,12 +403,13 @@ function displaySearchResults(moods, query) {
     
     // Multiple results - show selection list
     const moodCards = moods.map(mood => {
+        const highlights = mood.highlights || {};
         return `
             <div class="mood-search-card" data-mood-key="${mood.mood_key}">
-                <div class="mood-icon">${mood.icon}</div>
+                <div class="mood-icon">${coverImage(mood.mood_key)}<span class="mood-icon-emoji">${mood.icon}</span></div>
                 <div class="mood-info">
-                    <h3>${escapeHtml(mood.name)}</h3>
-                    <div class="mood-description">${escapeHtml(mood.description)}</div>
+                    <h3>${highlightText(mood.name, highlights.name)}</h3>
+                    <div class="mood-description">${highlightText(mood.description, highlights.description)}</div>
                     <div class="mood-category">${escapeHtml(mood.category)}</div>
                 </div>
                 <div class="mood-actions">
@@ -395,12 +427,57 @@ function displaySearchResults(moods, query) {
             <p>Choose the mood that best fits what you're looking for:</p>
         </div>
         ${moodCards}
+        ${songGroups}
     `;
     
     // Announce results to screen readers
     announceToScreenReader(`Found ${moods.length} mood${moods.length === 1 ? '' : 's'} for "${query}". Please select one.`);
 }
 
+// Playlist cover from our own origin (cacheable by the service worker); empty unless the server enables cover art
+function coverImage(moodKey) {
+    if (document.body.dataset.coverArt !== 'on') {
+        return '';
+    }
+    return `<img class="mood-cover" src="/cover/${encodeURIComponent(moodKey)}?size=64" width="64" height="64" loading="lazy" alt="">`;
+}
+
+// Moods whose playlists contain songs matching the search (title or artist)
+function renderTrackMatches(groups) {
+    if (!groups || groups.length === 0) {
+        return '';
+    }
+    
+    const cards = groups.map(group => {
+        const songs = group.tracks.map(track => `
+            <li>${escapeHtml(track.title)} <span class="track-artists">${escapeHtml(track.artists.join(', '))}</span></li>
+        `).join('');
+        const more = group.total > group.tracks.length ? `<li class="track-more">+${group.total - group.tracks.length} more</li>` : '';
+        return `
+            <div class="mood-search-card track-match-card" data-mood-key="${group.mood_key}">
+                <div class="mood-icon">${coverImage(group.mood_key)}<span class="mood-icon-emoji">${group.icon}</span></div>
+                <div class="mood-info">
+                    <h3>${escapeHtml(group.name)}</h3>
+                    <ul class="track-list">${songs}${more}</ul>
+                </div>
+                <div class="mood-actions">
+                    <button class="select-mood-btn" onclick="selectMoodFromSearch('${group.mood_key}', '${escapeHtml(group.name)}')">
+                        ${group.icon} Select
+                    </button>
+                </div>
+            </div>
+        `;
+    }).join('');
+    
+    return `
+        <div class="multiple-results-header track-matches-header">
+            <h3>Songs and artists</h3>
+            <p>Moods whose playlists include matching tracks:</p>
+        </div>
+        ${cards}
+    `;
+}
+
 // Select mood from search results (integrates with existing mood selection system)
 function selectMoodFromSearch(moodKey, moodName) {
     // Update the main mood selector if it exists
@@ -445,4 +522,21 @@ function escapeHtml(text) {
     const div = document.createElement('div');
     div.textContent = text;
     return div.innerHTML;
+}
+
+// Wrap server-computed match spans in <mark> (no client-side matching)
+// Spans are [start, end] code point offsets, hence Array.from rather than string indices
+function highlightText(text, spans) {
+    if (!spans || spans.length === 0) {
+        return escapeHtml(text);
+    }
+    const chars = Array.from(text);
+    let html = '';
+    let position = 0;
+    for (const [start, end] of spans) {
+        html += escapeHtml(chars.slice(position, start).join(''));
+        html += `<mark>${escapeHtml(chars.slice(start, end).join(''))}</mark>`;
+        position = end;
+    }
+    return html + escapeHtml(chars.slice(position).join(''));
 }
\ No newline at end of file
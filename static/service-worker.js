@@ -1,7 +1,7 @@
 // MoodTunes Service Worker
-const CACHE_NAME = 'moodtunes-v1.0.0';
+const CACHE_VERSION = 'v1.1.0';
+const PRECACHE_NAME = `moodtunes-precache-${CACHE_VERSION}`;
 const urlsToCache = [
-  '/',
   '/static/style.css',
   '/static/script.js',
   '/static/pwa.js',
@@ -10,15 +10,52 @@ const urlsToCache = [
   '/static/icons/icon-512x512.png'
 ];
 
-// Install event - cache resources
+// Runtime caches: each one holds at most maxEntries responses (least recently used evicted first)
+// and drops responses older than maxAgeSeconds
+const RUNTIME_CACHES = {
+  pages: { name: 'moodtunes-pages', maxEntries: 5, maxAgeSeconds: 24 * 60 * 60 },
+  api: { name: 'moodtunes-api', maxEntries: 60, maxAgeSeconds: 24 * 60 * 60 },
+  images: { name: 'moodtunes-images', maxEntries: 80, maxAgeSeconds: 30 * 24 * 60 * 60 }
+};
+const KNOWN_CACHES = [PRECACHE_NAME, ...Object.values(RUNTIME_CACHES).map(cache => cache.name)];
+
+// Navigations wait this long for the network before falling back to the cached page
+const NETWORK_TIMEOUT_MS = 3000;
+
+// Set on every stored response; read back for age eviction
+const CACHED_AT_HEADER = 'X-SW-Cached-At';
+
+// Route table: first match wins. Unmatched same-origin GETs go straight to the network
+const ROUTES = [
+  // The app shell: fresh HTML when online, the last copy when offline or slow
+  { match: (url, request) => request.mode === 'navigate' || url.pathname === '/', strategy: networkFirst, cache: RUNTIME_CACHES.pages },
+  // Content-addressed cover files never change
+  { match: url => url.pathname.startsWith('/covers/'), strategy: cacheFirst, cache: RUNTIME_CACHES.images },
+  // Cover redirects (cached as the image they lead to)
+  { match: url => url.pathname.startsWith('/cover/'), strategy: staleWhileRevalidate, cache: RUNTIME_CACHES.images },
+  // JSON APIs
+  {
+    match: url => ['/tracks/', '/recommendations/'].some(prefix => url.pathname.startsWith(prefix)) ||
+      ['/suggestions', '/stats/popular', '/version'].includes(url.pathname),
+    strategy: staleWhileRevalidate,
+    cache: RUNTIME_CACHES.api
+  },
+  // Static files are not fingerprinted, so they are revalidated in the background rather than cached forever
+  {
+    match: url => url.pathname.startsWith('/static/') || url.pathname === '/manifest.json',
+    strategy: staleWhileRevalidate,
+    cache: { name: PRECACHE_NAME }
+  }
+];
+
+// Install event - cache the app shell
 self.addEventListener('install', event => {
   console.log('Service Worker: Installing...');
   event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then(cache => {
-        console.log('Service Worker: Caching files');
-        return cache.addAll(urlsToCache);
-      })
+    Promise.all([
+      caches.open(PRECACHE_NAME).then(cache => cache.addAll(urlsToCache)),
+      fetch('/').then(response => putInCache(RUNTIME_CACHES.pages, new Request('/'), response))
+    ])
       .then(() => {
         console.log('Service Worker: Installation complete');
         return self.skipWaiting();
@@ -29,14 +66,14 @@ self.addEventListener('install', event => {
   );
 });
 
-// Activate event - cleanup old caches
+// Activate event - delete caches from older versions (including the old single cache)
 self.addEventListener('activate', event => {
   console.log('Service Worker: Activating...');
   event.waitUntil(
     caches.keys().then(cacheNames => {
       return Promise.all(
         cacheNames.map(cacheName => {
-          if (cacheName !== CACHE_NAME) {
+          if (!KNOWN_CACHES.includes(cacheName)) {
             console.log('Service Worker: Deleting old cache', cacheName);
             return caches.delete(cacheName);
           }
@@ -49,54 +86,162 @@ self.addEventListener('activate', event => {
   );
 });
 
-// Fetch event - serve from cache, fallback to network
+// Fetch event - dispatch to the route's caching strategy
 self.addEventListener('fetch', event => {
-  // Skip non-GET requests
+  // Skip non-GET requests (searches and playlist picks are POSTs)
   if (event.request.method !== 'GET') {
     return;
   }
 
   // Skip external requests (Spotify embeds)
-  if (!event.request.url.startsWith(self.location.origin)) {
+  const url = new URL(event.request.url);
+  if (url.origin !== self.location.origin) {
+    return;
+  }
+
+  const route = ROUTES.find(candidate => candidate.match(url, event.request));
+  if (!route) {
     return;
   }
 
   event.respondWith(
-    caches.match(event.request)
-      .then(response => {
-        // Return cached version or fetch from network
-        if (response) {
-          console.log('Service Worker: Serving from cache', event.request.url);
-          return response;
-        }
-
-        console.log('Service Worker: Fetching from network', event.request.url);
-        return fetch(event.request).then(response => {
-          // Don't cache if not a valid response
-          if (!response || response.status !== 200 || response.type !== 'basic') {
-            return response;
-          }
+    route.strategy(event, route.cache).catch(error => {
+      // Offline fallback
+      if (event.request.mode === 'navigate') {
+        return caches.match('/');
+      }
+      throw error;
+    })
+  );
+});
 
-          // Clone the response
-          const responseToCache = response.clone();
+// Network first: use the network response unless it fails or takes longer than NETWORK_TIMEOUT_MS
+async function networkFirst(event, cacheConfig) {
+  const network = fetchAndCache(event, cacheConfig);
+  event.waitUntil(network.catch(() => {}));
 
-          // Add to cache for future use
-          caches.open(CACHE_NAME)
-            .then(cache => {
-              cache.put(event.request, responseToCache);
-            });
+  let timer;
+  const timeout = new Promise(resolve => {
+    timer = setTimeout(resolve, NETWORK_TIMEOUT_MS);
+  });
 
-          return response;
-        });
-      })
-      .catch(() => {
-        // Offline fallback
-        if (event.request.destination === 'document') {
-          return caches.match('/');
-        }
+  try {
+    const response = await Promise.race([network, timeout]);
+    if (response) {
+      return response;
+    }
+    // Too slow: answer from the cache, the network response still refreshes it when it arrives
+    const cached = await matchFresh(cacheConfig, event.request);
+    return cached || await network;
+  } catch (error) {
+    const cached = await matchFresh(cacheConfig, event.request);
+    if (cached) {
+      console.log('Service Worker: Offline, serving cached page', event.request.url);
+      return cached;
+    }
+    throw error;
+  } finally {
+    clearTimeout(timer);
+  }
+}
+
+// Stale while revalidate: answer from the cache at once and refresh the entry in the background
+async function staleWhileRevalidate(event, cacheConfig) {
+  const network = fetchAndCache(event, cacheConfig);
+  event.waitUntil(network.catch(() => {}));
+  const cached = await matchFresh(cacheConfig, event.request);
+  return cached || network;
+}
+
+// Cache first: only go to the network on a miss (for responses that never change)
+async function cacheFirst(event, cacheConfig) {
+  const cached = await matchFresh(cacheConfig, event.request);
+  if (cached) {
+    event.waitUntil(touch(cacheConfig, event.request, cached.clone()));
+    return cached;
+  }
+  return fetchAndCache(event, cacheConfig);
+}
+
+// Fetch a request and store successful responses in the background; resolves to the response either way
+async function fetchAndCache(event, cacheConfig) {
+  const response = await fetch(event.request);
+  // Only cache complete same-origin responses (not errors, partial content or opaque responses)
+  if (response.status === 200 && response.type === 'basic') {
+    event.waitUntil(
+      putInCache(cacheConfig, event.request, response.clone()).catch(error => {
+        console.error('Service Worker: Caching failed', event.request.url, error);
       })
-  );
-});
+    );
+  }
+  return response;
+}
+
+// Cached response for a request, or undefined when missing or older than the cache's maxAgeSeconds
+async function matchFresh(cacheConfig, request) {
+  const cache = await caches.open(cacheConfig.name);
+  const response = await cache.match(request);
+  if (response && isExpired(cacheConfig, response)) {
+    await cache.delete(request);
+    return undefined;
+  }
+  return response;
+}
+
+function isExpired(cacheConfig, response) {
+  if (!cacheConfig.maxAgeSeconds) {
+    return false;
+  }
+  const cachedAt = Number(response.headers.get(CACHED_AT_HEADER));
+  return !cachedAt || Date.now() - cachedAt > cacheConfig.maxAgeSeconds * 1000;
+}
+
+// Store a response stamped with the current time, then evict down to the cache's limits
+async function putInCache(cacheConfig, request, response) {
+  const cache = await caches.open(cacheConfig.name);
+  const headers = new Headers(response.headers);
+  headers.set(CACHED_AT_HEADER, String(Date.now()));
+  const body = await response.blob();
+  // Re-inserting moves the entry to the end of cache.keys(), which is kept in insertion order
+  await cache.delete(request);
+  await cache.put(request, new Response(body, { status: response.status, statusText: response.statusText, headers }));
+  await trimCache(cacheConfig);
+}
+
+// Mark a cache-first hit as recently used without changing its age
+async function touch(cacheConfig, request, response) {
+  const cache = await caches.open(cacheConfig.name);
+  const body = await response.blob();
+  await cache.delete(request);
+  await cache.put(request, new Response(body, { status: response.status, statusText: response.statusText, headers: response.headers }));
+}
+
+// Delete expired entries, then the least recently used ones beyond maxEntries
+async function trimCache(cacheConfig) {
+  if (!cacheConfig.maxEntries && !cacheConfig.maxAgeSeconds) {
+    return;
+  }
+  const cache = await caches.open(cacheConfig.name);
+  let keys = await cache.keys();
+
+  if (cacheConfig.maxAgeSeconds) {
+    const expired = [];
+    for (const key of keys) {
+      const response = await cache.match(key);
+      if (!response || isExpired(cacheConfig, response)) {
+        expired.push(key);
+      }
+    }
+    await Promise.all(expired.map(key => cache.delete(key)));
+    keys = keys.filter(key => !expired.includes(key));
+  }
+
+  if (cacheConfig.maxEntries && keys.length > cacheConfig.maxEntries) {
+    const evicted = keys.slice(0, keys.length - cacheConfig.maxEntries);
+    console.log(`Service Worker: Evicting ${evicted.length} entries from ${cacheConfig.name}`);
+    await Promise.all(evicted.map(key => cache.delete(key)));
+  }
+}
 
 // Background sync for mood tracking (future enhancement)
 self.addEventListener('sync', event => {
@@ -122,4 +267,4 @@ self.addEventListener('push', event => {
       self.registration.showNotification(data.title || 'MoodTunes', options)
     );
   }
-});
\ No newline at end of file
+});
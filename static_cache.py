@@ -0,0 +1,152 @@
+"""
+In-Memory PWA Resources for MoodTunes
+
+/manifest.json, /static/service-worker.js and /version are fetched on
+every PWA launch and service worker update check. Instead of opening and
+stat()ing the file (or re-serializing BUILD_INFO) per request, each one is
+held in memory as a StaticResource snapshot with everything precomputed:
+
+- the body and, when it pays off, a gzip-compressed variant
+- a strong ETag per variant (SHA-256 of its bytes) and Last-Modified
+
+Conditional requests (If-None-Match, or If-Modified-Since without it) are
+answered 304 from the snapshot alone. File-backed resources re-check their
+file at most every ``reload_interval`` seconds and reload it when its
+modification time or size changed, so an edited service worker is picked
+up without a restart; 0 never re-checks.
+"""
+
+import os
+import gzip
+import time
+import hashlib
+import threading
+from collections import namedtuple
+
+from werkzeug.http import http_date
+from werkzeug.wrappers import Response
+
+# Bodies smaller than this are not worth compressing (bytes)
+MIN_GZIP_SIZE = 256
+
+# etag/gzip_etag: unquoted strong ETags; gzip_body is None when compression does not help;
+# version: (st_mtime_ns, st_size) of the source file (None for in-memory bodies)
+Snapshot = namedtuple("Snapshot", "body gzip_body etag gzip_etag last_modified version")
+
+
+def build_snapshot(body, last_modified, version=None):
+    """
+    Precompute everything a response needs for one body.
+
+    Args:
+        body (bytes): Uncompressed content
+        last_modified (float): Unix time for Last-Modified
+        version: Source file identity, compared on reload checks
+
+    Returns:
+        Snapshot: Body, gzip variant and their ETags
+    """
+    gzip_body = gzip.compress(body, 9, mtime=0) if len(body) >= MIN_GZIP_SIZE else None
+    if gzip_body is not None and len(gzip_body) >= len(body):
+        gzip_body = None
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    return Snapshot(body, gzip_body, etag, f"{etag}-gzip", int(last_modified), version)
+
+
+class StaticResource:
+    """
+    One resource served from memory with ETag/Last-Modified revalidation.
+
+    Use from_file() or from_bytes() rather than the constructor.
+
+    Args:
+        snapshot (Snapshot): Initial content
+        content_type (str): Content-Type header, sent exactly as given
+        headers (dict, optional): Extra response headers
+        path (str, optional): Source file to watch for changes
+        reload_interval (float): Seconds between source file checks (0 = never)
+        clock (callable): Monotonic time source (injectable for tests)
+    """
+
+    def __init__(self, snapshot, content_type, headers=None, path=None, reload_interval=0, clock=time.monotonic):
+        self.content_type = content_type
+        self.headers = dict(headers or {})
+        self.path = path
+        self.reload_interval = reload_interval
+        self._snapshot = snapshot
+        self._clock = clock
+        self._checked_at = clock()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path, content_type, headers=None, reload_interval=2.0, clock=time.monotonic):
+        """
+        Load a file into memory.
+
+        Raises:
+            OSError: The file cannot be read
+        """
+        return cls(cls._read(path), content_type, headers, path, reload_interval, clock)
+
+    @classmethod
+    def from_bytes(cls, body, content_type, headers=None, last_modified=None):
+        """Serve a fixed body (e.g. JSON built once at startup)."""
+        return cls(build_snapshot(body, time.time() if last_modified is None else last_modified), content_type, headers)
+
+    @staticmethod
+    def _read(path):
+        with open(path, "rb") as source:
+            stat = os.fstat(source.fileno())
+            body = source.read()
+        return build_snapshot(body, stat.st_mtime, (stat.st_mtime_ns, stat.st_size))
+
+    def snapshot(self):
+        """Current content, reloading the source file if it changed since the last check."""
+        if self.path is None or not self.reload_interval or self._clock() - self._checked_at < self.reload_interval:
+            return self._snapshot
+
+        with self._lock:
+            if self._clock() - self._checked_at >= self.reload_interval:  # Not done by another thread meanwhile
+                try:
+                    stat = os.stat(self.path)
+                    if (stat.st_mtime_ns, stat.st_size) != self._snapshot.version:
+                        self._snapshot = self._read(self.path)
+                except OSError:
+                    pass  # Deleted or unreadable: keep serving the last good copy
+                self._checked_at = self._clock()
+        return self._snapshot
+
+    def respond(self, request):
+        """
+        Build the response to a request, 304 when the client's copy is current.
+
+        Args:
+            request: The incoming werkzeug/Flask request
+
+        Returns:
+            Response: 200 with the (possibly gzip-encoded) body, or 304
+        """
+        snapshot = self.snapshot()
+        compressed = snapshot.gzip_body is not None and request.accept_encodings["gzip"] > 0
+        etag = snapshot.gzip_etag if compressed else snapshot.etag
+
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains_weak(etag)
+        else:
+            since = request.if_modified_since
+            not_modified = since is not None and snapshot.last_modified <= since.timestamp()
+
+        if not_modified:
+            response = Response(status=304)
+        else:
+            response = Response(snapshot.gzip_body if compressed else snapshot.body, content_type=self.content_type)
+            if compressed:
+                response.headers["Content-Encoding"] = "gzip"
+
+        response.set_etag(etag)
+        response.headers["Last-Modified"] = http_date(snapshot.last_modified)
+        response.headers["Cache-Control"] = "no-cache"  # Always revalidate; a 304 costs no body
+        if snapshot.gzip_body is not None:
+            response.headers["Vary"] = "Accept-Encoding"
+        response.headers.update(self.headers)
+        return response
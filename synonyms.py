@@ -0,0 +1,155 @@
+"""
+Synonym Graph and Query Expansion for MoodTunes Search
+
+Users type "relaxing", "workout" or "happy vibes" where the catalog says
+"relax", "gym" or "good vibes". The synonym graph links such terms; it is
+compiled once when the catalog loads into a flat expansion map, so
+expanding a query is one dictionary lookup per token and never a graph
+traversal per request.
+
+Graph format (built-in DEFAULT_SYNONYM_GRAPH or a JSON file given by
+MOODTUNES_SYNONYMS_PATH): an object mapping a term to related terms. Edges
+are undirected, and compilation follows them up to ``max_depth`` hops, so a
+hub term ("relax") connects all of its neighbours ("relaxing" -> "calm").
+Expansion terms that match nothing in the catalog are pruned at compile
+time.
+"""
+
+import json
+from collections import deque
+
+from normalizer import normalize_text
+from search_engine import iter_matches
+
+# Hub term -> related terms; keep hubs narrow so expansions stay on-topic
+DEFAULT_SYNONYM_GRAPH = {
+    "relax": ["relaxing", "relaxed", "calm", "calming", "peaceful", "unwind", "soothing", "chill out"],
+    "workout": ["exercise", "gym", "training", "fitness", "cardio", "weightlifting", "pump"],
+    "happy": ["cheerful", "joyful", "glad", "happiness"],
+    "vibes": ["vibe", "good vibes", "feel-good"],
+    "sad": ["heartbroken", "heartbreak", "crying", "tears", "blue"],
+    "focus": ["focused", "concentrate", "concentration", "study", "studying", "productive", "productivity"],
+    "sleep": ["sleepy", "bedtime", "insomnia", "drowsy", "lullaby"],
+    "party": ["dance", "dancing", "club", "celebrate", "celebration"],
+    "angry": ["rage", "mad", "furious", "aggressive"],
+    "love": ["romantic", "romance", "date night", "valentine"],
+    "nostalgic": ["nostalgia", "throwback", "retro", "oldies", "memories"],
+    "motivation": ["motivated", "motivating", "inspiring", "inspired", "ambition", "hustle"],
+    "meditation": ["meditate", "meditative", "mindful", "mindfulness", "zen"],
+}
+
+
+def load_synonym_graph(path):
+    """
+    Load a synonym graph from a JSON file.
+
+    Args:
+        path (str): File containing {"term": ["related", ...], ...}
+
+    Returns:
+        dict: Term -> list of related terms (all lowercased)
+
+    Raises:
+        ValueError: If the file is not a mapping of strings to string lists
+    """
+    with open(path, encoding="utf-8") as graph_file:
+        graph = json.load(graph_file)
+    if not isinstance(graph, dict) or not all(
+        isinstance(term, str) and isinstance(related, list) and all(isinstance(r, str) for r in related)
+        for term, related in graph.items()
+    ):
+        raise ValueError(f"{path}: synonym graph must map terms to lists of terms")
+    return {term.lower(): [r.lower() for r in related] for term, related in graph.items()}
+
+
+def compile_expansions(graph, max_depth=2, keep=None):
+    """
+    Flatten a synonym graph into a term -> expansions map.
+
+    Args:
+        graph (dict): Term -> related terms (edges are treated as undirected)
+        max_depth (int): Maximum number of hops followed from each term
+        keep (callable, optional): Predicate deciding which expansion terms
+            are worth keeping (e.g. "matches something in the catalog")
+
+    Returns:
+        dict: Term -> tuple of related terms (excluding the term itself),
+            nearest first; terms without any kept expansion are omitted
+    """
+    adjacency = {}
+    for term, related in graph.items():
+        for other in related:
+            if other != term:
+                adjacency.setdefault(term, []).append(other)
+                adjacency.setdefault(other, []).append(term)
+
+    keep_cache = {}  # The predicate may be expensive (a catalog scan); ask once per term
+    expansions = {}
+    for term in adjacency:
+        seen, reached = {term}, []
+        queue = deque([(term, 0)])
+        while queue:
+            current, depth = queue.popleft()
+            if depth == max_depth:
+                continue
+            for other in adjacency[current]:
+                if other not in seen:
+                    seen.add(other)
+                    reached.append(other)
+                    queue.append((other, depth + 1))
+
+        if keep is not None:
+            for other in reached:
+                if other not in keep_cache:
+                    keep_cache[other] = keep(other)
+        kept = tuple(other for other in reached if keep is None or keep_cache[other])
+        if kept:
+            expansions[term] = kept
+    return expansions
+
+
+class QueryExpander:
+    """
+    Expand queries with precompiled synonyms.
+
+    Args:
+        expansions (dict): Output of compile_expansions()
+    """
+
+    def __init__(self, expansions):
+        self.expansions = expansions
+
+    @classmethod
+    def for_catalog(cls, graph, mood_playlists, mood_metadata, max_depth=2):
+        """
+        Compile a graph, keeping only expansions that match at least one mood.
+
+        Terms are normalized like queries (see normalizer.py), so
+        ``mood_metadata`` should be the normalized search metadata.
+
+        Returns:
+            QueryExpander: Expander bound to this catalog's vocabulary
+        """
+
+        def matches_catalog(term):
+            return next(iter_matches(term, mood_playlists, mood_metadata), None) is not None
+
+        graph = {normalize_text(term): [normalize_text(other) for other in related] for term, related in graph.items()}
+        return cls(compile_expansions(graph, max_depth=max_depth, keep=matches_catalog))
+
+    def expand(self, query):
+        """
+        Related terms for a query: expansions of the whole query and of each word.
+
+        Args:
+            query (str): Normalized search query
+
+        Returns:
+            tuple: Expansion terms (never the query itself), in lookup order
+        """
+        terms = []
+        for token in (query, *query.split()):
+            for term in self.expansions.get(token, ()):
+                if term != query and term not in terms:
+                    terms.append(term)
+        return tuple(terms)
@@ -0,0 +1,138 @@
+"""
+Tests for in-memory mood analytics with bulk SQLite flushes
+"""
+
+import os
+import atexit
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from analytics import MoodAnalytics
+from app import create_app
+
+
+class TestMoodAnalytics(unittest.TestCase):
+    """Test aggregation, bulk flushing and popularity snapshots"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, "analytics.sqlite3")
+        self.analytics = MoodAnalytics(self.db_path, flush_interval=3600)
+
+    def tearDown(self):
+        self.analytics.close()
+        self.directory.cleanup()
+
+    def test_counts_aggregate_in_memory(self):
+        """Test that repeated selections become one row per (mood, hour)"""
+        for _ in range(5):
+            self.analytics.record("happy", timestamp=7200)
+        self.analytics.record("sad", timestamp=7200)
+        self.analytics.record("happy", timestamp=10800)
+
+        self.assertFalse(os.path.exists(self.db_path), "Nothing should be written before a flush")
+        self.assertEqual(self.analytics.flush(), 3)
+        self.assertEqual(self.analytics.flush(), 0, "Second flush has nothing pending")
+
+        with sqlite3.connect(self.db_path) as connection:
+            rows = connection.execute("SELECT mood, hour, count FROM mood_hourly_counts ORDER BY mood, hour").fetchall()
+        self.assertEqual(rows, [("happy", 2, 5), ("happy", 3, 1), ("sad", 2, 1)])
+
+    def test_flushes_upsert_existing_rows(self):
+        """Test that later flushes add to the stored counts"""
+        self.analytics.record("chill", timestamp=0)
+        self.analytics.flush()
+        self.analytics.record("chill", timestamp=0)
+        self.analytics.record("chill", timestamp=0)
+        self.analytics.flush()
+
+        with sqlite3.connect(self.db_path) as connection:
+            self.assertEqual(connection.execute("SELECT count FROM mood_hourly_counts").fetchone()[0], 3)
+
+    def test_snapshot_orders_by_popularity(self):
+        """Test that the snapshot lists the most popular moods first"""
+        for mood, times in [("sad", 1), ("party", 4), ("focused", 2)]:
+            for _ in range(times):
+                self.analytics.record(mood)
+        self.analytics.flush()
+
+        snapshot = self.analytics.snapshot()
+        self.assertEqual([entry["mood"] for entry in snapshot["moods"]], ["party", "focused", "sad"])
+        self.assertEqual(sum(sum(hour.values()) for hour in snapshot["by_hour_utc"].values()), 7)
+
+    def test_empty_snapshot_without_database(self):
+        """Test the snapshot before anything was ever flushed"""
+        self.assertEqual(self.analytics.snapshot()["moods"], [])
+
+    def test_flusher_thread_starts_lazily(self):
+        """Test that the background thread starts on the first record"""
+        self.assertIsNone(self.analytics._thread)
+        self.analytics.record("happy")
+        self.assertTrue(self.analytics._thread.is_alive())
+
+    def test_snapshot_picks_up_other_writers_after_interval(self):
+        """Test that an idle instance re-reads counts flushed by another worker"""
+        now = [0.0]
+        reader = MoodAnalytics(self.db_path, flush_interval=30, clock=lambda: now[0])
+        self.analytics.record("happy")
+        self.analytics.flush()
+        self.assertEqual(reader.snapshot()["moods"], [{"mood": "happy", "count": 1}])
+
+        self.analytics.record("happy")
+        self.analytics.flush()
+        self.assertEqual(reader.snapshot()["moods"][0]["count"], 1, "Snapshot is cached within the interval")
+
+        now[0] = 30.0
+        self.assertEqual(reader.snapshot()["moods"][0]["count"], 2, "Stale snapshot is rebuilt with nothing pending")
+
+    def test_exit_handler_registered_once(self):
+        """Test that close() is registered at exit once per instance, and only after recording"""
+        with mock.patch.object(atexit, "register") as register:
+            analytics = MoodAnalytics(self.db_path, flush_interval=3600)
+            register.assert_not_called()
+            analytics.record("happy")
+            analytics.record("sad")
+            register.assert_called_once_with(analytics.close)
+            analytics.close()
+
+
+class TestPopularStatsEndpoint(unittest.TestCase):
+    """Test the /stats/popular endpoint"""
+
+    def test_popular_endpoint_reports_served_moods(self):
+        """Test that served playlists show up in the popularity snapshot"""
+        with tempfile.TemporaryDirectory() as directory:
+            flask_app = create_app({"ANALYTICS_DB": os.path.join(directory, "stats.sqlite3")})
+            analytics = flask_app.extensions["analytics"]
+            try:
+                with flask_app.test_client() as client:
+                    for mood in ["happy", "happy", "sad"]:
+                        client.post("/get-playlist", data={"mood": mood})
+                    analytics.flush()
+
+                    data = client.get("/stats/popular?limit=1").get_json()
+                    self.assertTrue(data["success"])
+                    self.assertEqual(data["moods"], [{"mood": "happy", "count": 2}])
+            finally:
+                analytics.close()
+
+    def test_create_app_does_not_register_exit_handlers(self):
+        """Test that building apps (as tests and tools do) adds no atexit handler"""
+        with tempfile.TemporaryDirectory() as directory, mock.patch.object(atexit, "register") as register:
+            for _ in range(3):
+                create_app({"ANALYTICS_DB": os.path.join(directory, "stats.sqlite3")})
+            register.assert_not_called()
+
+    def test_popular_endpoint_disabled(self):
+        """Test that the endpoint answers 404 when analytics is off"""
+        flask_app = create_app({"ANALYTICS_ENABLED": False})
+        with flask_app.test_client() as client:
+            response = client.get("/stats/popular")
+            self.assertEqual(response.status_code, 404)
+            self.assertFalse(response.get_json()["success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests for the MoodTunes application factory and startup profiler
+"""
+
+import unittest
+
+from app import create_app
+from startup_profiler import StartupProfiler
+
+
+class TestAppFactory(unittest.TestCase):
+    """Test that create_app() builds independent, fully routed applications"""
+
+    def test_create_app_registers_routes(self):
+        """Test that every public endpoint is registered on a fresh app"""
+        flask_app = create_app({"TESTING": True})
+        rules = {rule.rule for rule in flask_app.url_map.iter_rules()}
+        for path in ["/", "/get-playlist", "/search-playlists", "/version", "/static/service-worker.js", "/manifest.json"]:
+            with self.subTest(path=path):
+                self.assertIn(path, rules)
+
+    def test_config_overrides_applied(self):
+        """Test that config overrides win over production defaults"""
+        flask_app = create_app({"SESSION_COOKIE_SECURE": False, "SECRET_KEY": "test"})
+        self.assertFalse(flask_app.config["SESSION_COOKIE_SECURE"])
+        self.assertEqual(flask_app.config["SECRET_KEY"], "test")
+
+    def test_apps_are_independent(self):
+        """Test that two factory calls do not share configuration"""
+        first = create_app({"TESTING": True})
+        second = create_app()
+        self.assertIsNot(first, second)
+        self.assertFalse(second.config.get("TESTING"))
+
+    def test_startup_profile_recorded(self):
+        """Test that startup phases are timed and stored on the app"""
+        flask_app = create_app()
+        report = flask_app.extensions["startup_profile"].as_dict()
+        for phase in ["logging", "flask", "config", "routes", "total"]:
+            with self.subTest(phase=phase):
+                self.assertIn(phase, report)
+                self.assertGreaterEqual(report[phase], 0)
+
+    def test_factory_app_serves_requests(self):
+        """Test that a factory-built app answers the main routes"""
+        flask_app = create_app({"TESTING": True})
+        with flask_app.test_client() as client:
+            self.assertEqual(client.get("/version").status_code, 200)
+            response = client.post("/get-playlist", data={"mood": "chill"})
+            self.assertEqual(response.get_json()["mood"], "chill")
+
+
+class TestStartupProfiler(unittest.TestCase):
+    """Test phase recording in StartupProfiler"""
+
+    def test_marks_and_phases(self):
+        """Test that marks and phase blocks are recorded in order"""
+        profiler = StartupProfiler()
+        profiler.mark("first")
+        with profiler.phase("second"):
+            pass
+        names = [name for name, _ in profiler.phases]
+        self.assertEqual(names, ["first", "second"])
+        self.assertIn("first=", profiler.format_report())
+        self.assertGreaterEqual(profiler.total, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
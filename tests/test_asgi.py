@@ -0,0 +1,235 @@
+"""
+Tests for the ASGI entry point
+"""
+
+import asyncio
+import json
+import threading
+import unittest
+from urllib.parse import urlencode
+
+from flask import Flask, Response
+
+from app import create_app
+from asgi import ASGIApplication, build_environ
+
+
+def call(application, method, path, body=b"", headers=(), disconnect_after=None, sent=None):
+    """
+    Run one request through an ASGI app; returns (status, headers, body messages).
+
+    The client stays connected until ``disconnect_after`` body messages were
+    sent (never by default). Messages are appended to ``sent`` when given, so
+    they can be inspected after the app raised.
+    """
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path.split("?")[0],
+        "query_string": path.partition("?")[2].encode(),
+        "root_path": "",
+        "headers": [(b"content-length", str(len(body)).encode()), *headers],
+        "client": ("203.0.113.7", 50000),
+        "server": ("testserver", 80),
+    }
+    incoming = [{"type": "http.request", "body": body[:5], "more_body": True}, {"type": "http.request", "body": body[5:]}]
+    sent = [] if sent is None else sent
+
+    async def run():
+        disconnected = asyncio.Event()
+
+        async def receive():
+            if incoming:
+                return incoming.pop(0)
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if disconnect_after is not None and sum(m["type"] == "http.response.body" for m in sent) >= disconnect_after:
+                disconnected.set()
+
+        await application(scope, receive, send)
+
+    asyncio.run(run())
+    start, *chunks = sent
+    return start["status"], dict(start["headers"]), chunks
+
+
+class TestASGIApplication(unittest.TestCase):
+    """Test requests, streaming, routing and lifespan"""
+
+    def setUp(self):
+        self.flask_app = create_app({"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False})
+        self.application = ASGIApplication(self.flask_app, io_threads=4, cpu_threads=2)
+
+    def tearDown(self):
+        self.application.close()
+
+    def test_json_and_form_requests(self):
+        """Test a GET and a form POST whose body arrives in several messages"""
+        status, headers, chunks = call(self.application, "GET", "/version")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b"content-type"], b"application/json")
+        self.assertEqual(
+            json.loads(b"".join(chunk["body"] for chunk in chunks))["version"],
+            self.flask_app.json.loads(self.flask_app.test_client().get("/version").data)["version"],
+        )
+
+        body = urlencode({"query": "chill"}).encode()
+        form = [(b"content-type", b"application/x-www-form-urlencoded")]
+        status, _headers, chunks = call(self.application, "POST", "/search-playlists", body, form)
+        data = json.loads(b"".join(chunk["body"] for chunk in chunks))
+        self.assertEqual(status, 200)
+        self.assertIn("chill", [mood["mood_key"] for mood in data["moods"]])
+        self.assertFalse(chunks[-1]["more_body"])
+
+    def test_streamed_response(self):
+        """Test that NDJSON lines are sent as separate body messages"""
+        body = urlencode({"query": "in", "format": "ndjson"}).encode()
+        form = [(b"content-type", b"application/x-www-form-urlencoded")]
+        status, _headers, chunks = call(self.application, "POST", "/search-playlists", body, form)
+        self.assertEqual(status, 200)
+        lines = [json.loads(chunk["body"]) for chunk in chunks if chunk["body"]]
+        self.assertGreater(len(lines), 2)
+        self.assertEqual(lines[-1]["type"], "end")
+
+    def test_routing(self):
+        """Test that I/O-bound endpoints go to the I/O pool and the rest to the CPU pool"""
+        for path, pool in [
+            ("/cover/happy", self.application.io_pool),
+            ("/tracks/happy", self.application.io_pool),
+            ("/search-playlists", self.application.cpu_pool),
+            ("/missing", self.application.cpu_pool),
+        ]:
+            with self.subTest(path=path):
+                environ = build_environ({"method": "GET", "path": path, "headers": []}, b"")
+                self.assertIs(self.application.pool_for(environ), pool)
+        self.assertEqual(call(self.application, "GET", "/missing")[0], 404)
+
+    def test_environ(self):
+        """Test header folding, query strings and the client address"""
+        scope = {
+            "method": "GET",
+            "path": "/café",
+            "query_string": b"a=1",
+            "headers": [(b"cookie", b"a=1"), (b"cookie", b"b=2"), (b"accept", b"x"), (b"accept", b"y")],
+            "client": ("203.0.113.7", 1),
+        }
+        environ = build_environ(scope, b"")
+        self.assertEqual(environ["PATH_INFO"], "/café".encode().decode("latin-1"))
+        self.assertEqual((environ["HTTP_COOKIE"], environ["HTTP_ACCEPT"]), ("a=1; b=2", "x,y"))
+        self.assertEqual((environ["QUERY_STRING"], environ["REMOTE_ADDR"]), ("a=1", "203.0.113.7"))
+
+    def test_response_headers_not_folded(self):
+        """Test that repeated response headers (Set-Cookie) stay separate"""
+        flask_app = Flask(__name__)
+
+        @flask_app.route("/cookies")
+        def cookies():
+            response = Response("ok")
+            response.set_cookie("a", "1")
+            response.set_cookie("b", "2")
+            return response
+
+        sent = []
+        call(ASGIApplication(flask_app, io_threads=1, cpu_threads=1), "GET", "/cookies", sent=sent)
+        cookies = [value for name, value in sent[0]["headers"] if name == b"set-cookie"]
+        self.assertEqual([cookie.split(b";")[0] for cookie in cookies], [b"a=1", b"b=2"])
+
+    def test_lifespan(self):
+        """Test that startup and shutdown are acknowledged"""
+        incoming = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return incoming.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        asyncio.run(self.application({"type": "lifespan"}, receive, send))
+        self.assertEqual(sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"])
+
+
+class TestASGIBridgeFailures(unittest.TestCase):
+    """Test disconnects and WSGI apps that fail before or while responding"""
+
+    def setUp(self):
+        self.closed = threading.Event()
+        self.flask_app = Flask(__name__)
+        closed = self.closed
+
+        @self.flask_app.route("/stream")
+        def stream():
+            def generate():
+                try:
+                    for number in range(1000):
+                        yield f"{number}\n"
+                finally:
+                    closed.set()
+
+            return Response(generate())
+
+        self.application = ASGIApplication(self.flask_app, io_threads=1, cpu_threads=1)
+
+    def tearDown(self):
+        self.application.close()
+
+    def test_disconnect_mid_stream(self):
+        """Test that a client leaving stops the stream and closes the WSGI iterator"""
+        status, _headers, chunks = call(self.application, "GET", "/stream", disconnect_after=2)
+        self.assertEqual(status, 200)
+        self.assertLess(len(chunks), 10, "Chunks stop being pulled after the disconnect")
+        self.assertTrue(self.closed.is_set())
+
+    def test_send_failure_mid_stream(self):
+        """Test that the iterator is closed when the server fails to send (client gone)"""
+
+        async def run():
+            async def receive():
+                return {"type": "http.request", "body": b""}
+
+            async def send(message):
+                if message["type"] == "http.response.body":
+                    raise OSError("connection reset")
+
+            scope = {"type": "http", "method": "GET", "path": "/stream", "headers": []}
+            await self.application(scope, receive, send)
+
+        with self.assertRaises(OSError):
+            asyncio.run(run())
+        self.assertTrue(self.closed.is_set())
+
+    def test_exception_before_start_response(self):
+        """Test a 500 answer when the WSGI app raises before starting the response"""
+        for name, wsgi_app in [("call", self.raising_app), ("first chunk", self.raising_generator_app)]:
+            with self.subTest(name=name):
+                self.flask_app.wsgi_app = wsgi_app
+                sent = []
+                with self.assertRaises(ZeroDivisionError):
+                    call(self.application, "GET", "/stream", sent=sent)
+                self.assertEqual(sent[0]["status"], 500)
+                self.assertEqual(sent[1]["body"], b"Internal Server Error")
+
+    def test_missing_start_response(self):
+        """Test that an app returning without start_response is an error, not a hang or KeyError"""
+        self.flask_app.wsgi_app = lambda environ, start_response: [b"body"]
+        sent = []
+        with self.assertRaises(RuntimeError):
+            call(self.application, "GET", "/stream", sent=sent)
+        self.assertEqual(sent[0]["status"], 500)
+
+    @staticmethod
+    def raising_app(environ, start_response):
+        return 1 / 0
+
+    @staticmethod
+    def raising_generator_app(environ, start_response):
+        yield 1 / 0
+
+
+if __name__ == "__main__":
+    unittest.main()
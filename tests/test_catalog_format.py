@@ -0,0 +1,134 @@
+"""
+Tests for the compact binary catalog format and its memory-mapped reader
+"""
+
+import os
+import struct
+import tempfile
+import unittest
+
+from app import create_app, mood_playlists, mood_metadata, mood_categories
+from catalog_format import CatalogFormatError, CatalogReader, compile_catalog, write_catalog
+
+
+class TestCatalogFormat(unittest.TestCase):
+    """Test compiling, reading and validating binary catalogs"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.compiled = compile_catalog(mood_playlists, mood_metadata, mood_categories)
+
+    def setUp(self):
+        self.reader = CatalogReader(self.compiled)
+
+    def test_round_trip(self):
+        """Test that the compiled catalog decodes back to the source dictionaries"""
+        playlists, metadata, categories = self.reader.to_dicts()
+        self.assertEqual(playlists, mood_playlists)
+        self.assertEqual(metadata, mood_metadata)
+        self.assertEqual(categories, mood_categories)
+
+    def test_strings_are_interned(self):
+        """Test that repeated strings (e.g. 'calm', categories) are stored once"""
+        self.assertEqual(self.compiled.count(b"Energy & Activity"), 1)
+        self.assertEqual(self.compiled.count(b"calm"), 1)
+
+    def test_lookups(self):
+        """Test binary-search lookups by mood key"""
+        for position, mood in enumerate(mood_playlists):
+            with self.subTest(mood=mood):
+                self.assertEqual(self.reader.position(mood), position)
+                self.assertEqual(self.reader.playlist_id(mood), mood_playlists[mood])
+        self.assertIsNone(self.reader.position("unknown"))
+        self.assertIsNone(self.reader.metadata("unknown"))
+
+    def test_category_bitsets(self):
+        """Test that category bitsets mark exactly the member positions"""
+        keys = list(mood_playlists)
+        for name, info in mood_categories.items():
+            with self.subTest(category=name):
+                bitset = self.reader.category_bitset(name)
+                members = {keys[i] for i in range(len(keys)) if bitset >> i & 1}
+                self.assertEqual(members, set(info["moods"]))
+        self.assertEqual(self.reader.category_bitset("Nope"), 0)
+
+    def test_term_postings(self):
+        """Test posting lists for whole keywords and single words"""
+        keys = list(mood_playlists)
+        self.assertEqual([keys[p] for p in self.reader.postings("calm")], ["chill", "meditative"])
+        self.assertEqual([keys[p] for p in self.reader.postings("good vibes")], ["uplifting"])
+        self.assertIn(keys.index("uplifting"), self.reader.postings("vibes"))
+        self.assertEqual(self.reader.postings("zzz"), ())
+
+    def test_rejects_invalid_buffers(self):
+        """Test magic, version and truncation checks"""
+        with self.assertRaises(CatalogFormatError):
+            CatalogReader(b"not a catalog at all" * 10)
+        with self.assertRaises(CatalogFormatError):
+            CatalogReader(self.compiled[:6] + struct.pack("<H", 99) + self.compiled[8:])
+        with self.assertRaises(CatalogFormatError):
+            CatalogReader(self.compiled[: len(self.compiled) // 2])
+
+    def test_mmap_file_and_app_integration(self):
+        """Test that a catalog file is memory-mapped and served by the app"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.bin")
+            write_catalog(path, mood_playlists, mood_metadata, mood_categories)
+
+            reader = CatalogReader.open(path)
+            self.assertEqual(reader.mood_keys(), list(mood_playlists))
+            reader.close()
+
+            flask_app = create_app({"CATALOG_PATH": path})
+            try:
+                with flask_app.test_client() as client:
+                    response = client.post("/get-playlist", data={"mood": "sleepy"})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertIn(mood_playlists["sleepy"], response.get_json()["playlist"])
+                    self.assertEqual(client.post("/get-playlist", data={"mood": "nope"}).status_code, 400)
+            finally:
+                flask_app.extensions["catalog"].close()
+
+    def test_compiled_catalog_is_the_single_source(self):
+        """Test that moods added to or removed from a catalog file are searched as such"""
+        playlists = {key: value for key, value in mood_playlists.items() if key != "sad"}
+        playlists["rainy"] = "37i9dQZF1DXbvABJXBIyiY"
+        metadata = {key: value for key, value in mood_metadata.items() if key != "sad"}
+        metadata["rainy"] = {
+            "name": "Rainy Day",
+            "description": "Soft songs for grey afternoons",
+            "keywords": ["rain", "drizzle", "cozy"],
+            "category": "Emotional",
+        }
+        categories = {
+            name: {
+                **info,
+                "moods": [key for key in info["moods"] if key != "sad"] + (["rainy"] if name == "Emotional" else []),
+            }
+            for name, info in mood_categories.items()
+        }
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.bin")
+            write_catalog(path, playlists, metadata, categories)
+            flask_app = create_app({"CATALOG_PATH": path, "ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False})
+            try:
+                with flask_app.test_client() as client:
+                    found = client.post("/search-playlists", data={"query": "drizzle", "facets": "1"}).get_json()
+                    self.assertEqual([mood["mood_key"] for mood in found["moods"]], ["rainy"])
+                    self.assertEqual(found["moods"][0]["name"], "Rainy Day")
+                    self.assertEqual(found["facets"]["category"]["Emotional"], 1)
+
+                    found = client.post("/search-playlists", data={"query": "rain"}).get_json()
+                    self.assertIn("rainy", [mood["mood_key"] for mood in found["moods"]])
+
+                    found = client.post("/search-playlists", data={"query": "sad"}).get_json()
+                    self.assertNotIn("sad", [mood["mood_key"] for mood in found["moods"]])
+                    self.assertEqual(client.post("/get-playlist", data={"mood": "sad"}).status_code, 400)
+                    self.assertEqual(client.post("/get-playlist", data={"mood": "rainy"}).status_code, 200)
+            finally:
+                flask_app.extensions["catalog"].close()
+
+
+if __name__ == "__main__":
+    unittest.main()
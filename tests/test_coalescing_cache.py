@@ -0,0 +1,146 @@
+"""
+Tests for single-flight coalescing, stale-while-revalidate and the circuit breaker
+"""
+
+import threading
+import time
+import unittest
+
+from coalescing_cache import CircuitBreaker, CircuitOpenError, CoalescingCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyUpstream:
+    """Counting fetch function that can be told to fail"""
+
+    def __init__(self):
+        self.calls = 0
+        self.version = 1
+        self.failing = False
+
+    def __call__(self, key):
+        self.calls += 1
+        if self.failing:
+            raise ConnectionError("upstream down")
+        return f"{key}-v{self.version}"
+
+
+class TestCoalescingCache(unittest.TestCase):
+    """Test the cache states"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.upstream = FlakyUpstream()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=self.clock)
+        self.cache = CoalescingCache(self.upstream, ttl=10, stale_ttl=20, breaker=breaker, clock=self.clock)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_concurrent_misses_share_one_fetch(self):
+        """Test that threads missing the same key wait for a single fetch"""
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_fetch(key):
+            started.set()
+            release.wait(5)
+            return self.upstream(key)
+
+        cache = CoalescingCache(slow_fetch)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("p1"))) for _ in range(8)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while cache.stats().get("coalesced", 0) < 7 and time.monotonic() < deadline:
+            time.sleep(0.001)  # Until every follower waits on the leader's fetch
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(results, ["p1-v1"] * 8)
+        self.assertEqual(self.upstream.calls, 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_stale_while_revalidate(self):
+        """Test that a stale entry is served at once and refreshed in the background"""
+        self.assertEqual(self.cache.get("p1"), "p1-v1")
+        self.upstream.version = 2
+        self.clock.now = 5
+        self.assertEqual(self.cache.get("p1"), "p1-v1", "Fresh entries are not refetched")
+
+        self.clock.now = 15
+        self.assertEqual(self.cache.get("p1"), "p1-v1", "Stale entries are served without waiting")
+        self.cache.close()  # Waits for the background refresh
+        self.assertEqual(self.cache.get("p1"), "p1-v2")
+        self.assertEqual(self.upstream.calls, 2)
+
+        self.upstream.version = 3
+        self.clock.now = 100
+        self.assertEqual(self.cache.get("p1"), "p1-v3", "Entries past the stale window are refetched inline")
+
+    def test_failures_fall_back_and_open_the_circuit(self):
+        """Test last-good fallback, the open circuit and the half-open trial"""
+        self.cache.get("p1")
+        self.upstream.failing = True
+        self.clock.now = 50
+
+        self.assertEqual(self.cache.get("p1"), "p1-v1")
+        self.assertEqual(self.cache.get("p1"), "p1-v1")
+        self.assertEqual(self.cache.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.cache.get("p2")
+        self.assertEqual(self.upstream.calls, 3, "An open circuit sends nothing upstream")
+
+        self.upstream.failing = False
+        self.upstream.version = 2
+        self.clock.now = 80
+        self.assertEqual(self.cache.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(self.cache.get("p1"), "p1-v2")
+        self.assertEqual(self.cache.breaker.state, CircuitBreaker.CLOSED)
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["failures"], stats["fallbacks"], stats["rejected"]), (2, 2, 1))
+
+    def test_errors_without_fallback_propagate(self):
+        """Test that a key that never loaded raises the fetch error to every waiter"""
+        self.upstream.failing = True
+        with self.assertRaises(ConnectionError):
+            self.cache.get("p1")
+        self.assertEqual(len(self.cache), 0)
+
+    def test_failed_trial_reopens(self):
+        """Test that one half-open failure re-opens the circuit"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=self.clock)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        self.clock.now = 10
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow(), "Only one trial call")
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry goes first"""
+        cache = CoalescingCache(self.upstream, max_entries=2)
+        cache.get("a")
+        cache.get("b")
+        cache.get("a")
+        cache.get("c")
+        self.assertEqual(list(cache._entries), ["a", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+Tests for the cover-art proxy, its variants and the content-addressed disk cache
+"""
+
+import io
+import os
+import tempfile
+import threading
+import unittest
+
+from app import create_app, mood_playlists
+from cover_art import PILLOW_AVAILABLE, REQUESTS_AVAILABLE, BlobStore, CoverArt
+from fake_spotify import FakeSpotifyServer
+
+if PILLOW_AVAILABLE:
+    from PIL import Image
+
+
+class TestBlobStore(unittest.TestCase):
+    """Test content addressing and LRU eviction by total bytes"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_content_addressed(self):
+        """Test that equal bytes share one file named by their hash"""
+        store = BlobStore(self.tmp.name, max_bytes=1000)
+        name = store.put(b"cover", "jpg")
+        self.assertEqual(store.put(b"cover", "jpg"), name)
+        self.assertEqual(len(store), 1)
+        with open(store.path(name), "rb") as blob_file:
+            self.assertEqual(blob_file.read(), b"cover")
+        self.assertIsNone(store.path("0" * 64 + ".jpg"))
+
+    def test_lru_eviction_by_bytes(self):
+        """Test that the least recently used files go once the byte budget is exceeded"""
+        store = BlobStore(self.tmp.name, max_bytes=250)
+        first = store.put(b"a" * 100, "jpg")
+        second = store.put(b"b" * 100, "jpg")
+        store.path(first)  # Now more recently used than the second
+        third = store.put(b"c" * 100, "jpg")
+
+        self.assertIsNone(store.path(second))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, second)))
+        self.assertEqual(store.total_bytes, 200)
+
+        reopened = BlobStore(self.tmp.name, max_bytes=250)
+        self.assertEqual((len(reopened), reopened.total_bytes), (2, 200), "Existing files are accounted at startup")
+        self.assertIsNotNone(reopened.path(first) and reopened.path(third))
+
+    def test_file_removed_by_another_worker(self):
+        """Test that a file deleted behind the store's back is forgotten and written again"""
+        store = BlobStore(self.tmp.name, max_bytes=1000)
+        name = store.put(b"cover", "jpg")
+        os.remove(os.path.join(self.tmp.name, name))  # Evicted by another process
+
+        self.assertIsNone(store.path(name))
+        self.assertEqual((len(store), store.total_bytes), (0, 0))
+        os.remove(os.path.join(self.tmp.name, store.put(b"cover", "jpg")))
+        self.assertEqual(store.put(b"cover", "jpg"), name)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, name)), "A known name is rewritten when its file is gone")
+        self.assertEqual(store.total_bytes, 5)
+
+
+@unittest.skipUnless(REQUESTS_AVAILABLE, "requests not installed")
+class TestCoverArt(unittest.TestCase):
+    """Test fetching and resizing against the fake oEmbed endpoint"""
+
+    def setUp(self):
+        self.server = FakeSpotifyServer().start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.art = CoverArt(BlobStore(self.tmp.name, 10**7), upstream_url=self.server.oembed_url, sizes=(64, 160))
+
+    def tearDown(self):
+        self.art.close()
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def test_sizes(self):
+        """Test size selection and the rendered variants"""
+        self.assertEqual([self.art.pick_size(size) for size in (None, 10, 64, 65, 999)], [160, 64, 64, 160, 160])
+        small, large = self.art.variant("p1", 64), self.art.variant("p1", 160)
+        self.assertNotEqual(small, large)
+        if PILLOW_AVAILABLE:
+            with Image.open(self.art.store.path(small)) as image:
+                self.assertEqual((image.format, image.size), ("JPEG", (64, 64)))
+
+    def test_concurrent_requests_fetch_once(self):
+        """Test that simultaneous first requests share one upstream fetch"""
+        names = []
+        threads = [threading.Thread(target=lambda: names.append(self.art.variant("p1", 64))) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(len(set(names)), 1)
+        self.assertEqual(self.server.requests["/oembed"], 1)
+        self.assertEqual(self.server.requests["/images/p1.png"], 1)
+
+    def test_evicted_variant_is_refetched(self):
+        """Test that a variant dropped from the disk cache is rendered again"""
+        name = self.art.variant("p1", 64)
+        with self.art.store._lock:
+            self.art.store.total_bytes -= self.art.store._blobs.pop(name)
+        self.assertEqual(self.art.variant("p1", 64), name)
+        self.assertEqual(self.server.requests["/oembed"], 2)
+
+    def test_variant_deleted_by_another_worker_is_rendered_again(self):
+        """Test that a variant file removed by another process is not handed out"""
+        name = self.art.variant("p1", 64)
+        os.remove(os.path.join(self.tmp.name, name))
+        self.assertEqual(self.art.variant("p1", 64), name)
+        self.assertTrue(os.path.exists(self.art.store.path(name)))
+        self.assertEqual(self.server.requests["/oembed"], 2)
+
+
+@unittest.skipUnless(REQUESTS_AVAILABLE, "requests not installed")
+class TestCoverEndpoint(unittest.TestCase):
+    """Test /cover/<mood> and the immutable /covers/<name> files"""
+
+    def setUp(self):
+        self.server = FakeSpotifyServer().start()
+        self.tmp = tempfile.TemporaryDirectory()
+        config = {
+            "ANALYTICS_ENABLED": False,
+            "RATE_LIMIT_ENABLED": False,
+            "COVER_ART_ENABLED": True,
+            "COVER_ART_DIR": self.tmp.name,
+            "COVER_ART_UPSTREAM": self.server.oembed_url,
+        }
+        self.app = create_app(config)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.app.extensions["cover_art"].close()
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def test_redirect_and_immutable_file(self):
+        """Test the short-lived redirect, the cached file and conditional requests"""
+        response = self.client.get("/cover/Happy?size=50")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Cache-Control"], "public, max-age=3600")
+        location = response.headers["Location"]
+        self.assertRegex(location, r"^/covers/[0-9a-f]{64}\.(jpg|png)$")
+
+        response = self.client.get(location)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        if PILLOW_AVAILABLE:
+            self.assertEqual(response.mimetype, "image/jpeg")
+            with Image.open(io.BytesIO(response.data)) as image:
+                self.assertEqual(image.size, (64, 64))
+        etag = response.headers["ETag"]
+        response.close()
+
+        self.assertEqual(self.client.get(location, headers={"If-None-Match": etag}).status_code, 304)
+        self.assertEqual(self.server.requests["/oembed"], 1)
+
+    def test_errors(self):
+        """Test unknown moods, unknown files and a failing upstream"""
+        self.assertEqual(self.client.get("/cover/nope").status_code, 400)
+        self.assertEqual(self.client.get("/covers/" + "0" * 64 + ".jpg").status_code, 404)
+        self.assertEqual(self.client.get("/covers/..%2Fapp.py").status_code, 404)
+
+        self.server.failing.add(mood_playlists["sad"])
+        response = self.client.get("/cover/sad")
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(response.get_json()["error"], "Cover art unavailable")
+
+    def test_disabled(self):
+        """Test that cover art is off by default and the page tells the frontend whether it is on"""
+        flask_app = create_app({"ANALYTICS_ENABLED": False})
+        self.assertNotIn("cover_art", flask_app.extensions)
+        client = flask_app.test_client()
+        self.assertEqual(client.get("/cover/happy").status_code, 404)
+        self.assertIn(b'<body data-cover-art="off">', client.get("/").data)
+        self.assertIn(b'<body data-cover-art="on">', self.client.get("/").data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Tests for category facet filtering and counts backed by bitsets
+"""
+
+import json
+import unittest
+
+from app import create_app, mood_categories, mood_metadata, mood_playlists
+from search_engine import FacetIndex, SearchPage, popcount
+from search_scorer import NUMPY_AVAILABLE, NumpyScorer, PythonScorer
+
+
+class TestFacetIndex(unittest.TestCase):
+    """Test bitset construction, filters and counts"""
+
+    def setUp(self):
+        self.index = FacetIndex(mood_playlists, mood_categories)
+
+    def test_bitsets_match_categories(self):
+        """Test that bit i is set exactly for category members at position i"""
+        keys = list(mood_playlists)
+        for name, info in mood_categories.items():
+            with self.subTest(category=name):
+                bits = self.index.bitsets[name]
+                self.assertEqual({keys[i] for i in range(len(keys)) if bits >> i & 1}, set(info["moods"]))
+                self.assertEqual(popcount(bits), len(info["moods"]))
+
+    def test_allowed_bitmap(self):
+        """Test case-insensitive category names, unions and unknown names"""
+        allowed = self.index.allowed(["mental state", "Emotional"])
+        expected = self.index.bitsets["Mental State"] | self.index.bitsets["Emotional"]
+        self.assertEqual(int.from_bytes(allowed, "little"), expected)
+        with self.assertRaises(ValueError):
+            self.index.allowed(["Nope"])
+
+    def test_counts_are_popcounts(self):
+        """Test facet counts for a match bitmap"""
+        keys = list(mood_playlists)
+        matches = sum(1 << keys.index(mood) for mood in ["happy", "sad", "focused"])
+        bitmap = matches.to_bytes((len(keys) + 7) // 8, "little")
+        self.assertEqual(self.index.counts(bitmap), {"Emotional": 2, "Energy & Activity": 0, "Mental State": 1})
+
+    def test_search_page_filters_and_records_matches(self):
+        """Test that filtering skips disallowed positions but the match bitmap keeps them"""
+        allowed = self.index.allowed(["Mental State"])
+        matches = [(position, key) for position, key in enumerate(mood_playlists)]
+        page = SearchPage(iter(matches), allowed=allowed, catalog_size=self.index.size)
+        members = set(mood_categories["Mental State"]["moods"])
+        self.assertEqual(list(page), [key for key in mood_playlists if key in members])
+        self.assertEqual(page.total, len(members))
+        self.assertEqual(sum(self.index.counts(page.match_bitmap).values()), len(mood_playlists))
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+    def test_scorers_filter_identically(self):
+        """Test that both scorers apply the category filter the same way"""
+        allowed = self.index.allowed(["Emotional"])
+        python_scorer = PythonScorer(mood_playlists, mood_metadata)
+        numpy_scorer = NumpyScorer(mood_playlists, mood_metadata)
+        for query in ["a", "e", "in", "happy"]:
+            with self.subTest(query=query):
+                expected = python_scorer.rank(query, allowed=allowed)
+                actual = numpy_scorer.rank(query, allowed=allowed)
+                self.assertEqual(actual.results, expected.results)
+                self.assertEqual(actual.total, expected.total)
+                self.assertEqual(bytes(actual.match_bitmap), bytes(expected.match_bitmap))
+
+
+class TestFacetSearchEndpoint(unittest.TestCase):
+    """Test category filters and facet counts through /search-playlists"""
+
+    def setUp(self):
+        self.client = create_app({"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False}).test_client()
+
+    def search(self, **data):
+        return self.client.post("/search-playlists", data=data)
+
+    def test_filter_and_counts(self):
+        """Test filtered results with facet counts computed before filtering"""
+        everything = self.search(query="in", facets="1").get_json()
+        counts = everything["facets"]["category"]
+        self.assertEqual(sum(counts.values()), everything["total"])
+
+        for sort in ["", "relevance"]:
+            with self.subTest(sort=sort):
+                data = self.search(query="in", facets="1", category="Mental State", sort=sort).get_json()
+                self.assertEqual([m["mood_key"] for m in data["moods"]], ["meditative"])
+                self.assertEqual(data["total"], counts["Mental State"])
+                self.assertEqual(data["facets"]["category"], counts)
+
+    def test_multiple_categories(self):
+        """Test that repeated category parameters combine as a union"""
+        data = self.search(query="in", category=["Emotional", "Mental State"]).get_json()
+        self.assertTrue(all(m["category"] in ("Emotional", "Mental State") for m in data["moods"]))
+        self.assertNotIn("facets", data, "Facet counts are opt-in")
+
+    def test_streamed_facets(self):
+        """Test facet counts on the NDJSON end line"""
+        response = self.search(query="in", facets="1", format="ndjson")
+        end = json.loads(response.get_data(as_text=True).splitlines()[-1])
+        self.assertEqual(sum(end["facets"]["category"].values()), end["total"])
+
+    def test_unknown_category(self):
+        """Test that unknown categories are rejected"""
+        response = self.search(query="in", category="Nope")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Unknown category", response.get_json()["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
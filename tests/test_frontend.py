@@ -2,6 +2,7 @@
 Frontend Integration Tests for MoodTunes
 Tests the actual HTML/CSS/JS integration to catch UI regressions
 """
+import re
 import unittest
 from app import app
 from bs4 import BeautifulSoup
@@ -278,6 +279,19 @@ class TestJavaScriptIntegration(unittest.TestCase):
             search_input = soup.find("input", {"id": "search-input"})
             self.assertIsNotNone(search_input, "Search input for event listener not found")
 
+    def test_service_worker_precache_urls_exist(self):
+        """Test that every URL the service worker precaches is served (cache.addAll fails on any error)"""
+        with open("static/service-worker.js", "r") as f:
+            js_content = f.read()
+
+        precache_list = re.search(r"const urlsToCache = \[(.*?)\];", js_content, re.S)
+        self.assertIsNotNone(precache_list, "urlsToCache list not found in service worker")
+        urls = re.findall(r"'([^']+)'", precache_list.group(1)) + ["/"]
+        with app.test_client() as client:
+            for url in urls:
+                with self.subTest(url=url):
+                    self.assertEqual(client.get(url).status_code, 200, f"Precached URL {url} not served")
+
 
 if __name__ == "__main__":
     # Try to import BeautifulSoup
@@ -0,0 +1,69 @@
+"""
+Tests for the Gunicorn production configuration module
+
+The config file is loaded the same way gunicorn loads it (by path), with the
+environment patched so worker sizing and worker-class selection can be checked.
+"""
+
+import os
+import unittest
+import importlib.util
+from unittest.mock import patch
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gunicorn.conf.py")
+
+
+def load_config(env):
+    """Load gunicorn.conf.py as a fresh module under the given environment."""
+    with patch.dict(os.environ, env, clear=False):
+        spec = importlib.util.spec_from_file_location("moodtunes_gunicorn_conf", CONFIG_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+
+class TestGunicornConfig(unittest.TestCase):
+    """Test worker sizing, worker class selection and lifecycle hooks"""
+
+    def test_defaults_use_sync_workers_with_preload(self):
+        """Test that one thread per worker keeps the sync worker class and preload is on"""
+        config = load_config({"GUNICORN_THREADS": "1"})
+        self.assertEqual(config.worker_class, "sync")
+        self.assertTrue(config.preload_app)
+        self.assertGreaterEqual(config.workers, 1)
+        self.assertLessEqual(config.workers, 4)
+
+    def test_threads_select_gthread(self):
+        """Test that more than one thread switches to the gthread worker class"""
+        config = load_config({"GUNICORN_THREADS": "4"})
+        self.assertEqual(config.threads, 4)
+        self.assertEqual(config.worker_class, "gthread")
+
+    def test_env_overrides(self):
+        """Test explicit worker count, preload toggle and malformed values"""
+        config = load_config({"WEB_CONCURRENCY": "7", "GUNICORN_PRELOAD": "false", "GUNICORN_TIMEOUT": "abc"})
+        self.assertEqual(config.workers, 7)
+        self.assertFalse(config.preload_app)
+        self.assertEqual(config.timeout, 120)
+
+    def test_request_hooks_record_metrics(self):
+        """Test that pre/post request hooks accumulate per-worker metrics"""
+        config = load_config({})
+        config.post_fork(None, None)
+
+        class Req:
+            pass
+
+        class Resp:
+            status_code = 500
+
+        req = Req()
+        config.pre_request(None, req)
+        config.post_request(None, req, {}, Resp())
+        self.assertEqual(config.worker_metrics["requests"], 1)
+        self.assertEqual(config.worker_metrics["errors"], 1)
+        self.assertGreaterEqual(config.worker_metrics["total_time"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
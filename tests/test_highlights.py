@@ -0,0 +1,90 @@
+"""
+Tests for match highlight spans computed from indexed token positions
+"""
+
+import json
+import unittest
+
+from app import create_app, mood_metadata, mood_playlists
+from search_engine import HighlightIndex
+
+
+class TestHighlightIndex(unittest.TestCase):
+    """Test span lookup from recorded token positions"""
+
+    def setUp(self):
+        self.index = HighlightIndex(mood_playlists, mood_metadata)
+
+    def test_prefix_spans(self):
+        """Test that a query highlights token prefixes in every field"""
+        spans = self.index.spans("happy", ["happ"])
+        self.assertEqual(spans["name"], [[0, 4]])
+        self.assertEqual(spans["description"], [])
+        self.assertEqual(spans["keywords"], [[0, 0, 4]])
+
+    def test_multi_word_terms(self):
+        """Test runs of consecutive tokens, including punctuation between them"""
+        playlists = {"a": "1"}
+        metadata = {"a": {"name": "Good Vibes", "description": "Only good, feel-good vibes", "keywords": ["good", "vibes"]}}
+        index = HighlightIndex(playlists, metadata)
+        spans = index.spans("a", ["good vi", "feel-good"])
+        self.assertEqual(spans["name"], [[0, 7]])
+        self.assertEqual(spans["description"], [[11, 23]], "'feel-good' and 'good vi' overlap and merge")
+        self.assertEqual(spans["keywords"], [], "Words in separate keywords are not a run")
+
+    def test_multi_word_first_word_is_whole(self):
+        """Test that only the last word of a multi-word term matches as a prefix"""
+        playlists = {"a": "1"}
+        metadata = {"a": {"name": "Goodness Vibes", "description": "Good vibes", "keywords": []}}
+        spans = HighlightIndex(playlists, metadata).spans("a", ["good vibes"])
+        self.assertEqual(spans["name"], [], "'good' is only a prefix of 'Goodness'")
+        self.assertEqual(spans["description"], [[0, 10]])
+
+    def test_merged_and_sorted(self):
+        """Test that overlapping spans from the query and its expansions merge"""
+        playlists = {"a": "1"}
+        metadata = {"a": {"name": "Relaxing relax", "description": "", "keywords": []}}
+        spans = HighlightIndex(playlists, metadata).spans("a", ["relax", "relaxing", "rel"])
+        self.assertEqual(spans["name"], [[0, 8], [9, 14]])
+
+    def test_matches_original_text(self):
+        """Test that every span covers the term in the original (mixed-case) string"""
+        for mood_key, info in mood_metadata.items():
+            for query in ["in", "vibes", "energy"]:
+                spans = self.index.spans(mood_key, [query])
+                for start, end in spans["name"]:
+                    self.assertEqual(info["name"][start:end].lower(), query)
+                for index, start, end in spans["keywords"]:
+                    self.assertEqual(info["keywords"][index][start:end].lower(), query)
+
+    def test_infix_matches_are_not_highlighted(self):
+        """Test that matches inside a word are left unmarked"""
+        self.assertEqual(self.index.spans("happy", ["appy"]), {"name": [], "description": [], "keywords": []})
+
+
+class TestHighlightSearchEndpoint(unittest.TestCase):
+    """Test highlights in /search-playlists responses"""
+
+    def setUp(self):
+        self.client = create_app({"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False}).test_client()
+
+    def test_json_and_stream(self):
+        """Test highlights for the query and its synonym expansions"""
+        data = self.client.post("/search-playlists", data={"query": "relaxing"}).get_json()
+        chill = next(mood for mood in data["moods"] if mood["mood_key"] == "chill")
+        self.assertEqual(chill["highlights"]["description"], [[0, 8], [19, 25]], "Relaxing ... unwind(ing)")
+        self.assertIn([1, 0, 5], chill["highlights"]["keywords"], "Expansion 'relax' is highlighted too")
+
+        response = self.client.post("/search-playlists", data={"query": "relaxing", "format": "ndjson"})
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(lines[0]["mood"]["highlights"], chill["highlights"])
+
+    def test_semantic_results_have_no_highlights(self):
+        """Test that semantic fallback results carry no spans"""
+        data = self.client.post("/search-playlists", data={"query": "concentrating"}).get_json()
+        self.assertTrue(data["moods"])
+        self.assertTrue(all("highlights" not in mood for mood in data["moods"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
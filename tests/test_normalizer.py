@@ -0,0 +1,93 @@
+"""
+Tests for Unicode-aware query normalization
+"""
+
+import unittest
+
+from app import create_app
+from normalizer import _normalize_cached, normalize_metadata, normalize_mood_key, normalize_query, normalize_text
+from search_engine import HighlightIndex
+
+
+class TestNormalizeText(unittest.TestCase):
+    """Test the normalization pipeline"""
+
+    def test_pipeline(self):
+        """Test NFKC, casefolding, accent folding and punctuation collapse"""
+        cases = {
+            "ＨＡＰＰＹ": "happy",
+            "Café": "cafe",
+            "Cafe\u0301": "cafe",  # Decomposed accent
+            "Straße": "strasse",
+            "ﬁre": "fire",
+            "chill!!": "chill",
+            "  feel-good   vibes ": "feel good vibes",
+            "happy 😊": "happy",
+            "👨‍👩‍👧 family": "family",
+            "naïve\tcafé": "naive cafe",
+            "!!": "",
+        }
+        for raw, expected in cases.items():
+            with self.subTest(raw=raw):
+                self.assertEqual(normalize_text(raw), expected)
+
+    def test_ascii_fast_path_agrees(self):
+        """Test that the ASCII shortcut gives the same result as the full Unicode pipeline"""
+        for raw in ["Good Vibes!", "h@ppy", "rock 'n' roll", "tab\there", "a_b-c~d"]:
+            with self.subTest(raw=raw):
+                self.assertEqual(normalize_text("é " + raw), "e " + normalize_text(raw))
+
+    def test_query_cache(self):
+        """Test memoization of repeated queries and uncached long inputs"""
+        normalize_query("Repeated Query!")
+        hits = _normalize_cached.cache_info().hits
+        self.assertEqual(normalize_query("Repeated Query!"), "repeated query")
+        self.assertEqual(_normalize_cached.cache_info().hits, hits + 1)
+
+        size = _normalize_cached.cache_info().currsize
+        self.assertEqual(normalize_query("A" * 1000), "a" * 1000)
+        self.assertEqual(_normalize_cached.cache_info().currsize, size, "Long inputs bypass the cache")
+
+    def test_mood_keys_and_metadata(self):
+        """Test mood identifiers and catalog normalization"""
+        self.assertEqual(normalize_mood_key(" ＨＡＰＰＹ! "), "happy")
+        self.assertEqual(normalize_mood_key("Deep Focus"), "deep_focus")
+        normalized = normalize_metadata({"a": {"name": "Café", "description": "High-energy", "keywords": ["Feel-Good"]}})
+        self.assertEqual(normalized["a"], {"name": "cafe", "description": "high energy", "keywords": ["feel good"]})
+
+    def test_highlights_point_into_original_text(self):
+        """Test that normalized highlight tokens keep offsets into the original strings"""
+        index = HighlightIndex({"a": "1"}, {"a": {"name": "Ｃafé Straße", "description": "", "keywords": []}})
+        self.assertEqual(index.spans("a", ["caf"])["name"], [[0, 3]])
+        self.assertEqual(index.spans("a", ["stras"])["name"], [[5, 11]], "Length changed: whole token")
+
+
+class TestNormalizedEndpoints(unittest.TestCase):
+    """Test normalization in /search-playlists and /get-playlist"""
+
+    def setUp(self):
+        self.client = create_app({"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False}).test_client()
+
+    def test_search_queries(self):
+        """Test queries that previously missed"""
+        for query, mood in [("chill!!", "chill"), ("ＨＡＰＰＹ", "happy"), ("happy 😊", "happy"), ("High Energy", "energetic")]:
+            with self.subTest(query=query):
+                data = self.client.post("/search-playlists", data={"query": query}).get_json()
+                self.assertIn(mood, [result["mood_key"] for result in data["moods"]])
+
+    def test_punctuation_only_query(self):
+        """Test that a query with nothing left after normalization is rejected"""
+        response = self.client.post("/search-playlists", data={"query": "?!"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_playlist(self):
+        """Test that mood identifiers are normalized the same way"""
+        for mood in ["ＨＡＰＰＹ", " Happy! ", "happy😊"]:
+            with self.subTest(mood=mood):
+                response = self.client.post("/get-playlist", data={"mood": mood})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.get_json()["mood"], "happy")
+
+
+if __name__ == "__main__":
+    unittest.main()
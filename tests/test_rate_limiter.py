@@ -0,0 +1,148 @@
+"""
+Tests for token-bucket rate limiting of the POST endpoints
+"""
+
+import os
+import tempfile
+import unittest
+
+from app import create_app
+from rate_limiter import SQLiteRateLimiter, TokenBucketLimiter
+
+
+class FakeClock:
+    """Manually advanced time source"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucketLimiter(unittest.TestCase):
+    """Test bucket accounting, refill and eviction"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = TokenBucketLimiter(rate=2, burst=3, shards=4, idle_ttl=10, clock=self.clock)
+
+    def test_burst_then_reject(self):
+        """Test that a full bucket allows `burst` requests and then rejects"""
+        results = [self.limiter.hit("a") for _ in range(4)]
+        self.assertEqual([r.allowed for r in results], [True, True, True, False])
+        self.assertEqual([r.remaining for r in results], [2, 1, 0, 0])
+        self.assertAlmostEqual(results[-1].retry_after, 0.5)
+        self.assertTrue(self.limiter.hit("b").allowed, "Other clients have their own bucket")
+
+    def test_refill(self):
+        """Test that tokens refill at `rate` per second, capped at `burst`"""
+        for _ in range(3):
+            self.limiter.hit("a")
+        self.clock.now += 0.5
+        self.assertTrue(self.limiter.hit("a").allowed)
+        self.assertFalse(self.limiter.hit("a").allowed)
+
+        self.clock.now += 100
+        self.assertEqual(self.limiter.hit("a").remaining, 2)
+
+    def test_idle_buckets_evicted(self):
+        """Test that buckets idle past the TTL are swept"""
+        self.limiter.hit("idle")
+        self.clock.now += 5
+        self.limiter.hit("active")
+        self.clock.now += 6
+        self.limiter.sweep()
+        self.assertEqual(len(self.limiter), 1)
+        self.assertEqual(self.limiter.hit("idle").remaining, 2, "Evicted client starts with a full bucket")
+
+    def test_headers(self):
+        """Test RateLimit-* and Retry-After header values"""
+        for _ in range(3):
+            result = self.limiter.hit("a")
+        self.assertEqual(result.headers(), {"RateLimit-Limit": "3", "RateLimit-Remaining": "0", "RateLimit-Reset": "2"})
+        self.assertEqual(self.limiter.hit("a").headers()["Retry-After"], "1")
+
+    def test_invalid_configuration(self):
+        """Test that nonsensical limits are rejected"""
+        with self.assertRaises(ValueError):
+            TokenBucketLimiter(rate=0, burst=5)
+
+
+class TestSQLiteRateLimiter(unittest.TestCase):
+    """Test the cross-process SQLite backend"""
+
+    def test_buckets_shared_between_instances(self):
+        """Test that two limiters on one database draw from the same bucket"""
+        clock = FakeClock()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ratelimit.sqlite3")
+            first = SQLiteRateLimiter(path, rate=1, burst=2, clock=clock)
+            second = SQLiteRateLimiter(path, rate=1, burst=2, clock=clock)
+
+            self.assertTrue(first.hit("a").allowed)
+            self.assertTrue(second.hit("a").allowed)
+            self.assertFalse(first.hit("a").allowed)
+
+            clock.now += 1
+            self.assertTrue(second.hit("a").allowed)
+
+
+class TestRateLimitedEndpoints(unittest.TestCase):
+    """Test throttling through the Flask app"""
+
+    def make_app(self, **overrides):
+        config = {"ANALYTICS_ENABLED": False, "RATE_LIMIT_RATE": 0.001, "RATE_LIMIT_BURST": 2}
+        config.update(overrides)
+        return create_app(config)
+
+    def test_post_endpoints_throttled(self):
+        """Test 429 with Retry-After once the burst is spent"""
+        with self.make_app().test_client() as client:
+            for _ in range(2):
+                response = client.post("/search-playlists", data={"query": "happy"})
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("RateLimit-Remaining", response.headers)
+
+            response = client.post("/get-playlist", data={"mood": "happy"})
+            self.assertEqual(response.status_code, 429)
+            self.assertFalse(response.get_json()["success"])
+            self.assertIn("Retry-After", response.headers)
+            self.assertEqual(response.headers["RateLimit-Remaining"], "0")
+
+            response = client.get("/version")
+            self.assertEqual(response.status_code, 200, "GET endpoints are not limited")
+            self.assertNotIn("RateLimit-Limit", response.headers)
+
+    def test_clients_keyed_by_ip(self):
+        """Test that separate addresses get separate buckets, honouring trusted proxies"""
+        with self.make_app(TRUST_PROXY=1).test_client() as client:
+            for address in ["198.51.100.1", "198.51.100.1", "198.51.100.2"]:
+                # Hops before the trusted proxy's entry are client-supplied and ignored
+                response = client.post(
+                    "/get-playlist", data={"mood": "happy"}, headers={"X-Forwarded-For": f"203.0.113.9, {address}"}
+                )
+                self.assertEqual(response.status_code, 200)
+            response = client.post("/get-playlist", data={"mood": "happy"}, headers={"X-Forwarded-For": "198.51.100.1"})
+            self.assertEqual(response.status_code, 429)
+
+    def test_proxy_not_trusted_by_default(self):
+        """Test that X-Forwarded-For is ignored unless TRUST_PROXY is set"""
+        with self.make_app().test_client() as client:
+            for address in ["198.51.100.1", "198.51.100.2"]:
+                response = client.post("/get-playlist", data={"mood": "happy"}, headers={"X-Forwarded-For": address})
+                self.assertEqual(response.status_code, 200)
+            response = client.post("/get-playlist", data={"mood": "happy"}, headers={"X-Forwarded-For": "198.51.100.3"})
+            self.assertEqual(response.status_code, 429, "All three requests came from the same peer")
+
+    def test_disabled(self):
+        """Test that no limiter is installed when disabled"""
+        flask_app = self.make_app(RATE_LIMIT_ENABLED=False)
+        self.assertNotIn("rate_limiter", flask_app.extensions)
+        with flask_app.test_client() as client:
+            for _ in range(5):
+                self.assertEqual(client.post("/get-playlist", data={"mood": "happy"}).status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
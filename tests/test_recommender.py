@@ -0,0 +1,102 @@
+"""
+Tests for the co-occurrence mood recommender
+"""
+
+import unittest
+
+from app import create_app, mood_playlists
+from recommender import NUMPY_AVAILABLE
+
+if NUMPY_AVAILABLE:
+    from recommender import MoodRecommender
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+class TestMoodRecommender(unittest.TestCase):
+    """Test incremental updates and top-k suggestions"""
+
+    def setUp(self):
+        self.recommender = MoodRecommender(mood_playlists)
+
+    def test_transitions_rank_by_frequency(self):
+        """Test that the most frequent next mood is suggested first"""
+        for _ in range(3):
+            self.recommender.observe(["happy"], "party")
+        self.recommender.observe(["happy"], "chill")
+        self.recommender.observe(["sad"], "party")
+
+        self.assertEqual(self.recommender.next_moods("happy"), ["party", "chill"])
+        self.assertEqual(self.recommender.next_moods("sad", k=1), ["party"])
+        self.assertEqual(self.recommender.next_moods("focused"), [])
+
+    def test_cache_invalidated_on_update(self):
+        """Test that cached top-k results reflect new observations"""
+        self.recommender.observe(["happy"], "chill")
+        self.assertEqual(self.recommender.next_moods("happy", k=1), ["chill"])
+        for _ in range(2):
+            self.recommender.observe(["happy"], "party")
+        self.assertEqual(self.recommender.next_moods("happy", k=1), ["party"])
+
+    def test_ties_follow_catalog_order(self):
+        """Test deterministic ordering for equal counts"""
+        self.recommender.observe(["happy"], "running")
+        self.recommender.observe(["happy"], "sad")
+        self.assertEqual(self.recommender.next_moods("happy"), ["sad", "running"])
+
+    def test_cooccurrence_is_symmetric(self):
+        """Test that moods in one window are related in both directions"""
+        self.recommender.observe(["focused", "sleepy"], "meditative")
+        self.assertEqual(self.recommender.related_moods("meditative"), ["sleepy", "focused"])
+        self.assertEqual(self.recommender.related_moods("focused"), ["meditative"])
+
+    def test_suggest_tops_up_with_related(self):
+        """Test that sparse transitions are supplemented with co-occurring moods"""
+        self.recommender.observe(["angry", "sad"], "melancholy")
+        self.recommender.observe(["sad"], "happy")
+        self.assertEqual(self.recommender.next_moods("angry"), [])
+        self.assertEqual(self.recommender.suggest("angry"), ["melancholy"])
+        self.assertEqual(self.recommender.suggest("sad"), ["happy", "melancholy"])
+
+    def test_unknown_moods_ignored(self):
+        """Test that unknown moods neither crash nor get recorded"""
+        self.recommender.observe(["unknown"], "nope")
+        self.recommender.observe(["unknown"], "happy")
+        self.assertEqual(self.recommender.suggest("unknown"), [])
+        self.assertEqual(int(self.recommender.transitions.sum()), 0)
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+class TestRecommendationEndpoints(unittest.TestCase):
+    """Test recommendations served through the API"""
+
+    def test_session_history_feeds_recommendations(self):
+        """Test that a user's mood sequence produces next-mood suggestions"""
+        flask_app = create_app({"ANALYTICS_ENABLED": False})
+        with flask_app.test_client() as client:
+            client.post("/get-playlist", data={"mood": "focused"})
+            client.post("/get-playlist", data={"mood": "chill"})
+            data = client.post("/get-playlist", data={"mood": "focused"}).get_json()
+            self.assertEqual([m["key"] for m in data["next_moods"]], ["chill"])
+
+            data = client.get("/recommendations/Focused").get_json()
+            self.assertTrue(data["success"])
+            self.assertEqual([m["key"] for m in data["next"]], ["chill"])
+            self.assertEqual([m["key"] for m in data["related"]], ["chill"])
+
+            # Spelled like the other mood endpoints accept it (full-width, punctuation)
+            data = client.get("/recommendations/ＦＯＣＵＳＥＤ!").get_json()
+            self.assertEqual(data["mood"], "focused")
+            self.assertEqual([m["key"] for m in data["next"]], ["chill"])
+
+            self.assertEqual(client.get("/recommendations/unknown").status_code, 400)
+
+    def test_disabled_recommender(self):
+        """Test the endpoint and response field when the recommender is off"""
+        flask_app = create_app({"RECOMMENDER_ENABLED": False, "ANALYTICS_ENABLED": False})
+        with flask_app.test_client() as client:
+            self.assertEqual(client.get("/recommendations/happy").status_code, 404)
+            self.assertEqual(client.post("/get-playlist", data={"mood": "happy"}).get_json()["next_moods"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
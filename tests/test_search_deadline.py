@@ -0,0 +1,218 @@
+"""
+Tests for the per-request search deadline and partial results
+"""
+
+import itertools
+import json
+import unittest
+from unittest import mock
+
+from app import create_app, mood_metadata, mood_playlists, search_results, stream_search_results
+from search_engine import (
+    DEADLINE_CHECK_INTERVAL,
+    RankedPage,
+    SearchDeadline,
+    SearchPage,
+    decode_cursor,
+    iter_matches,
+    parse_cursor,
+)
+from search_scorer import PythonScorer
+
+
+class FakeClock:
+    """Clock that advances by ``step`` seconds on every read"""
+
+    def __init__(self, step=0.001):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+class TestSearchDeadline(unittest.TestCase):
+    """Test budgets, stage timings and early stopping"""
+
+    def test_budget_and_timings(self):
+        """Test expiry and per-stage milliseconds"""
+        deadline = SearchDeadline(0.0025, clock=FakeClock())
+        self.assertFalse(deadline.expired())
+        with deadline.stage("exact"):
+            pass
+        self.assertEqual(deadline.timings, {"exact": 1.0})
+        self.assertTrue(deadline.expired())
+        self.assertFalse(SearchDeadline(None).expired(), "No budget means no deadline")
+
+    def test_scan_stops_and_resumes(self):
+        """Test that a cut-short scan is partial and its cursor resumes where it stopped"""
+        playlists = {f"mood{i}": str(i) for i in range(DEADLINE_CHECK_INTERVAL * 4)}
+        # Clock reads: 1ms at creation (expires at 2.5ms), 2ms at position 0, 3ms at position 32
+        deadline = SearchDeadline(0.0015, clock=FakeClock())
+        page = SearchPage(iter_matches("mood", playlists, {}, deadline=deadline), limit=100, deadline=deadline)
+        found = list(page)
+
+        self.assertEqual(len(found), DEADLINE_CHECK_INTERVAL)
+        self.assertTrue(deadline.partial)
+        self.assertEqual(decode_cursor(page.next_cursor), DEADLINE_CHECK_INTERVAL)
+
+        rest = SearchPage(iter_matches("mood", playlists, {}), start=decode_cursor(page.next_cursor))
+        self.assertEqual(found + list(rest), list(playlists))
+
+    def test_paused_time_is_not_charged(self):
+        """Test that paused time extends the budget and is left out of stage timings"""
+        clock = FakeClock(step=0)
+        deadline = SearchDeadline(1, clock=clock)
+        with deadline.stage("lexical"):
+            with deadline.paused():
+                clock.now += 5
+            clock.now += 0.25
+        self.assertFalse(deadline.expired())
+        self.assertEqual(deadline.timings, {"lexical": 250.0})
+        clock.now += 1
+        self.assertTrue(deadline.expired())
+
+    def test_unexpired_scan_is_complete(self):
+        """Test that a generous budget changes nothing"""
+        deadline = SearchDeadline(10)
+        matches = list(iter_matches("in", mood_playlists, mood_metadata, deadline=deadline))
+        self.assertEqual(matches, list(iter_matches("in", mood_playlists, mood_metadata)))
+        self.assertFalse(deadline.partial)
+
+    def test_ranking_skipped_after_expiry(self):
+        """Test that relevance scoring does not start once the budget is spent"""
+        deadline = SearchDeadline(0.001, clock=FakeClock(step=1))
+        page = RankedPage(PythonScorer(mood_playlists, mood_metadata), "in", deadline=deadline)
+        self.assertEqual(list(page), [])
+        self.assertTrue(deadline.partial)
+        self.assertEqual(page.total, 0)
+
+
+class TestSearchDeadlineEndpoint(unittest.TestCase):
+    """Test partial results and timings through /search-playlists"""
+
+    def client(self, deadline_ms):
+        config = {"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False, "SEARCH_DEADLINE_MS": deadline_ms}
+        return create_app(config).test_client()
+
+    def test_timings_without_expiry(self):
+        """Test that every stage that ran is timed and the result is complete"""
+        client = self.client(0)
+        data = client.post("/search-playlists", data={"query": "happy"}).get_json()
+        self.assertFalse(data["partial"])
+        self.assertEqual(set(data["timings"]), {"exact", "lexical"})
+
+        data = client.post("/search-playlists", data={"query": "concentrating"}).get_json()
+        self.assertEqual(set(data["timings"]), {"exact", "lexical", "semantic"})
+
+    def test_expired_budget_keeps_exact_match(self):
+        """Test that an exhausted budget still returns the exact-key match, flagged partial"""
+        client = self.client(1e-6)
+        for sort, facets in itertools.product(["", "relevance"], ["", "1"]):
+            with self.subTest(sort=sort, facets=facets):
+                data = client.post("/search-playlists", data={"query": "Chill", "sort": sort, "facets": facets}).get_json()
+                self.assertTrue(data["partial"])
+                self.assertEqual([mood["mood_key"] for mood in data["moods"]], ["chill"])
+                self.assertEqual(data["total"], 1)
+
+        data = client.post("/search-playlists", data={"query": "chill", "category": "Emotional"}).get_json()
+        self.assertEqual(data["moods"], [], "The exact match still honours the category filter")
+
+    def test_expired_budget_skips_semantic_stage(self):
+        """Test that the semantic fallback does not run after the deadline"""
+        data = self.client(1e-6).post("/search-playlists", data={"query": "concentrating"}).get_json()
+        self.assertTrue(data["partial"])
+        self.assertEqual(data["moods"], [])
+        self.assertNotIn("semantic", data["timings"])
+
+    def test_cut_short_unpaginated_scan_returns_cursor(self):
+        """Test that a deadline-truncated result without limit still says where to resume"""
+        data = self.client(1e-6).post("/search-playlists", data={"query": "in"}).get_json()
+        self.assertTrue(data["partial"])
+        self.assertIsNotNone(data["next_cursor"])
+
+        complete = self.client(0).post("/search-playlists", data={"query": "in"}).get_json()
+        self.assertNotIn("next_cursor", complete, "Complete unpaginated results keep their original shape")
+        rest = self.client(0).post("/search-playlists", data={"query": "in", "cursor": data["next_cursor"]}).get_json()
+        found = [mood["mood_key"] for mood in data["moods"] + rest["moods"]]
+        self.assertEqual(found, [mood["mood_key"] for mood in complete["moods"]])
+
+    def test_slow_stream_consumer_keeps_budget(self):
+        """Test that a client reading the NDJSON stream slowly does not expire the deadline"""
+        clock = FakeClock(step=0)
+        deadline = SearchDeadline(1, clock=clock)
+        flask_app = create_app({"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False})
+        with flask_app.test_request_context():
+            page = SearchPage(iter_matches("in", mood_playlists, mood_metadata, deadline=deadline), deadline=deadline)
+            stream = stream_search_results("in", page, deadline=deadline)
+            next(stream)
+            clock.now += 5  # Client stalls after the first line
+            end = json.loads(list(stream)[-1])
+        self.assertFalse(end["partial"])
+        self.assertEqual(end["timings"]["lexical"], 0.0)
+
+    def cut_short_page(self, exact, limit):
+        """Search "in" with a scan cut off at catalog position 4, then resume from next_cursor"""
+        # Clock reads: 1ms at creation (expires at 3.5ms), 2ms at the stage start, 3ms at position 0, 4ms at position 4
+        deadline = SearchDeadline(0.0025, clock=FakeClock())
+        flask_app = create_app({"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False})
+        with flask_app.test_request_context(), mock.patch("search_engine.DEADLINE_CHECK_INTERVAL", 4):
+            matches = iter_matches("in", mood_playlists, mood_metadata, deadline=deadline)
+            page = SearchPage(matches, limit=limit, deadline=deadline)
+            first = [mood["mood_key"] for mood in search_results("in", page, deadline, exact=exact)]
+            self.assertEqual(deadline.resume_at, 4)
+
+            start, skip = parse_cursor(page.next_cursor)
+            rest = SearchPage(iter_matches("in", mood_playlists, mood_metadata), start=start, skip=skip)
+            return page, first, list(rest), rest.total
+
+    def test_exact_match_already_scanned_is_not_added_twice(self):
+        """Test that an exact match counted by the scan but past the limit is neither recounted nor repeated"""
+        page, first, rest, total = self.cut_short_page("chill", limit=1)  # "chill" is position 3
+        self.assertEqual(first, ["energetic"])
+        self.assertEqual(page.total, 2, "Positions 2 and 3 were scanned and counted once")
+        self.assertEqual(rest[0], "chill", "It is the first result of the next page")
+        self.assertEqual(first + rest, [mood_key for _, mood_key in iter_matches("in", mood_playlists, mood_metadata)])
+
+    def test_exact_match_past_the_cut_is_skipped_when_resuming(self):
+        """Test that an exact match beyond the scanned range is counted once and not returned again"""
+        page, first, rest, total = self.cut_short_page("party", limit=1)  # "party" is position 8
+        self.assertEqual(first, ["energetic", "party"])
+        self.assertEqual(page.total, 3)
+        self.assertNotIn("party", rest)
+        everything = [mood_key for _, mood_key in iter_matches("in", mood_playlists, mood_metadata)]
+        self.assertEqual(sorted(first + rest), sorted(everything))
+        self.assertEqual(total, len(everything), "The resumed page still counts the skipped match in total")
+
+    def test_paginated_partial_pages_do_not_repeat(self):
+        """Test a limited, deadline-cut first page followed by the page from its cursor"""
+        data = {"query": "motivated", "limit": "1"}  # Matches "motivated" and "uplifting"
+        first = self.client(1e-6).post("/search-playlists", data=data).get_json()
+        self.assertTrue(first["partial"])
+        self.assertEqual([mood["mood_key"] for mood in first["moods"]], ["motivated"])
+        self.assertEqual(first["total"], 1)
+
+        client = self.client(0)
+        keys = [mood["mood_key"] for mood in first["moods"]]
+        cursor = first["next_cursor"]
+        while cursor:
+            page = client.post("/search-playlists", data={**data, "cursor": cursor}).get_json()
+            keys += [mood["mood_key"] for mood in page["moods"]]
+            cursor = page["next_cursor"]
+        complete = client.post("/search-playlists", data={"query": "motivated"}).get_json()
+        self.assertEqual(len(keys), len(set(keys)), "No mood appears on two pages")
+        self.assertEqual(sorted(keys), sorted(mood["mood_key"] for mood in complete["moods"]))
+        self.assertEqual(page["total"], complete["total"])
+
+    def test_streamed_partial(self):
+        """Test the partial flag and timings on the NDJSON end line"""
+        response = self.client(1e-6).post("/search-playlists", data={"query": "happy", "format": "ndjson"})
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(lines[0]["mood"]["mood_key"], "happy")
+        self.assertTrue(lines[-1]["partial"])
+        self.assertIn("lexical", lines[-1]["timings"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Tests for lazy search matching, cursor pagination and NDJSON streaming
+"""
+
+import json
+import unittest
+
+from app import create_app
+from search_engine import SearchPage, decode_cursor, encode_cursor, iter_matches, parse_cursor
+
+
+class TestSearchEngine(unittest.TestCase):
+    """Test the generator-based matcher and pages"""
+
+    def test_cursor_round_trip(self):
+        """Test that cursors decode to the encoded position and reject garbage"""
+        self.assertEqual(decode_cursor(encode_cursor(17)), 17)
+        self.assertEqual(parse_cursor(encode_cursor(17)), (17, None))
+        self.assertEqual(parse_cursor(encode_cursor(3, skip=8)), (3, 8))
+        for cursor in ["", "!!!", encode_cursor(3)[:-1] + "@", "eDEy"]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    decode_cursor(cursor)
+
+    def test_page_is_lazy(self):
+        """Test that the first result is produced before later matches are computed"""
+        consumed = []
+
+        def matches():
+            for position in range(5):
+                consumed.append(position)
+                yield position, f"mood{position}"
+
+        results = iter(SearchPage(matches(), limit=2))
+        self.assertEqual(next(results), "mood0")
+        self.assertEqual(consumed, [0])
+
+    def test_page_counts_and_cursor(self):
+        """Test totals and next_cursor across pages"""
+        matches = [(1, "a"), (4, "b"), (6, "c"), (9, "d")]
+
+        first = SearchPage(iter(matches), limit=2)
+        self.assertEqual(list(first), ["a", "b"])
+        self.assertEqual(first.total, 4)
+
+        second = SearchPage(iter(matches), start=decode_cursor(first.next_cursor), limit=2)
+        self.assertEqual(list(second), ["c", "d"])
+        self.assertEqual(second.total, 4)
+        self.assertIsNone(second.next_cursor)
+
+    def test_iter_matches_catalog_order(self):
+        """Test that matches keep catalog order and positions"""
+        playlists = {"happy": "1", "sad": "2", "chill": "3"}
+        metadata = {"chill": {"keywords": ["happy vibes"]}}
+        self.assertEqual(list(iter_matches("happy", playlists, metadata)), [(0, "happy"), (2, "chill")])
+
+
+class TestSearchEndpointModes(unittest.TestCase):
+    """Test pagination and streaming through /search-playlists"""
+
+    def setUp(self):
+        self.client = create_app({"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False}).test_client()
+
+    def test_pagination_covers_full_result_set(self):
+        """Test that following cursors returns exactly the unpaginated results"""
+        everything = self.client.post("/search-playlists", data={"query": "in"}).get_json()
+        self.assertNotIn("next_cursor", everything, "Unpaginated responses keep their original shape")
+
+        collected, cursor = [], None
+        while True:
+            data = {"query": "in", "limit": 2}
+            if cursor:
+                data["cursor"] = cursor
+            page = self.client.post("/search-playlists", data=data).get_json()
+            self.assertLessEqual(len(page["moods"]), 2)
+            self.assertEqual(page["total"], everything["total"])
+            collected.extend(page["moods"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(collected, everything["moods"])
+
+    def test_invalid_pagination_parameters(self):
+        """Test that bad limits and cursors are rejected"""
+        for data in [{"limit": 0}, {"limit": 1000}, {"cursor": "not-a-cursor"}]:
+            with self.subTest(data=data):
+                response = self.client.post("/search-playlists", data={"query": "happy", **data})
+                self.assertEqual(response.status_code, 400)
+
+    def test_ndjson_stream(self):
+        """Test one JSON line per mood followed by a summary line"""
+        expected = self.client.post("/search-playlists", data={"query": "calm"}).get_json()
+
+        response = self.client.post("/search-playlists", data={"query": "calm", "format": "ndjson"})
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        self.assertEqual([line["mood"] for line in lines[:-1]], expected["moods"])
+        end = lines[-1]
+        self.assertEqual(set(end.pop("timings")), {"exact", "lexical"})
+        self.assertEqual(
+            end, {"type": "end", "success": True, "query": "calm", "total": 2, "next_cursor": None, "partial": False}
+        )
+
+    def test_ndjson_selected_by_accept_header(self):
+        """Test content negotiation for the streamed format"""
+        response = self.client.post(
+            "/search-playlists", data={"query": "happy", "limit": 1}, headers={"Accept": "application/x-ndjson"}
+        )
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[-1])["type"], "end")
+
+
+if __name__ == "__main__":
+    unittest.main()
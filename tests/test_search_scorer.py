@@ -0,0 +1,106 @@
+"""
+Tests for the weighted relevance scorers (pure Python and NumPy)
+"""
+
+import unittest
+
+from app import create_app, mood_playlists, mood_metadata
+from search_engine import iter_matches
+from search_scorer import NUMPY_AVAILABLE, NumpyScorer, PythonScorer, create_scorer
+
+QUERIES = ["happy", "in", "e", "calm", "good vibes", "energy", "zzz", "romantic", "ing", "ed"]
+
+
+class TestPythonScorer(unittest.TestCase):
+    """Test weighting and ordering of the reference scorer"""
+
+    def setUp(self):
+        self.scorer = PythonScorer(mood_playlists, mood_metadata)
+
+    def test_field_weights(self):
+        """Test that key/name hits outrank keyword hits, which outrank description hits"""
+        playlists = {"a": "1", "b": "2", "c": "3"}
+        metadata = {
+            "a": {"description": "late night"},
+            "b": {"keywords": ["night drive", "night owl"]},
+            "c": {"name": "Night"},
+        }
+        ranked, total = PythonScorer(playlists, metadata).top_k("night")
+        self.assertEqual(ranked, [("c", 4), ("b", 2), ("a", 1)])
+        self.assertEqual(total, 3)
+
+    def test_matches_same_moods_as_search(self):
+        """Test that every search match gets a positive score and nothing else does"""
+        for query in QUERIES:
+            with self.subTest(query=query):
+                ranked, total = self.scorer.top_k(query)
+                expected = {mood_key for _, mood_key in iter_matches(query, mood_playlists, mood_metadata)}
+                self.assertEqual({mood_key for mood_key, _ in ranked}, expected)
+                self.assertEqual(total, len(expected))
+
+    def test_top_k_truncates(self):
+        """Test that k limits the ranking but not the total"""
+        ranked, total = self.scorer.top_k("e", k=3)
+        self.assertEqual(len(ranked), 3)
+        self.assertGreater(total, 3)
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+class TestNumpyScorer(unittest.TestCase):
+    """Test that the vectorized scorer matches the reference exactly"""
+
+    def assert_identical(self, playlists, metadata, queries):
+        python_scorer = PythonScorer(playlists, metadata)
+        numpy_scorer = NumpyScorer(playlists, metadata)
+        for query in queries:
+            for k in (None, 1, 5):
+                with self.subTest(query=query, k=k):
+                    self.assertEqual(numpy_scorer.top_k(query, k), python_scorer.top_k(query, k))
+
+    def test_identical_on_catalog(self):
+        """Test identical rankings, scores and totals on the built-in catalog"""
+        terms = {term for info in mood_metadata.values() for term in info["keywords"]}
+        substrings = {term[i : i + 2] for term in terms for i in range(len(term) - 1)}
+        self.assert_identical(mood_playlists, mood_metadata, QUERIES + sorted(substrings))
+
+    def test_identical_with_long_values(self):
+        """Test vocabulary length buckets, including values longer than the largest bucket"""
+        playlists = {f"m{i}": str(i) for i in range(40)}
+        metadata = {
+            f"m{i}": {"name": f"Mood {i}", "description": "x" * (i * 10) + " tail", "keywords": ["k" * i]} for i in range(40)
+        }
+        self.assert_identical(playlists, metadata, ["tail", "x" * 200, "kkk", "mood 1", "m3", "k" * 39])
+
+    def test_create_scorer_threshold(self):
+        """Test engine selection"""
+        self.assertIsInstance(create_scorer(mood_playlists, mood_metadata), PythonScorer)
+        self.assertIsInstance(create_scorer(mood_playlists, mood_metadata, numpy_threshold=1), NumpyScorer)
+        self.assertIsInstance(create_scorer(mood_playlists, mood_metadata, engine="numpy"), NumpyScorer)
+
+
+class TestRelevanceSearchEndpoint(unittest.TestCase):
+    """Test sort=relevance through /search-playlists"""
+
+    def test_relevance_order_and_pagination(self):
+        """Test ranked results and rank-offset cursors"""
+        for engine in ["python", "numpy"] if NUMPY_AVAILABLE else ["python"]:
+            with self.subTest(engine=engine):
+                flask_app = create_app({"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False, "SEARCH_SCORER": engine})
+                client = flask_app.test_client()
+                expected = [key for key, _ in flask_app.extensions["search_scorer"].top_k("in")[0]]
+
+                data = client.post("/search-playlists", data={"query": "in", "sort": "relevance"}).get_json()
+                self.assertEqual([m["mood_key"] for m in data["moods"]], expected)
+
+                first = client.post("/search-playlists", data={"query": "in", "sort": "relevance", "limit": 3}).get_json()
+                rest = client.post(
+                    "/search-playlists",
+                    data={"query": "in", "sort": "relevance", "limit": 100, "cursor": first["next_cursor"]},
+                ).get_json()
+                self.assertEqual([m["mood_key"] for m in first["moods"] + rest["moods"]], expected)
+                self.assertEqual(rest["total"], len(expected))
+                self.assertIsNone(rest["next_cursor"])
+
+
+if __name__ == "__main__":
+    unittest.main()
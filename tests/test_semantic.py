@@ -0,0 +1,93 @@
+"""
+Tests for the offline hashed n-gram semantic fallback
+"""
+
+import json
+import unittest
+
+from app import create_app, mood_playlists, mood_metadata
+from semantic import NUMPY_AVAILABLE, HashingVectorizer
+
+if NUMPY_AVAILABLE:
+    from semantic import SemanticIndex
+
+
+class TestHashingVectorizer(unittest.TestCase):
+    """Test feature hashing"""
+
+    def test_features_are_deterministic_and_skip_stop_words(self):
+        """Test stable hashing and that stop words contribute nothing"""
+        vectorizer = HashingVectorizer(dim=1024)
+        self.assertEqual(vectorizer.features("deep focus"), HashingVectorizer(dim=1024).features("deep focus"))
+        self.assertEqual(vectorizer.features("the music for you"), {})
+        self.assertTrue(all(0 <= bucket < 1024 for bucket in vectorizer.features("concentration")))
+
+    def test_dim_must_be_power_of_two(self):
+        """Test that bucket masking requires a power-of-two dimension"""
+        with self.assertRaises(ValueError):
+            HashingVectorizer(dim=1000)
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+class TestSemanticIndex(unittest.TestCase):
+    """Test cosine top-k over mood documents"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.index = SemanticIndex(mood_playlists, mood_metadata)
+
+    def top(self, query, **kwargs):
+        return [mood_key for mood_key, _ in self.index.search(query, **kwargs)]
+
+    def test_paraphrased_queries(self):
+        """Test queries that share no substring with any keyword"""
+        self.assertEqual(self.top("need to concentrate", k=1), ["focused"])
+        self.assertEqual(self.top("gym session", k=1), ["running"])
+        self.assertEqual(self.top("heartbroken", k=1), ["sad"])
+
+    def test_unrelated_queries_return_nothing(self):
+        """Test that noise stays below the similarity threshold"""
+        self.assertEqual(self.top("xyz123"), [])
+        self.assertEqual(self.top("xyznomatchquery"), [])
+
+    def test_rows_normalized_and_exclusions(self):
+        """Test unit-length rows and excluded moods"""
+        norms = (self.index.matrix**2).sum(axis=1)
+        self.assertTrue(all(abs(norm - 1) < 1e-5 for norm in norms))
+        self.assertNotIn("focused", self.top("need to concentrate", exclude=["focused"]))
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+class TestSemanticFallbackEndpoint(unittest.TestCase):
+    """Test the fallback stage in /search-playlists"""
+
+    def setUp(self):
+        self.client = create_app({"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False}).test_client()
+
+    def test_fallback_when_no_lexical_hits(self):
+        """Test that semantic matches fill an empty lexical result"""
+        # "concentrating" is neither a substring of the catalog nor a listed synonym
+        data = self.client.post("/search-playlists", data={"query": "concentrating"}).get_json()
+        self.assertEqual(data["moods"][0]["mood_key"], "focused")
+        self.assertEqual(data["moods"][0]["match"], "semantic")
+        self.assertEqual(data["total"], len(data["moods"]))
+
+        response = self.client.post("/search-playlists", data={"query": "concentrating", "format": "ndjson"})
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(lines[0]["mood"]["mood_key"], "focused")
+        self.assertEqual(lines[-1]["total"], len(lines) - 1)
+
+    def test_lexical_hits_not_topped_up(self):
+        """Test that queries with lexical hits are unchanged by default"""
+        data = self.client.post("/search-playlists", data={"query": "happy"}).get_json()
+        self.assertEqual([m["mood_key"] for m in data["moods"]], ["happy"])
+        self.assertNotIn("match", data["moods"][0])
+
+    def test_fallback_disabled(self):
+        """Test that the fallback can be switched off"""
+        client = create_app({"ANALYTICS_ENABLED": False, "SEMANTIC_SEARCH_ENABLED": False}).test_client()
+        self.assertEqual(client.post("/search-playlists", data={"query": "concentrating"}).get_json()["total"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+Tests for playlist track ingestion against the fake Spotify API
+"""
+
+import gzip
+import os
+import tempfile
+import time
+import unittest
+
+from app import create_app, mood_playlists
+from fake_spotify import FakeSpotifyServer, generate_tracks
+from spotify_ingest import REQUESTS_AVAILABLE, SpotifyClient, ingest
+from track_cache import PlaylistTracks, Track, TrackCache
+
+
+class TestTrackCache(unittest.TestCase):
+    """Test the on-disk cache format and TTL"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.now = 1000.0
+        self.cache = TrackCache(os.path.join(self.tmp.name, "tracks"), ttl=60, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_and_ttl(self):
+        """Test that entries survive a round trip and go stale after the TTL"""
+        entry = PlaylistTracks("abc", 1000.0, (Track("t1", "Café Song", ("Ava", "Kai"), 180000),))
+        self.assertIsNone(self.cache.get("abc"))
+        self.cache.put(entry)
+        self.assertEqual(self.cache.get("abc"), entry)
+
+        self.now += 61
+        self.assertIsNone(self.cache.get("abc"))
+        self.assertEqual(self.cache.get("abc", allow_stale=True), entry)
+
+    def test_unreadable_entries_are_misses(self):
+        """Test corrupt files and other format versions"""
+        os.makedirs(self.cache.directory)
+        with open(self.cache.path("bad"), "wb") as cache_file:
+            cache_file.write(b"not gzip")
+        self.assertIsNone(self.cache.get("bad"))
+
+        with gzip.open(self.cache.path("old"), "wt") as cache_file:
+            cache_file.write('{"v": 0, "fetched_at": 1000, "tracks": []}')
+        self.assertIsNone(self.cache.get("old", allow_stale=True))
+
+
+@unittest.skipUnless(REQUESTS_AVAILABLE, "requests not installed")
+class TestIngestion(unittest.TestCase):
+    """Test the client and the concurrent ingestion run against the fake API"""
+
+    def setUp(self):
+        self.server = FakeSpotifyServer(page_size=7).start()
+        self.client = SpotifyClient("id", "secret", api_url=self.server.api_url, token_url=self.server.token_url, retries=0)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.skew = 0.0  # The client stamps entries with the real time; the cache clock can run ahead
+        self.cache = TrackCache(self.tmp.name, ttl=60, clock=lambda: time.time() + self.skew)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def test_fetch_follows_paging(self):
+        """Test that every page is fetched with one shared token"""
+        self.server.playlists["p1"] = generate_tracks("p1", count=20)
+        entry = self.client.fetch_playlist("p1")
+        self.assertEqual([track.track_id for track in entry.tracks], [track["id"] for track in self.server.playlists["p1"]])
+        self.assertEqual(self.server.requests["/v1/playlists/p1/tracks"], 3)
+        self.assertEqual(self.server.requests["/api/token"], 1)
+
+    def test_ingest_skips_fresh_entries(self):
+        """Test concurrent fetches, cache reuse, forced refetch and TTL expiry"""
+        playlist_ids = list(mood_playlists.values())[:5]
+        report = ingest(self.client, self.cache, playlist_ids, workers=4)
+        self.assertEqual(sorted(report.fetched), sorted(playlist_ids))
+        self.assertEqual((report.cached, report.failed), ([], {}))
+        requests_made = sum(self.server.requests.values())
+
+        report = ingest(self.client, self.cache, playlist_ids)
+        self.assertEqual((report.fetched, report.cached), ([], playlist_ids))
+        self.assertEqual(sum(self.server.requests.values()), requests_made, "Fresh entries cost no requests")
+
+        self.assertEqual(sorted(ingest(self.client, self.cache, playlist_ids[:1], force=True).fetched), playlist_ids[:1])
+        self.skew += 61
+        self.assertEqual(sorted(ingest(self.client, self.cache, playlist_ids).fetched), sorted(playlist_ids))
+
+    def test_failures_are_reported(self):
+        """Test that one failing playlist does not stop the others"""
+        self.server.failing.add("broken")
+        report = ingest(self.client, self.cache, ["ok", "broken"])
+        self.assertEqual(report.fetched, ["ok"])
+        self.assertIn("broken", report.failed)
+        self.assertIsNone(self.cache.get("broken"))
+
+
+class TestTracksEndpoint(unittest.TestCase):
+    """Test /tracks/<mood> served from the cache"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        config = {"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False, "TRACK_CACHE_DIR": self.tmp.name}
+        self.app = create_app(config)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_tracks(self):
+        """Test the not-ingested, fresh and stale states"""
+        self.assertEqual(self.client.get("/tracks/happy").status_code, 404)
+        self.assertEqual(self.client.get("/tracks/nope").status_code, 400)
+
+        cache = self.app.extensions["track_cache"]
+        cache.put(PlaylistTracks(mood_playlists["happy"], time.time(), (Track("t1", "Song", ("Ava",), 1000),) * 2))
+        data = self.client.get("/tracks/Happy").get_json()
+        self.assertEqual(data["mood"], "happy")
+        self.assertFalse(data["stale"])
+        self.assertEqual(data["total_duration_ms"], 2000)
+        self.assertEqual(data["tracks"][0], {"id": "t1", "title": "Song", "artists": ["Ava"], "duration_ms": 1000})
+
+        cache.put(PlaylistTracks(mood_playlists["happy"], 0, ()))
+        self.assertTrue(self.client.get("/tracks/happy").get_json()["stale"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests for the in-memory manifest, service worker and /version responses
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app import BUILD_INFO, create_app
+from static_cache import StaticResource
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStaticResource(unittest.TestCase):
+    """Test snapshots and reloading on file change"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "sw.js")
+        self.write("const VERSION = 1;")
+        self.clock = FakeClock()
+        self.resource = StaticResource.from_file(self.path, "application/javascript", reload_interval=2, clock=self.clock)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text):
+        with open(self.path, "w") as source:
+            source.write(text)
+
+    def test_reload_after_interval(self):
+        """Test that edits are picked up once the check interval has passed"""
+        first = self.resource.snapshot()
+        self.write("const VERSION = 22;")  # Different size, whatever the mtime resolution
+
+        self.clock.now = 1
+        self.assertIs(self.resource.snapshot(), first, "No check inside the interval")
+        self.clock.now = 2
+        second = self.resource.snapshot()
+        self.assertEqual(second.body, b"const VERSION = 22;")
+        self.assertNotEqual(second.etag, first.etag)
+
+        os.remove(self.path)
+        self.clock.now = 4
+        self.assertIs(self.resource.snapshot(), second, "A deleted file keeps its last good copy")
+
+    def test_small_bodies_are_not_compressed(self):
+        """Test that no gzip variant is kept when it would not help"""
+        self.assertIsNone(self.resource.snapshot().gzip_body)
+        self.assertIsNotNone(StaticResource.from_bytes(b"x" * 1000, "text/plain").snapshot().gzip_body)
+
+
+class TestStaticEndpoints(unittest.TestCase):
+    """Test headers, compression and 304s through the app"""
+
+    def setUp(self):
+        self.client = create_app({"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False}).test_client()
+
+    def test_headers(self):
+        """Test content types, validators and the service worker scope header"""
+        for path, content_type in [
+            ("/manifest.json", "application/manifest+json"),
+            ("/static/service-worker.js", "application/javascript"),
+            ("/version", "application/json"),
+        ]:
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.headers["Content-Type"], content_type)
+                self.assertRegex(response.headers["ETag"], r'^"[0-9a-f]{32}"$')
+                self.assertIn("Last-Modified", response.headers)
+                self.assertEqual(response.headers["Cache-Control"], "no-cache")
+        self.assertEqual(self.client.get("/static/service-worker.js").headers["Service-Worker-Allowed"], "/")
+        self.assertEqual(self.client.get("/version").get_json(), BUILD_INFO)
+
+    def test_gzip_variant(self):
+        """Test that gzip-capable clients get the compressed body with its own ETag"""
+        plain = self.client.get("/manifest.json")
+        compressed = self.client.get("/manifest.json", headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual(compressed.headers["Content-Encoding"], "gzip")
+        self.assertEqual(compressed.headers["Vary"], "Accept-Encoding")
+        self.assertEqual(gzip.decompress(compressed.data), plain.data)
+        self.assertNotEqual(compressed.headers["ETag"], plain.headers["ETag"])
+        self.assertEqual(json.loads(plain.data)["name"], json.loads(gzip.decompress(compressed.data))["name"])
+
+    def test_conditional_requests(self):
+        """Test 304s for matching validators, answered without touching the filesystem"""
+        response = self.client.get("/static/service-worker.js", headers={"Accept-Encoding": "gzip"})
+        etag, last_modified = response.headers["ETag"], response.headers["Last-Modified"]
+
+        with mock.patch("static_cache.os.stat", side_effect=AssertionError("stat() called")):
+            response = self.client.get("/static/service-worker.js", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.data, b"")
+            self.assertEqual(response.headers["ETag"], etag)
+
+        response = self.client.get("/static/service-worker.js", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200, "The identity variant has a different ETag")
+        response = self.client.get(
+            "/version", headers={"If-Modified-Since": self.client.get("/version").headers["Last-Modified"]}
+        )
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get("/manifest.json", headers={"If-Modified-Since": last_modified, "If-None-Match": '"stale"'})
+        self.assertEqual(response.status_code, 200, "If-None-Match takes precedence")
+
+
+if __name__ == "__main__":
+    unittest.main()
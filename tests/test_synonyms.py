@@ -0,0 +1,92 @@
+"""
+Tests for the synonym graph and compiled query expansion
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from app import create_app, mood_playlists, mood_metadata
+from search_scorer import NUMPY_AVAILABLE, NumpyScorer, PythonScorer
+from synonyms import DEFAULT_SYNONYM_GRAPH, QueryExpander, compile_expansions, load_synonym_graph
+
+
+class TestCompileExpansions(unittest.TestCase):
+    """Test flattening the graph into an expansion map"""
+
+    def test_depth_and_direction(self):
+        """Test undirected edges followed up to max_depth hops, nearest first"""
+        graph = {"relax": ["calm", "unwind"], "calm": ["serene"]}
+        expansions = compile_expansions(graph, max_depth=2)
+        self.assertEqual(expansions["unwind"], ("relax", "calm"))
+        self.assertEqual(expansions["relax"], ("calm", "unwind", "serene"))
+        self.assertNotIn("serene", compile_expansions(graph, max_depth=1)["unwind"])
+
+    def test_keep_predicate_prunes_terms(self):
+        """Test that unwanted expansion terms are dropped and empty entries omitted"""
+        expansions = compile_expansions({"a": ["b", "c"]}, keep=lambda term: term != "b")
+        self.assertEqual(expansions, {"a": ("c",), "b": ("a", "c"), "c": ("a",)})
+
+    def test_catalog_pruning(self):
+        """Test that expansions which match no mood are removed at compile time"""
+        expander = QueryExpander.for_catalog(DEFAULT_SYNONYM_GRAPH, mood_playlists, mood_metadata)
+        self.assertIn("gym", expander.expansions["workout"])
+        self.assertNotIn("date night", expander.expansions["love"])
+
+    def test_expand_query_and_words(self):
+        """Test whole-query and per-word lookups without duplicates or the query itself"""
+        expander = QueryExpander({"happy": ("cheerful",), "vibes": ("good vibes",), "happy vibes": ("cheerful",)})
+        self.assertEqual(expander.expand("happy vibes"), ("cheerful", "good vibes"))
+        self.assertEqual(expander.expand("unknown"), ())
+
+    def test_load_graph_file(self):
+        """Test JSON graph files, including validation"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "synonyms.json")
+            with open(path, "w", encoding="utf-8") as graph_file:
+                json.dump({"Chill": ["Laid Back"]}, graph_file)
+            self.assertEqual(load_synonym_graph(path), {"chill": ["laid back"]})
+
+            with open(path, "w", encoding="utf-8") as graph_file:
+                json.dump(["not", "a", "graph"], graph_file)
+            with self.assertRaises(ValueError):
+                load_synonym_graph(path)
+
+
+class TestSynonymSearch(unittest.TestCase):
+    """Test expansion through /search-playlists"""
+
+    def search(self, client, query, **data):
+        response = client.post("/search-playlists", data={"query": query, **data}).get_json()
+        return [mood["mood_key"] for mood in response["moods"]]
+
+    def test_expanded_queries(self):
+        """Test queries that previously found nothing or only part of the set"""
+        client = create_app({"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False}).test_client()
+        self.assertEqual(self.search(client, "relaxing"), ["chill", "meditative"])
+        self.assertEqual(self.search(client, "workout"), ["energetic", "running"])
+        self.assertEqual(self.search(client, "happy vibes"), ["happy", "chill", "uplifting"])
+        self.assertEqual(self.search(client, "happy"), ["happy"], "Existing single-word results are unchanged")
+
+    def test_disabled(self):
+        """Test that expansion can be switched off"""
+        client = create_app({"ANALYTICS_ENABLED": False, "SYNONYMS_ENABLED": False}).test_client()
+        self.assertEqual(self.search(client, "relaxing"), ["chill"])
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+    def test_scorers_agree_with_expansions(self):
+        """Test that both relevance scorers apply expansions identically"""
+        expander = QueryExpander.for_catalog(DEFAULT_SYNONYM_GRAPH, mood_playlists, mood_metadata)
+        python_scorer = PythonScorer(mood_playlists, mood_metadata)
+        numpy_scorer = NumpyScorer(mood_playlists, mood_metadata)
+        for query in ["relaxing", "workout", "happy vibes", "feeling blue"]:
+            with self.subTest(query=query):
+                expansions = expander.expand(query)
+                self.assertEqual(
+                    numpy_scorer.top_k(query, expansions=expansions), python_scorer.top_k(query, expansions=expansions)
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
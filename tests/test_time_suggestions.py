@@ -0,0 +1,108 @@
+"""
+Tests for table-driven, timezone-aware time suggestions
+"""
+
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from app import (
+    TIME_SUGGESTION_TABLE,
+    build_time_suggestion_table,
+    create_app,
+    get_time_based_suggestions,
+    popular_moods_by_hour,
+    resolve_timezone,
+)
+
+FIXED_UTC = datetime(2025, 1, 1, 12, 30, tzinfo=timezone.utc)
+
+
+class FixedDatetime(datetime):
+    """datetime whose now() is pinned to FIXED_UTC in whatever zone is asked for"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return FIXED_UTC.astimezone(tz) if tz else FIXED_UTC.replace(tzinfo=None)
+
+
+@patch("app.datetime", FixedDatetime)
+class TestTimeSuggestionTable(unittest.TestCase):
+    """Test the precomputed table and timezone resolution"""
+
+    def test_table_covers_every_hour(self):
+        """Test that the default table has one entry per hour, wrapping midnight"""
+        self.assertEqual(len(TIME_SUGGESTION_TABLE), 24)
+        self.assertEqual(TIME_SUGGESTION_TABLE[23], TIME_SUGGESTION_TABLE[0])
+        self.assertEqual(TIME_SUGGESTION_TABLE[5], ("sleepy", "meditative", "chill"))
+
+    def test_finer_resolution(self):
+        """Test half-hour slots built from fractional period boundaries"""
+        table = build_time_suggestion_table([(0, 12.5, ["happy"]), (12.5, 0, ["sad"])], slots_per_hour=2)
+        self.assertEqual(len(table), 48)
+        self.assertEqual(table[24], ("happy",))
+        self.assertEqual(table[25], ("sad",))
+
+    def test_uncovered_slots_rejected(self):
+        """Test that gaps in the configured periods fail at build time"""
+        with self.assertRaises(ValueError):
+            build_time_suggestion_table([(6, 9, ["happy"])])
+
+    def test_iana_timezone(self):
+        """Test suggestions in the client's named timezone (12:30 UTC is 21:30 in Tokyo)"""
+        self.assertEqual(get_time_based_suggestions(tz="Asia/Tokyo"), ["romantic", "chill", "nostalgic"])
+
+    def test_offset_fallback(self):
+        """Test JavaScript-style offsets and unknown zone names (300 = UTC-5, 07:30)"""
+        expected = ["uplifting", "motivated", "energetic"]
+        self.assertEqual(get_time_based_suggestions(tz_offset=300), expected)
+        self.assertEqual(get_time_based_suggestions(tz="Not/AZone", tz_offset=300), expected)
+        self.assertIsNone(resolve_timezone("Not/AZone"))
+        self.assertIsNone(resolve_timezone(tz_offset=10000))
+
+    def test_popularity_blending(self):
+        """Test that a popular mood for the current UTC hour replaces the last suggestion"""
+        snapshot = {"generated_at": "t1", "by_hour_utc": {12: {"party": 6, "sad": 2}}}
+        popular = popular_moods_by_hour(snapshot)
+        self.assertEqual(popular[12], "party")
+        self.assertIs(popular_moods_by_hour(snapshot), popular, "Same snapshot should hit the cache")
+        self.assertEqual(get_time_based_suggestions("Asia/Tokyo", popular_by_hour=popular), ["romantic", "chill", "party"])
+
+        sparse = popular_moods_by_hour({"generated_at": "t2", "by_hour_utc": {12: {"party": 2}}})
+        self.assertIsNone(sparse[12])
+        self.assertEqual(get_time_based_suggestions("Asia/Tokyo", popular_by_hour=sparse), ["romantic", "chill", "nostalgic"])
+
+
+@patch("app.datetime", FixedDatetime)
+class TestSuggestionEndpoints(unittest.TestCase):
+    """Test the /suggestions endpoint and optional homepage suggestions"""
+
+    def test_suggestions_endpoint(self):
+        """Test suggestions for a timezone passed as a query parameter"""
+        flask_app = create_app({"ANALYTICS_ENABLED": False})
+        with flask_app.test_client() as client:
+            data = client.get("/suggestions?tz=Asia/Tokyo").get_json()
+            self.assertTrue(data["success"])
+            self.assertEqual([m["key"] for m in data["moods"]], ["romantic", "chill", "nostalgic"])
+
+            data = client.get("/suggestions?tz_offset=300").get_json()
+            self.assertEqual(data["moods"][0]["key"], "uplifting")
+
+    def test_homepage_uses_timezone_cookie(self):
+        """Test that enabled homepage suggestions follow the tz cookie"""
+        flask_app = create_app({"ANALYTICS_ENABLED": False, "TIME_SUGGESTIONS_ENABLED": True})
+        with flask_app.test_client() as client:
+            client.set_cookie("tz", "Asia/Tokyo")
+            html = client.get("/").get_data(as_text=True)
+            self.assertIn("Suggested for now", html)
+            self.assertIn('data-mood="nostalgic"', html)
+
+    def test_homepage_suggestions_disabled_by_default(self):
+        """Test that the homepage keeps time suggestions off unless enabled"""
+        flask_app = create_app({"ANALYTICS_ENABLED": False})
+        with flask_app.test_client() as client:
+            self.assertNotIn("Suggested for now", client.get("/").get_data(as_text=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Tests for the track-level inverted index and track matches in search
+"""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from app import create_app, mood_playlists
+from track_cache import PlaylistTracks, Track, TrackCache
+from track_index import TrackIndex
+
+GOLDEN = Track("t1", "Golden Hour", ("Luna Vale",), 200000)
+MIDNIGHT = Track("t2", "Midnight Rain", ("Luna Vale", "Kai Rivers"), 180000)
+OCEAN = Track("t3", "Ocean Eyes", ("Kai Rivers",), 210000)
+
+
+class TestTrackIndex(unittest.TestCase):
+    """Test interning, incremental updates and search"""
+
+    def setUp(self):
+        self.index = TrackIndex()
+        self.index.update("p1", [GOLDEN, MIDNIGHT])
+        self.index.update("p2", [Track("x1", "Golden Hour", ("Luna Vale",), 200000), OCEAN])
+
+    def test_strings_are_shared(self):
+        """Test that equal titles and artists are stored once across playlists"""
+        first = self.index._playlists["p1"]
+        second = self.index._playlists["p2"]
+        (golden,) = [track for track in first if track.track_id == "t1"]
+        (copy,) = [track for track in second if track.track_id == "x1"]
+        self.assertIs(golden.title, copy.title)
+        self.assertIs(golden.artists[0], copy.artists[0])
+
+        self.index.remove("p1")
+        self.index.remove("p2")
+        self.assertEqual(
+            self.index.stats(), {"tracks": 0, "words": 0, "strings": 0}, "Strings are released with the last user"
+        )
+
+    def test_incremental_update(self):
+        """Test that only added and removed tracks are touched"""
+        handles = dict(self.index._playlists["p1"])
+        self.assertEqual(self.index.update("p1", [MIDNIGHT, OCEAN]), (1, 1))
+        self.assertEqual(self.index._playlists["p1"][MIDNIGHT], handles[MIDNIGHT], "Unchanged tracks keep their entry")
+        self.assertEqual(self.index.update("p1", [MIDNIGHT, OCEAN]), (0, 0))
+        self.assertNotIn("p1", self.index.search("golden"))
+
+    def test_search(self):
+        """Test multi-word, prefix and artist matches"""
+        self.assertEqual(self.index.search("golden hour"), {"p1": (1, [GOLDEN]), "p2": (1, [GOLDEN._replace(track_id="x1")])})
+        self.assertEqual(self.index.search("kai riv"), {"p1": (1, [MIDNIGHT]), "p2": (1, [OCEAN])})
+        self.assertEqual(list(self.index.search("luna")), ["p1", "p2"], "Most matches first")
+        self.assertEqual(self.index.search("LUNA  Vale", per_playlist=1)["p1"], (2, [GOLDEN]))
+        self.assertEqual(self.index.search("hour kai"), {})
+        self.assertEqual(self.index.search("  "), {})
+
+    def test_refresh_follows_cache_files(self):
+        """Test that refresh() re-indexes only rewritten cache entries"""
+        with tempfile.TemporaryDirectory() as directory:
+            cache = TrackCache(directory)
+            cache.put(PlaylistTracks("p1", time.time(), (GOLDEN,)))
+            index = TrackIndex()
+            self.assertEqual(index.refresh(cache, ["p1", "p2"]), 1, "Missing files are skipped")
+            self.assertEqual(index.refresh(cache, ["p1", "p2"]), 0)
+
+            cache.put(PlaylistTracks("p2", time.time(), (OCEAN,)))
+            self.assertEqual(index.refresh(cache, ["p1", "p2"]), 1)
+            self.assertEqual(set(index.search("eyes")), {"p2"})
+
+            os.remove(cache.path("p1"))
+            index.refresh(cache, ["p1", "p2"])
+            self.assertEqual(index.playlist_ids(), ["p2"])
+
+
+class TestTrackMatchesEndpoint(unittest.TestCase):
+    """Test track matches through /search-playlists"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        cache = TrackCache(self.tmp.name)
+        cache.put(PlaylistTracks(mood_playlists["happy"], time.time(), (GOLDEN, MIDNIGHT)))
+        cache.put(
+            PlaylistTracks(mood_playlists["chill"], time.time(), (MIDNIGHT, Track("t4", "Into the Wild", ("Echo Park",), 1)))
+        )
+        config = {"ANALYTICS_ENABLED": False, "RATE_LIMIT_ENABLED": False, "TRACK_CACHE_DIR": self.tmp.name}
+        self.client = create_app(config).test_client()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_grouped_by_mood(self):
+        """Test groups, track fields and the tracks timing"""
+        data = self.client.post("/search-playlists", data={"query": "luna vale"}).get_json()
+        self.assertEqual([group["mood_key"] for group in data["track_matches"]], ["happy", "chill"])
+        happy = data["track_matches"][0]
+        self.assertEqual(happy["total"], 2)
+        self.assertEqual(
+            happy["tracks"][1],
+            {"id": "t2", "title": "Midnight Rain", "artists": ["Luna Vale", "Kai Rivers"], "duration_ms": 180000},
+        )
+        self.assertIn("tracks", data["timings"])
+
+    def test_category_filter_and_ndjson(self):
+        """Test that groups honour the category filter and stream before the end line"""
+        data = self.client.post("/search-playlists", data={"query": "midnight", "category": "Emotional"}).get_json()
+        self.assertEqual([group["mood_key"] for group in data["track_matches"]], ["happy"])
+
+        response = self.client.post("/search-playlists", data={"query": "midnight", "format": "ndjson"})
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([line["group"]["mood_key"] for line in lines if line["type"] == "tracks"], ["happy", "chill"])
+        self.assertEqual(lines[-1]["type"], "end")
+
+    def test_later_pages_have_no_track_matches(self):
+        """Test that only the first page carries track matches"""
+        first = self.client.post("/search-playlists", data={"query": "in", "limit": "1"}).get_json()
+        self.assertEqual([group["mood_key"] for group in first["track_matches"]], ["chill"])
+        data = {"query": "in", "limit": "1", "cursor": first["next_cursor"]}
+        self.assertEqual(self.client.post("/search-playlists", data=data).get_json()["track_matches"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+On-Disk Playlist Track Cache for MoodTunes PWA
+
+Written by the ingestion worker (spotify_ingest.py) and read by the app
+(``/tracks/<mood>``). One gzip-compressed JSON file per playlist holds the
+fetch time and the tracks as compact ``[id, title, [artists], duration_ms]``
+arrays. Files are replaced atomically (temp file + rename), so readers in
+other processes never see a half-written entry. Entries older than the TTL
+are stale: still readable on request, refetched by the next ingestion run.
+
+Standard library only, so the app can read the cache without ``requests``.
+"""
+
+import os
+import gzip
+import json
+import time
+import tempfile
+from collections import namedtuple
+
+# Bumped whenever the cache file layout changes; other versions count as misses
+CACHE_FORMAT_VERSION = 1
+
+Track = namedtuple("Track", "track_id title artists duration_ms")
+
+# tracks is a tuple of Track; fetched_at is a Unix timestamp
+PlaylistTracks = namedtuple("PlaylistTracks", "playlist_id fetched_at tracks")
+
+
+class TrackCache:
+    """
+    On-disk playlist track cache with a time-to-live.
+
+    Args:
+        directory (str): Cache directory (created on the first write)
+        ttl (float): Seconds an entry stays fresh
+        clock (callable): Returns the current Unix time (injectable for tests)
+    """
+
+    def __init__(self, directory, ttl=24 * 3600, clock=time.time):
+        self.directory = directory
+        self.ttl = ttl
+        self._clock = clock
+
+    def path(self, playlist_id):
+        """Cache file of one playlist."""
+        return os.path.join(self.directory, f"{playlist_id}.json.gz")
+
+    def mtime(self, playlist_id):
+        """Modification time of a playlist's cache file in ns (None if missing)."""
+        try:
+            return os.stat(self.path(playlist_id)).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, playlist_id, allow_stale=False):
+        """
+        Read a cached playlist.
+
+        Args:
+            playlist_id (str): Spotify playlist ID
+            allow_stale (bool): Also return entries older than the TTL
+
+        Returns:
+            PlaylistTracks | None: Cached tracks, or None if missing, stale
+                (unless allowed), unreadable or in another format version
+        """
+        try:
+            with gzip.open(self.path(playlist_id), "rt", encoding="utf-8") as cache_file:
+                payload = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        if payload.get("v") != CACHE_FORMAT_VERSION:
+            return None
+        entry = PlaylistTracks(
+            playlist_id,
+            payload["fetched_at"],
+            tuple(
+                Track(track_id, title, tuple(artists), duration) for track_id, title, artists, duration in payload["tracks"]
+            ),
+        )
+        if not allow_stale and not self.is_fresh(entry):
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        """True while ``entry`` is younger than the TTL."""
+        return self._clock() - entry.fetched_at < self.ttl
+
+    def put(self, entry):
+        """
+        Store a playlist, replacing any previous entry atomically.
+
+        Args:
+            entry (PlaylistTracks): Tracks to store
+        """
+        payload = {
+            "v": CACHE_FORMAT_VERSION,
+            "fetched_at": entry.fetched_at,
+            "tracks": [[track.track_id, track.title, list(track.artists), track.duration_ms] for track in entry.tracks],
+        }
+        data = gzip.compress(json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+        # Write a temp file and rename it, so readers never see a half-written entry
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, self.path(entry.playlist_id))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,216 @@
+"""
+Track-Level Search Index for MoodTunes PWA
+
+Inverted index over the titles and artists of every cached playlist
+(see track_cache.py), so /search-playlists can answer "taylor swift" or
+"lofi beats" with the moods whose playlists contain matching songs.
+
+Layout:
+
+- every indexed track gets a small integer handle; ``_tracks`` maps the
+  handle to (playlist ID, Track)
+- ``_postings`` maps each normalized word (normalizer.py) to the set of
+  handles whose title or artists contain it
+- a query intersects the posting sets of its words; the last word also
+  matches as a prefix (through a sorted vocabulary and ``bisect``), so
+  results appear while the user is still typing
+
+Playlists overlap heavily in artists and often in titles, so titles,
+artist names and words are interned in a reference-counted pool: each
+distinct string is stored once however many tracks use it, and released
+when the last track using it is removed.
+
+Updates are incremental: update() diffs a playlist's new track list
+against the indexed one and only touches tracks that were added or
+removed. refresh() does this for every cache file whose modification time
+changed, so entries rewritten by the ingestion worker are picked up
+without rebuilding the index.
+"""
+
+import time
+import bisect
+import threading
+
+from normalizer import normalize_text
+from track_cache import Track
+
+
+class TrackIndex:
+    """
+    Incrementally updated inverted index of playlist tracks.
+
+    Thread-safe: updates and searches hold one lock (both are short).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._pool = {}  # String -> [interned string, reference count]
+        self._tracks = {}  # Handle -> (playlist ID, Track)
+        self._playlists = {}  # Playlist ID -> {Track: handle}
+        self._postings = {}  # Word -> set of handles
+        self._vocabulary = None  # Sorted words, rebuilt lazily after changes
+        self._next_handle = 0
+        self._mtimes = {}  # Playlist ID -> cache file mtime seen by refresh()
+        self.refreshed_at = None  # time.monotonic() of the last refresh()
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def playlist_ids(self):
+        """IDs of the playlists currently indexed."""
+        return list(self._playlists)
+
+    def _intern(self, value):
+        entry = self._pool.get(value)
+        if entry is None:
+            entry = self._pool[value] = [value, 0]
+        entry[1] += 1
+        return entry[0]
+
+    def _release(self, value):
+        entry = self._pool[value]
+        entry[1] -= 1
+        if not entry[1]:
+            del self._pool[value]
+
+    @staticmethod
+    def _words(track):
+        return set(normalize_text(" ".join((track.title, *track.artists))).split())
+
+    def _add(self, playlist_id, track):
+        track = Track(
+            track.track_id, self._intern(track.title), tuple(self._intern(a) for a in track.artists), track.duration_ms
+        )
+        handle = self._next_handle
+        self._next_handle += 1
+        self._tracks[handle] = (playlist_id, track)
+        for word in self._words(track):
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[self._intern(word)] = set()
+                self._vocabulary = None
+            postings.add(handle)
+        return track, handle
+
+    def _remove(self, handle):
+        _playlist_id, track = self._tracks.pop(handle)
+        for word in self._words(track):
+            postings = self._postings[word]
+            postings.discard(handle)
+            if not postings:
+                del self._postings[word]
+                self._release(word)
+                self._vocabulary = None
+        self._release(track.title)
+        for artist in track.artists:
+            self._release(artist)
+
+    def update(self, playlist_id, tracks):
+        """
+        Replace a playlist's tracks, touching only what changed.
+
+        Args:
+            playlist_id (str): Spotify playlist ID
+            tracks (iterable): Track records in playlist order
+
+        Returns:
+            tuple: (tracks added, tracks removed)
+        """
+        new = dict.fromkeys(tracks)
+        with self._lock:
+            current = self._playlists.get(playlist_id, {})
+            removed = [track for track in current if track not in new]
+            for track in removed:
+                self._remove(current.pop(track))
+
+            added = 0
+            ordered = {}
+            for track in new:
+                handle = current.get(track)
+                if handle is None:
+                    track, handle = self._add(playlist_id, track)
+                    added += 1
+                ordered[self._tracks[handle][1]] = handle
+            if ordered:
+                self._playlists[playlist_id] = ordered  # Dict order = playlist order
+            else:
+                self._playlists.pop(playlist_id, None)
+        return added, len(removed)
+
+    def remove(self, playlist_id):
+        """Drop a playlist from the index."""
+        self.update(playlist_id, ())
+
+    def refresh(self, cache, playlist_ids):
+        """
+        Re-index playlists whose cache files changed since the last refresh.
+
+        Args:
+            cache (TrackCache): Track cache written by the ingestion worker
+            playlist_ids (iterable): Playlists that belong in the index
+
+        Returns:
+            int: Number of playlists re-indexed
+        """
+        with self._refresh_lock:  # Concurrent callers would only repeat the same work
+            self.refreshed_at = time.monotonic()
+            changed = 0
+            for playlist_id in playlist_ids:
+                mtime = cache.mtime(playlist_id)
+                if mtime == self._mtimes.get(playlist_id):
+                    continue
+                entry = cache.get(playlist_id, allow_stale=True)
+                self.update(playlist_id, entry.tracks if entry else ())
+                self._mtimes[playlist_id] = mtime
+                changed += 1
+            return changed
+
+    def search(self, query, per_playlist=5):
+        """
+        Find tracks whose title or artists contain every word of the query.
+
+        Args:
+            query (str): Search text (normalized here)
+            per_playlist (int): Maximum tracks returned per playlist
+
+        Returns:
+            dict: Playlist ID -> (number of matching tracks, [Track, ...] in
+                playlist order, at most ``per_playlist``), most matches first
+        """
+        words = normalize_text(query).split()
+        if not words:
+            return {}
+        with self._lock:
+            *whole, last = words
+            sets = [self._postings.get(word, set()) for word in whole]
+            sets.append(self._prefix_postings(last))
+            sets.sort(key=len)  # Intersect starting from the rarest word
+            handles = set(sets[0]).intersection(*sets[1:]) if sets[0] else set()
+
+            by_playlist = {}
+            for handle in handles:
+                by_playlist.setdefault(self._tracks[handle][0], set()).add(handle)
+            # Most matches first; ties keep indexing order (stable sort)
+            ordered = sorted((pid for pid in self._playlists if pid in by_playlist), key=lambda pid: -len(by_playlist[pid]))
+            results = {}
+            for playlist_id in ordered:
+                matched = by_playlist[playlist_id]
+                in_order = [track for track, handle in self._playlists[playlist_id].items() if handle in matched]
+                results[playlist_id] = (len(matched), in_order[:per_playlist])
+        return results
+
+    def _prefix_postings(self, prefix):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        start = bisect.bisect_left(vocabulary, prefix)
+        end = bisect.bisect_left(vocabulary, prefix + "\U0010ffff")
+        if end - start == 1:
+            return self._postings[vocabulary[start]]
+        return set().union(*(self._postings[word] for word in vocabulary[start:end]))
+
+    def stats(self):
+        """Index size: tracks, distinct words and distinct interned strings."""
+        with self._lock:
+            return {"tracks": len(self._tracks), "words": len(self._postings), "strings": len(self._pool)}